@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Connect model signal handlers (search index sync)
+        from . import signals  # noqa: F401
+
+        # Per-request SQL timing (see core.instrumentation)
+        from django.db.backends.signals import connection_created
+        from .instrumentation import install
+        connection_created.connect(install, dispatch_uid="core.instrumentation.install")
+
+        # Query count and time for /metrics (see core.metrics)
+        from . import metrics
+        connection_created.connect(metrics.install, dispatch_uid="core.metrics.install")
+
+        # Slow query log with EXPLAIN output (see core.slow_queries)
+        from . import slow_queries
+        connection_created.connect(slow_queries.install, dispatch_uid="core.slow_queries.install")
+
+        # SQLite PRAGMAs (WAL, busy_timeout, ...) on every new connection
+        from .database import configure_connection
+        connection_created.connect(configure_connection, dispatch_uid="core.database.configure_connection")
@@ -0,0 +1,54 @@
+"""
+Concurrent ORM reads from async views.
+
+Django's async ORM (``async for``, ``aget``, ``acount``, ...) hands every query
+to the one thread that owns the request's database connection, so
+``asyncio.gather`` over async ORM calls still runs the queries back to back.
+``fetch`` and ``call`` can instead run each read on its own worker thread
+with its own connection, so the round trips of gathered reads overlap.
+
+That is only correct outside a transaction, because other connections can't
+see rows the transaction hasn't committed. Inside one (tests,
+ATOMIC_REQUESTS) they fall back to the async ORM. Set
+ASYNC_PARALLEL_QUERIES = False to always use the fallback, e.g. on a
+database with a small connection limit. The worker threads come from a
+shared executor and each opens its own connection; smartapp/asgi.py sets
+CONN_MAX_AGE to 0 so those are closed after every call instead of being
+held by idle threads.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+
+def _in_transaction():
+    return connection.in_atomic_block
+
+
+async def parallel_allowed():
+    """True if reads may run on separate connections (checked on the request's own thread)."""
+    if not getattr(settings, "ASYNC_PARALLEL_QUERIES", True):
+        return False
+    return not await sync_to_async(_in_transaction)()
+
+
+def _in_own_connection(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # Worker threads keep their connection between calls only as CONN_MAX_AGE allows
+        close_old_connections()
+
+
+async def fetch(queryset, parallel):
+    """Evaluate `queryset` to a list."""
+    if parallel:
+        return await sync_to_async(_in_own_connection, thread_sensitive=False)(list, queryset)
+    return [obj async for obj in queryset]
+
+
+async def call(func, *args, parallel):
+    """Run sync ORM code `func(*args)`."""
+    if parallel:
+        return await sync_to_async(_in_own_connection, thread_sensitive=False)(func, *args)
+    return await sync_to_async(func)(*args)
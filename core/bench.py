@@ -0,0 +1,244 @@
+"""
+Service-layer benchmarks (``manage.py bench_services``).
+
+``seed`` builds a synthetic dataset. ``run`` times every query-issuing
+service method from ``service_calls`` and reports percentiles, query counts
+and materialized rows. ``compare`` diffs a result set against a stored
+baseline. ``manage.py explain_queries`` uses the same ``service_calls``
+list.
+"""
+import math
+import random
+import statistics
+import time
+from datetime import timedelta
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Model
+from django.db.models.query import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import sync, user_stats
+from .models import Note, SyncChange, Todo
+from .search import KIND_NOTE, KIND_TODO, get_search_backend
+from .services import NoteService, SearchService, TodoService
+
+WORDS = (
+    "call email buy review plan write fix update send book check prepare clean meet "
+    "report invoice groceries dentist budget slides draft release deploy garden"
+).split()
+
+
+def service_calls(user, now):
+    """(label, callable) for every query-issuing service method."""
+    notes = NoteService(user)
+    # Bypass the dashboard cache so every call reaches the database
+    todos = TodoService(user, use_cache=False)
+    search = SearchService(user)
+    return [
+        ("NoteService.list_all", notes.list_all),
+        ("NoteService.list_page", notes.list_page),
+        ("TodoService.list_all", todos.list_all),
+        ("TodoService.get_dashboard_data", lambda: todos.get_dashboard_data(now)),
+        ("TodoService.get_dashboard_stats", lambda: todos.get_dashboard_stats("a")),
+        ("TodoService.get_reminders", lambda: todos.get_reminders(now)),
+        ("TodoService.get_daily_focus", lambda: todos.get_daily_focus(now)),
+        ("TodoService.get_priority_matrix", lambda: todos.get_priority_matrix(now)),
+        ("TodoService.get_reminders_status_data", lambda: todos.get_reminders_status_data(now)),
+        ("TodoService.get_calendar_data", todos.get_calendar_data),
+        ("TodoService.get_calendar_window", lambda: todos.get_calendar_window(*todos.calendar_window(now.date()))),
+        ("TodoService.get_calendar_day", lambda: todos.get_calendar_day(now.date())),
+        ("TodoService.get_monthly_stats", lambda: todos.get_monthly_stats(now)),
+        ("TodoService.get_kanban_board", todos.get_kanban_board),
+        ("TodoService.get_kanban_column", lambda: todos.get_kanban_column(Todo.STATUS_COMPLETED)),
+        ("SearchService.search", lambda: search.search(WORDS[0])),
+    ]
+
+
+def evaluate(result):
+    """Force lazy querysets (possibly nested in dicts/lists) to hit the database."""
+    if isinstance(result, QuerySet):
+        return list(result)
+    if isinstance(result, dict):
+        return {key: evaluate(value) for key, value in result.items()}
+    if isinstance(result, (list, tuple)):
+        return [evaluate(value) for value in result]
+    return result
+
+
+def count_rows(result):
+    """Model instances in an evaluated result (rows the ORM materialized)."""
+    if isinstance(result, Model):
+        return 1
+    if isinstance(result, dict):
+        return sum(count_rows(value) for value in result.values())
+    if isinstance(result, list):
+        return sum(count_rows(value) for value in result)
+    return 0
+
+
+# ---------------------------
+# Synthetic data
+# ---------------------------
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _note_html(rng):
+    """Quill-style HTML from a few hundred bytes to ~20 KB."""
+    paragraphs = max(1, int(rng.lognormvariate(1.5, 1.0)))
+    return "".join(f"<p>{_sentence(rng, rng.randint(8, 30))}.</p>" for _ in range(min(paragraphs, 200)))
+
+
+def _todo(rng, user, now):
+    today = now.date()
+    status = rng.choices(
+        [Todo.STATUS_PENDING, Todo.STATUS_IN_PROGRESS, Todo.STATUS_COMPLETED], weights=[50, 20, 30]
+    )[0]
+    todo = Todo(
+        user=user,
+        task=_sentence(rng, rng.randint(2, 6)),
+        status=status,
+        done=status == Todo.STATUS_COMPLETED,
+        is_important=rng.random() < 0.25,
+        activity=rng.choice(Todo.ACTIVITY_CHOICES)[0],
+    )
+    roll = rng.random()
+    if roll < 0.1:
+        todo.due_date = today
+    elif roll < 0.3:
+        todo.due_date = today - timedelta(days=rng.randint(1, 365))
+    elif roll < 0.6:
+        todo.due_date = today + timedelta(days=rng.randint(1, 90))
+    roll = rng.random()
+    if roll < 0.15:
+        todo.reminder = now - timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+    elif roll < 0.2:
+        todo.reminder = now + timedelta(minutes=rng.randint(1, 60))
+    elif roll < 0.4:
+        todo.reminder = now + timedelta(minutes=rng.randint(61, 60 * 24 * 30))
+    todo.sync_status()
+    return todo
+
+
+def seed(users=3, todos=500, notes=100, random_seed=0, prefix="bench", now=None):
+    """
+    Create `users` users with `todos` todos and `notes` notes each (bulk
+    inserts, search index and counters included). Returns the users.
+    """
+    rng = random.Random(random_seed)
+    now = now or timezone.now()
+    User = get_user_model()
+    backend = get_search_backend()
+    created_users = []
+    for index in range(users):
+        user = User.objects.create_user(username=f"__{prefix}_{index}__")
+        created_users.append(user)
+
+        note_objs = []
+        for _ in range(notes):
+            note = Note(user=user, title=_sentence(rng, rng.randint(2, 5)), content=_note_html(rng))
+            note.update_preview()
+            note_objs.append(note)
+        note_objs = Note.objects.bulk_create(note_objs, batch_size=500)
+        backend.index_many(KIND_NOTE, note_objs)
+        sync.record(user.pk, SyncChange.KIND_NOTE, [note.pk for note in note_objs])
+
+        todo_objs = Todo.objects.bulk_create([_todo(rng, user, now) for _ in range(todos)], batch_size=500)
+        backend.index_many(KIND_TODO, todo_objs)
+        sync.record(user.pk, SyncChange.KIND_TODO, [todo.pk for todo in todo_objs])
+        user_stats.rebuild(user.pk)
+    return created_users
+
+
+# ---------------------------
+# Measuring
+# ---------------------------
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def best_of(repeat, func):
+    """Fastest of `repeat` calls of `func`, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(call, repeat=20, warmup=2):
+    """Time `call` (evaluated fully); returns timings in ms plus queries and rows of one run."""
+    for _ in range(warmup):
+        evaluate(call())
+    with CaptureQueriesContext(connection) as ctx:
+        rows = count_rows(evaluate(call()))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        evaluate(call())
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": len(ctx.captured_queries),
+        "rows": rows,
+    }
+
+
+def run(user, repeat=20, warmup=2, only=None, now=None):
+    """{label: measurement} for every service call (labels filtered by substring `only`)."""
+    now = now or timezone.now()
+    results = {}
+    for label, call in service_calls(user, now):
+        if only and only not in label:
+            continue
+        results[label] = measure(call, repeat, warmup)
+
+    # The dashboard as served: cache warm after the first load
+    label = "TodoService.get_dashboard_data[cached]"
+    if not only or only in label:
+        cached = TodoService(user)
+        cached.get_dashboard_data(now)
+        results[label] = measure(lambda: cached.get_dashboard_data(now), repeat, warmup)
+    return results
+
+
+def metadata(**dataset):
+    return {
+        "dataset": dataset,
+        "vendor": connection.vendor,
+        "django": django.get_version(),
+        "created_at": timezone.now().isoformat(),
+    }
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Diff two result sets ({label: measurement}). Returns rows of
+    (label, baseline p50, current p50, ratio, query delta, regressed); a
+    call regresses if its p50 grew by more than `threshold` or it issues
+    more queries.
+    """
+    rows = []
+    for label, now_result in current.items():
+        before = baseline.get(label)
+        if before is None:
+            rows.append((label, None, now_result["p50_ms"], None, None, False))
+            continue
+        ratio = now_result["p50_ms"] / before["p50_ms"] if before["p50_ms"] else None
+        query_delta = now_result["queries"] - before["queries"]
+        regressed = query_delta > 0 or (ratio is not None and ratio > 1 + threshold)
+        rows.append((label, before["p50_ms"], now_result["p50_ms"], ratio, query_delta, regressed))
+    return rows
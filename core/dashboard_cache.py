@@ -0,0 +1,158 @@
+"""
+Per-user cache for TodoService reporting output.
+
+Every user has a version number stored in the cache; data keys embed it, so
+bumping the version (``invalidate_user``) orphans everything cached for that
+user in one operation. Hit/miss totals are kept in the cache as well (see
+``manage.py dashboard_cache_stats``).
+
+Versions and totals are only shared between worker processes when CACHES
+is a shared cache (SHARED_CACHE, set by REDIS_URL). With the default
+per-process LocMemCache each worker has its own copy; a write handled by
+one worker doesn't invalidate what another one cached, so without
+SHARED_CACHE entries are kept for at most DASHBOARD_CACHE_LOCAL_TIMEOUT
+seconds; that bounds how stale another worker's dashboard can be.
+"""
+import math
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from . import metrics
+
+KEY_PREFIX = "dashboard_cache"
+HITS_KEY = f"{KEY_PREFIX}:hits"
+MISSES_KEY = f"{KEY_PREFIX}:misses"
+
+
+def default_timeout():
+    """Lifetime (seconds) of sections that don't depend on the clock."""
+    return getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 60 * 60 * 24)
+
+
+def local_timeout():
+    """Longest lifetime (seconds) of any entry when the cache isn't shared."""
+    return getattr(settings, "DASHBOARD_CACHE_LOCAL_TIMEOUT", 60)
+
+
+def version_key(user_id):
+    return f"{KEY_PREFIX}:v:{user_id}"
+
+
+def user_version(user_id):
+    """Current cache version for the user, created on first use."""
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed with the clock so a version evicted from the cache never
+        # comes back as a number that older data keys were stored under
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def section_key(user_id, version, section):
+    return f"{KEY_PREFIX}:{user_id}:{version}:{section}"
+
+
+def _bump(user_id):
+    try:
+        cache.incr(version_key(user_id))
+    except ValueError:
+        cache.add(version_key(user_id), time.time_ns(), None)
+
+
+def invalidate_user(user_id):
+    """
+    Drop everything cached for the user.
+
+    The version is bumped immediately and again once the surrounding
+    transaction commits, so a request that read the pre-commit rows can't
+    leave them cached under the new version.
+    """
+    if user_id is None:
+        return
+    _bump(user_id)
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+def get_many(user_id, sections):
+    """
+    Return (version, {section: value}) for the sections present in the
+    cache. Pass the version on to `set_many` for sections built after this
+    read, so they are stored under the version they were read at.
+    """
+    version = user_version(user_id)
+    keys = {section_key(user_id, version, section): section for section in sections}
+    found = cache.get_many(keys)
+    record(hits=len(found), misses=len(keys) - len(found))
+    return version, {keys[key]: value for key, value in found.items()}
+
+
+def set_many(user_id, version, values, timeout):
+    """Store {section: value} under `version` (from `get_many`) with a shared timeout (seconds)."""
+    if not getattr(settings, "SHARED_CACHE", False):
+        timeout = min(timeout, local_timeout())
+    cache.set_many({section_key(user_id, version, section): value for section, value in values.items()}, timeout)
+
+
+def get_or_build(user_id, section, builder, timeout=None):
+    """Return the cached section, building and storing it on a miss."""
+    version, found = get_many(user_id, [section])
+    if section in found:
+        return found[section]
+    value = builder()
+    set_many(user_id, version, {section: value}, timeout or default_timeout())
+    return value
+
+
+# ---------------------------
+# Expiry helpers
+# ---------------------------
+
+def next_midnight(now):
+    return now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+
+def seconds_until(now, moment):
+    """Timeout in whole seconds until `moment` (at least one)."""
+    return max(1, math.ceil((moment - now).total_seconds()))
+
+
+# ---------------------------
+# Hit / miss counters
+# ---------------------------
+
+def _incr(key, delta):
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def record(hits=0, misses=0):
+    _incr(HITS_KEY, hits)
+    _incr(MISSES_KEY, misses)
+    metrics.record_cache("dashboard", hits, misses)
+
+
+def stats():
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": (hits / lookups) if lookups else 0.0,
+    }
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,31 @@
+"""
+Per-connection database tuning.
+
+SQLite connections get the SQLITE_PRAGMAS below when they open: WAL lets
+readers run alongside the single writer, and busy_timeout makes a writer
+wait for the lock instead of failing with "database is locked". The journal
+mode is stored in the database file; the rest are per connection.
+"""
+from django.conf import settings
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,  # ms
+    "mmap_size": 128 * 1024 * 1024,
+    "cache_size": -20000,  # negative = KiB, so ~20 MB
+    "temp_store": "MEMORY",
+}
+
+
+def sqlite_pragmas():
+    return {**SQLITE_PRAGMAS, **getattr(settings, "SQLITE_PRAGMAS", {})}
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created handler applying sqlite_pragmas()."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,60 @@
+"""
+Cache for rendered per-object fragments (Kanban cards, note cards).
+
+A fragment is keyed by the object's id and updated_at and by a hash of the
+template source, so editing the object or deploying a changed template
+simply stops hitting the old entries; nothing has to be deleted. A list
+fetches all of its fragments with one get_many and renders only the misses.
+The templates must not depend on anything but the object.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from . import metrics
+
+KEY_PREFIX = "fragment"
+
+_versions = {}
+
+
+def default_timeout():
+    return getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 60 * 60 * 24 * 7)
+
+
+def template_version(template):
+    """Short hash of the template source, computed once per process."""
+    name = template.origin.template_name
+    if name not in _versions:
+        _versions[name] = hashlib.md5(template.template.source.encode()).hexdigest()[:8]
+    return _versions[name]
+
+
+def fragment_key(template_name, version, obj):
+    return f"{KEY_PREFIX}:{template_name}:{version}:{obj.pk}:{obj.updated_at.timestamp()}"
+
+
+def render_many(template_name, objects, name):
+    """
+    Rendered `template_name` for each object (in the template as `name`),
+    in order, as safe strings.
+    """
+    template = get_template(template_name)
+    version = template_version(template)
+    keys = [fragment_key(template_name, version, obj) for obj in objects]
+    cached = cache.get_many(keys) if keys else {}
+
+    rendered = {}
+    fragments = []
+    for key, obj in zip(keys, objects):
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = template.render({name: obj})
+        fragments.append(mark_safe(html))
+    metrics.record_cache("fragment", len(keys) - len(rendered), len(rendered))
+    if rendered:
+        cache.set_many(rendered, default_timeout())
+    return fragments
@@ -0,0 +1,210 @@
+"""
+Bulk import of notes and todos from CSV or NDJSON (optionally gzip).
+
+The input is parsed as a stream and each row is validated with the same
+form the UI uses (``TodoForm`` / ``NoteForm``), so the rules match
+``TodoForm.clean_due_date`` and ``TodoForm.clean``. Valid rows are then
+inserted with ``bulk_create``, one transaction per batch.
+
+``bulk_create`` skips ``save()`` and the post_save signals. The side effects
+they would have had are applied here, once per batch:
+
+* done/status sync (``Todo.sync_status``) and note previews
+* search indexing
+* ReminderChange outbox rows
+* sync change log entries
+* materialized counters (UserStats)
+* dashboard cache invalidation and reminder stream wake-ups
+"""
+import csv
+import gzip
+import io
+import json
+import time
+
+from django.db import transaction
+
+from . import dashboard_cache, reminder_events, sync, user_stats
+from .forms import NoteForm, TodoForm
+from .models import Note, ReminderChange, Todo
+from .search import KIND_NOTE, KIND_TODO, get_search_backend
+
+FORMATS = ("csv", "ndjson")
+
+IMPORTS = {
+    "notes": (Note, NoteForm, KIND_NOTE),
+    "todos": (Todo, TodoForm, KIND_TODO),
+}
+
+
+def detect_format(filename, default="csv"):
+    """Guess the format from a file name like ``todos.ndjson.gz``."""
+    name = (filename or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    for fmt in FORMATS:
+        if name.endswith("." + fmt) or (fmt == "ndjson" and name.endswith(".jsonl")):
+            return fmt
+    return default
+
+
+def open_text(binary, compressed=False):
+    """Wrap a binary file object as a text stream, decompressing gzip on the fly."""
+    if compressed:
+        binary = gzip.GzipFile(fileobj=binary, mode="rb")
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+def parse_csv(stream):
+    """
+    Yield (line number, row, error) for each CSV record. A malformed record
+    is reported and skipped; a malformed header ends the file.
+    """
+    reader = csv.DictReader(stream)
+    # DictReader.line_num only advances on success, so errors use the inner reader's
+    try:
+        reader.fieldnames
+    except csv.Error as e:
+        yield reader.reader.line_num, None, f"Invalid CSV header: {e}"
+        return
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield reader.reader.line_num, None, str(e)
+            continue
+        yield reader.line_num, row, None
+
+
+def parse_ndjson(stream):
+    """Yield (line number, row, error) for each non-blank NDJSON line."""
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, row, None
+
+
+def parse_rows(stream, fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+    return parse_csv(stream) if fmt == "csv" else parse_ndjson(stream)
+
+
+class BulkImporter:
+    """
+    Validate and insert rows for one user.
+
+    Rejected rows are passed to `on_reject(line, errors)` and the first
+    `max_rejects` of them are kept in the report.
+    """
+
+    def __init__(self, user, kind, batch_size=1000, max_rejects=100, on_reject=None):
+        if kind not in IMPORTS:
+            raise ValueError(f"Unknown import kind: {kind}")
+        self.user = user
+        self.kind = kind
+        self.model, self.form_class, self.search_kind = IMPORTS[kind]
+        self.batch_size = batch_size
+        self.max_rejects = max_rejects
+        self.on_reject = on_reject
+        self.search_backend = get_search_backend()
+        # Columns left out of the file fall back to the model defaults, as for a new object
+        self.defaults = {
+            name: self.model._meta.get_field(name).get_default()
+            for name in self.form_class._meta.fields
+            if self.model._meta.get_field(name).has_default()
+        }
+
+    def build(self, row):
+        """Return (unsaved object, None) for a valid row, or (None, errors)."""
+        # Blank cells count as missing, so they get the model default as well
+        data = {**self.defaults, **{key: value for key, value in row.items() if value not in ("", None)}}
+        form = self.form_class(data=data)
+        if not form.is_valid():
+            return None, {field: [str(message) for message in messages] for field, messages in form.errors.items()}
+        obj = form.save(commit=False)
+        obj.user = self.user
+        if self.kind == "todos":
+            self._apply_status(obj, row)
+        else:
+            obj.update_preview()
+        return obj, None
+
+    def _apply_status(self, todo, row):
+        status = row.get("status")
+        if status in {choice[0] for choice in Todo.STATUS_CHOICES}:
+            todo.status = status
+            if row.get("done") in (None, ""):
+                # No explicit done column: status decides
+                todo.done = status == Todo.STATUS_COMPLETED
+        todo.sync_status()
+
+    def insert(self, objs):
+        """Insert one batch and apply the side effects save() would have had."""
+        with transaction.atomic():
+            created = self.model.objects.bulk_create(objs)
+            self.search_backend.index_many(self.search_kind, created)
+            # Search and the sync log use the same "note" / "todo" kind names
+            sync.record(self.user.pk, self.search_kind, [obj.pk for obj in created])
+            if self.kind == "todos":
+                ReminderChange.objects.bulk_create([
+                    ReminderChange(todo_id=todo.pk, reminder=todo.reminder)
+                    for todo in created
+                    if todo.reminder is not None and not todo.done
+                ])
+                changes = user_stats.Changes()
+                for todo in created:
+                    changes.todo(None, todo.counter_state())
+            else:
+                changes = user_stats.Changes().notes(self.user.pk, len(created))
+            changes.apply()
+            dashboard_cache.invalidate_user(self.user.pk)
+        return len(created)
+
+    def run(self, rows):
+        """
+        Import (line, row, error) triples from `parse_rows`.
+        Returns {created, rejected, rejects, elapsed, rows_per_second}.
+        """
+        report = {"created": 0, "rejected": 0, "rejects": []}
+        started = time.monotonic()
+        batch = []
+
+        for line, row, error in rows:
+            if error is None:
+                obj, errors = self.build(row)
+            else:
+                obj, errors = None, {"__all__": [error]}
+            if obj is None:
+                report["rejected"] += 1
+                if len(report["rejects"]) < self.max_rejects:
+                    report["rejects"].append({"line": line, "errors": errors})
+                if self.on_reject:
+                    self.on_reject(line, errors)
+                continue
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                report["created"] += self.insert(batch)
+                batch = []
+        if batch:
+            report["created"] += self.insert(batch)
+
+        if report["created"] and self.kind == "todos":
+            user_id = self.user.pk
+            transaction.on_commit(lambda: reminder_events.notify_user(user_id))
+
+        elapsed = time.monotonic() - started
+        report["elapsed"] = round(elapsed, 3)
+        total = report["created"] + report["rejected"]
+        report["rows_per_second"] = round(total / elapsed) if elapsed else total
+        return report
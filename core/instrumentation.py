@@ -0,0 +1,138 @@
+"""
+Per-request SQL and template timing, reported by
+``core.middleware.ServerTimingMiddleware``.
+
+The middleware puts a RequestTiming in a context variable for each sampled
+request. Two always-installed hooks feed it:
+
+* ``record_query`` runs as an execute wrapper on every database connection
+  (added when the connection is created). It times each query and
+  attributes it to the innermost public service method on the stack.
+* ``TimedDjangoTemplates`` is a template backend that times top-level
+  renders.
+
+Context variables follow the request through sync_to_async /
+async_to_sync and into the core.async_db worker threads. When no request is
+being sampled, both hooks do a single context variable lookup and nothing
+else.
+"""
+import sys
+import threading
+import time
+from contextvars import ContextVar
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+_current = ContextVar("request_timing", default=None)
+
+SERVICES_MODULE = "core.services"
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.render_seconds = 0.0
+        self.render_depth = 0
+        # {"TodoService.get_dashboard_counters": [queries, seconds]}
+        self.by_method = {}
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds, method):
+        with self._lock:
+            self.db_seconds += seconds
+            self.queries += 1
+            entry = self.by_method.setdefault(method, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def start(sampled=True):
+    """
+    Begin timing the current request. Returns (timing, token for `stop`);
+    unsampled requests only get a start time and a None token.
+    """
+    timing = RequestTiming()
+    return timing, (_current.set(timing) if sampled else None)
+
+
+def stop(token):
+    if token is not None:
+        _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+# ---------------------------
+# SQL
+# ---------------------------
+
+def service_method(frame):
+    """
+    "Class.method" of the innermost public service method on the stack,
+    skipping private helpers and lambdas, or "" if none.
+    """
+    while frame is not None:
+        if frame.f_globals.get("__name__") == SERVICES_MODULE:
+            name = frame.f_code.co_name
+            owner = frame.f_locals.get("self")
+            if owner is not None and not name.startswith("_") and name != "<lambda>":
+                return f"{type(owner).__name__}.{name}"
+        frame = frame.f_back
+    return ""
+
+
+def record_query(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start_time = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(time.perf_counter() - start_time, service_method(sys._getframe(1)))
+
+
+def install(sender=None, connection=None, **kwargs):
+    """connection_created handler: add record_query to the connection's execute wrappers."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# ---------------------------
+# Templates
+# ---------------------------
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        # Only the outermost render counts, so nested render_to_string calls aren't counted twice
+        if timing is None or timing.render_depth:
+            return super().render(context, request)
+        timing.render_depth += 1
+        start_time = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.render_seconds += time.perf_counter() - start_time
+            timing.render_depth -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time reported to the current RequestTiming."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import engines
+from django.template.loader import get_template, render_to_string
+
+from core.bench import best_of
+from core.models import Note
+from core.services import NoteService
+
+
+def legacy_card():
+    """note_card.html as it was before previews were stored on Note."""
+    source = get_template("note_card.html").template.source
+    return engines["django"].from_string(
+        source.replace("{{ note.preview|truncatechars:120 }}", "{{ note.content|striptags|truncatechars:120 }}")
+    )
+
+
+def quill_html(size):
+    """Roughly `size` bytes of Quill-style HTML."""
+    paragraph = "<p>Lorem <strong>ipsum</strong> dolor sit <em>amet</em>, consectetur adipiscing elit.</p>"
+    return paragraph * max(1, size // len(paragraph))
+
+
+class Command(BaseCommand):
+    help = "Benchmark notes list rendering (full content vs stored preview) across note sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notes", type=int, default=24, help="Notes on the page (default 24).")
+        parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated note sizes in bytes.")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        legacy_template = legacy_card()
+        self.stdout.write(f"{'size':>8} {'legacy ms':>10} {'preview ms':>11} {'speedup':>8}")
+
+        # Everything runs inside a transaction that is rolled back
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(username="__bench_notes__")
+            service = NoteService(user)
+            for size in sizes:
+                Note.objects.filter(user=user).delete()
+                content = quill_html(size)
+                for i in range(options["notes"]):
+                    Note.objects.create(user=user, title=f"Note {i}", content=content)
+
+                def legacy():
+                    for note in Note.objects.filter(user=user).order_by("-created_at"):
+                        legacy_template.render({"note": note})
+
+                def current():
+                    notes, _ = service.list_page(page_size=options["notes"])
+                    for note in notes:
+                        render_to_string("note_card.html", {"note": note})
+
+                legacy_s = best_of(options["repeat"], legacy)
+                current_s = best_of(options["repeat"], current)
+                self.stdout.write(
+                    f"{size:>8} {legacy_s * 1000:>10.2f} {current_s * 1000:>11.2f} {legacy_s / current_s:>7.1f}x"
+                )
+            transaction.set_rollback(True)
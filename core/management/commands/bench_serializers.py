@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core import bench, serializers
+from core.models import Todo
+
+
+def legacy_reminder_items(qs):
+    """The serialize() closure get_reminders_status_data used before core.serializers."""
+    items = []
+    for r in qs:
+        items.append({
+            'id': r.id,
+            'task': r.task,
+            'reminder': r.reminder.strftime('%Y-%m-%d %H:%M'),
+            'due_date': r.due_date.strftime('%Y-%m-%d') if r.due_date else None,
+            'activity': r.get_activity_display(),
+            'is_important': r.is_important,
+            'done': r.done,
+            'created_at': r.created_at.strftime('%Y-%m-%d') if r.created_at else None,
+            'edit_url': f"/todos/edit/{r.id}/",
+        })
+    return items
+
+
+class Command(BaseCommand):
+    help = "Benchmark todo JSON serialization: model instances (legacy closure) vs values_list() rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated todo counts.")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+        self.stdout.write(f"{'todos':>8} {'legacy ms':>10} {'values ms':>10} {'stream ms':>10} {'speedup':>8}")
+
+        # Everything runs inside a transaction that is rolled back
+        with transaction.atomic():
+            for size in sizes:
+                user = bench.seed(users=1, todos=size, notes=0, prefix=f"bench_json_{size}")[0]
+                # Every todo gets a reminder so both paths serialize the same rows
+                Todo.objects.filter(user=user).update(reminder=timezone.now())
+                # Cloned with .all() per run, so no run reuses another's result cache
+                qs = Todo.objects.filter(user=user).order_by("reminder")
+
+                def legacy():
+                    json.dumps(legacy_reminder_items(qs.all()))
+
+                def values():
+                    json.dumps(serializers.REMINDER_ITEMS.serialize(qs.all()))
+
+                def stream():
+                    for _ in serializers.stream_json(qs.all(), serializers.REMINDER_ITEMS):
+                        pass
+
+                if legacy_reminder_items(qs.all()) != serializers.REMINDER_ITEMS.serialize(qs.all()):
+                    self.stderr.write(f"Output differs at {size} todos")
+                legacy_s = bench.best_of(options["repeat"], legacy)
+                values_s = bench.best_of(options["repeat"], values)
+                stream_s = bench.best_of(options["repeat"], stream)
+                self.stdout.write(
+                    f"{size:>8} {legacy_s * 1000:>10.2f} {values_s * 1000:>10.2f} "
+                    f"{stream_s * 1000:>10.2f} {legacy_s / values_s:>7.1f}x"
+                )
+            transaction.set_rollback(True)
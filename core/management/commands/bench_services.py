@@ -0,0 +1,83 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core import bench
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset and time every NoteService/TodoService/SearchService method "
+        "(p50/p95/p99, queries, rows); optionally diff against a baseline JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=3, help="Users to seed (default 3).")
+        parser.add_argument("--todos", type=int, default=500, help="Todos per user (default 500).")
+        parser.add_argument("--notes", type=int, default=100, help="Notes per user (default 100).")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the dataset.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per method (default 20).")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed runs per method (default 2).")
+        parser.add_argument("--only", help="Only benchmark methods whose label contains this text.")
+        parser.add_argument("--output", "-o", help="Write results as JSON to this file.")
+        parser.add_argument("--baseline", help="Results JSON to compare against.")
+        parser.add_argument("--threshold", type=float, default=0.2,
+                            help="Relative p50 slowdown that counts as a regression (default 0.2).")
+        parser.add_argument("--fail-on-regression", action="store_true",
+                            help="Exit with an error if any method regressed against the baseline.")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded data instead of rolling it back.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as handle:
+                baseline = json.load(handle)["results"]
+
+        dataset = {key: options[key] for key in ("users", "todos", "notes", "seed")}
+        now = timezone.now()
+        # Everything runs inside a transaction that is rolled back unless --keep
+        with transaction.atomic():
+            users = bench.seed(options["users"], options["todos"], options["notes"], options["seed"], now=now)
+            results = bench.run(users[0], options["repeat"], options["warmup"], options["only"], now=now)
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+        self.stdout.write(f"{'method':<45} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'rows':>6}")
+        for label, result in results.items():
+            self.stdout.write(
+                f"{label:<45} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                f"{result['queries']:>8} {result['rows']:>6}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump({"meta": bench.metadata(**dataset), "results": results}, handle, indent=2, sort_keys=True)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            self.report(bench.compare(baseline, results, options["threshold"]), options["fail_on_regression"])
+
+    def report(self, rows, fail):
+        self.stdout.write("")
+        self.stdout.write(f"{'method':<45} {'base p50':>9} {'p50':>9} {'ratio':>7} {'queries':>8}")
+        regressions = 0
+        for label, before, after, ratio, query_delta, regressed in rows:
+            if before is None:
+                self.stdout.write(f"{label:<45} {'-':>9} {after:>9.2f} {'new':>7}")
+                continue
+            line = (
+                f"{label:<45} {before:>9.2f} {after:>9.2f} "
+                f"{(f'{ratio:.2f}x' if ratio is not None else '-'):>7} {query_delta:>+8}"
+            )
+            if regressed:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line + "  REGRESSION"))
+            else:
+                self.stdout.write(line)
+
+        summary = f"{regressions} regression(s) against the baseline."
+        if regressions and fail:
+            raise CommandError(summary)
+        self.stdout.write(summary)
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import sync
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than --days; clients with older cursors resync from 0."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=getattr(settings, "SYNC_TOMBSTONE_DAYS", 30),
+            help="Keep tombstones this many days (default: SYNC_TOMBSTONE_DAYS or 30)",
+        )
+
+    def handle(self, *args, **options):
+        removed = sync.compact(timezone.now() - timedelta(days=options["days"]))
+        self.stdout.write(f"Removed {removed} tombstones")
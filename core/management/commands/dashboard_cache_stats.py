@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core import dashboard_cache
+
+
+class Command(BaseCommand):
+    help = "Show (and optionally reset) the dashboard cache hit/miss counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Reset the counters after printing them.")
+
+    def handle(self, *args, **options):
+        stats = dashboard_cache.stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} hit_ratio={stats['hit_ratio']:.1%}"
+        )
+        if options["reset"]:
+            dashboard_cache.reset_stats()
+            self.stdout.write("Counters reset.")
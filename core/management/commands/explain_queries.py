@@ -0,0 +1,96 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.bench import evaluate, service_calls
+
+# Plan lines that mean "no usable index for this access path"
+# (an FTS5 MATCH shows up as "SCAN <table> VIRTUAL TABLE INDEX", which is an index lookup)
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)(?! USING (COVERING )?INDEX| VIRTUAL TABLE INDEX)")
+SQLITE_TEMP_SORT = re.compile(r"USE TEMP B-TREE")
+POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+POSTGRES_SORT = re.compile(r"^\s*(->\s*)?Sort\b")
+
+
+def explain(sql):
+    """Return the plan for `sql` as a list of text lines."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute("EXPLAIN " + sql)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def tables():
+    return set(connection.introspection.table_names())
+
+
+def problems(plan):
+    """Return human-readable flags for full scans and temp sorts in a plan."""
+    flags = []
+    for line in plan:
+        if connection.vendor == "sqlite":
+            match = SQLITE_FULL_SCAN.search(line.strip())
+            # "SCAN qualify" / "SCAN (subquery-1)" walk an already-filtered subquery
+            if match and match.group(1) in tables():
+                flags.append(f"full scan of {match.group(1)}")
+            if SQLITE_TEMP_SORT.search(line):
+                flags.append("temp b-tree sort")
+        else:
+            match = POSTGRES_FULL_SCAN.search(line)
+            if match and match.group(1) in tables():
+                flags.append(f"full scan of {match.group(1)}")
+            if POSTGRES_SORT.search(line):
+                flags.append("explicit sort")
+    return flags
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN for every service query and flag full scans / temp sorts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username to build the queries for (defaults to the first user).")
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the plan of every query, not only flagged ones.")
+        parser.add_argument("--fail-on-flags", action="store_true", help="Exit with an error if any query is flagged.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user named {options['user']!r}")
+        else:
+            user = User.objects.order_by("pk").first()
+            if user is None:
+                raise CommandError("No users in the database; create one or pass --user.")
+
+        now = timezone.now()
+        flagged = 0
+        total = 0
+        for label, call in service_calls(user, now):
+            with CaptureQueriesContext(connection) as ctx:
+                evaluate(call())
+            for query in ctx.captured_queries:
+                total += 1
+                plan = explain(query["sql"])
+                flags = sorted(set(problems(plan)))
+                if flags:
+                    flagged += 1
+                    self.stdout.write(self.style.WARNING(f"[FLAG] {label}: {', '.join(flags)}"))
+                elif options["verbose_plans"]:
+                    self.stdout.write(self.style.SUCCESS(f"[ OK ] {label}"))
+                else:
+                    continue
+                self.stdout.write(f"    {query['sql']}")
+                for line in plan:
+                    self.stdout.write(f"      {line}")
+
+        summary = f"{total} queries explained, {flagged} flagged."
+        if flagged and options["fail_on_flags"]:
+            raise CommandError(summary)
+        self.stdout.write(summary)
@@ -0,0 +1,40 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import exports
+
+
+class Command(BaseCommand):
+    help = "Stream a user's notes or todos as CSV or NDJSON (optionally gzip) to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="Username to export.")
+        parser.add_argument("--kind", choices=sorted(exports.EXPORTS), default="todos")
+        parser.add_argument("--format", choices=sorted(exports.FORMATS), default="csv", dest="fmt")
+        parser.add_argument("--gzip", action="store_true", help="Compress the output.")
+        parser.add_argument("--output", "-o", help="Output file (default: stdout).")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']}")
+
+        chunks = exports.stream_export(user, options["kind"], options["fmt"], options["gzip"])
+        if options["output"]:
+            with open(options["output"], "wb") as handle:
+                written = self._write(handle, chunks)
+            self.stderr.write(f"Wrote {written} bytes to {options['output']}")
+        else:
+            self._write(getattr(self.stdout._out, "buffer", sys.stdout.buffer), chunks)
+
+    def _write(self, handle, chunks):
+        written = 0
+        for chunk in chunks:
+            handle.write(chunk)
+            written += len(chunk)
+        handle.flush()
+        return written
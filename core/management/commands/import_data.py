@@ -0,0 +1,58 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import imports
+
+
+class Command(BaseCommand):
+    help = "Bulk-import notes or todos for a user from CSV or NDJSON (optionally gzip)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or - for stdin.")
+        parser.add_argument("--user", required=True, help="Username to import into.")
+        parser.add_argument("--kind", choices=sorted(imports.IMPORTS), default="todos")
+        parser.add_argument("--format", choices=imports.FORMATS, dest="fmt",
+                            help="Input format (default: from the file extension, else csv).")
+        parser.add_argument("--gzip", action="store_true", help="Input is gzip-compressed (implied by a .gz path).")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk_create/transaction (default 1000).")
+        parser.add_argument("--rejects", help="Write rejected rows as NDJSON ({line, errors}) to this file.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']}")
+
+        path = options["path"]
+        fmt = options["fmt"] or imports.detect_format(path)
+        compressed = options["gzip"] or path.endswith(".gz")
+
+        rejects_file = open(options["rejects"], "w", encoding="utf-8") if options["rejects"] else None
+
+        def on_reject(line, errors):
+            if rejects_file:
+                rejects_file.write(json.dumps({"line": line, "errors": errors}) + "\n")
+            elif options["verbosity"] > 1:
+                self.stderr.write(f"Line {line}: {errors}")
+
+        importer = imports.BulkImporter(user, options["kind"], batch_size=options["batch_size"], on_reject=on_reject)
+        binary = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            report = importer.run(imports.parse_rows(imports.open_text(binary, compressed), fmt))
+        finally:
+            if binary is not sys.stdin.buffer:
+                binary.close()
+            if rejects_file:
+                rejects_file.close()
+
+        self.stdout.write(
+            f"Imported {report['created']} {options['kind']}, rejected {report['rejected']} "
+            f"in {report['elapsed']:.2f}s ({report['rows_per_second']} rows/s)"
+        )
+        if report["rejected"] and not rejects_file and options["verbosity"] <= 1:
+            for reject in report["rejects"][:10]:
+                self.stderr.write(f"Line {reject['line']}: {reject['errors']}")
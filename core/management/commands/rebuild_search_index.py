@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Note, Todo
+from core.search import KIND_NOTE, KIND_TODO, get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for all notes and todos."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            backend.clear()
+            for kind, model in ((KIND_NOTE, Note), (KIND_TODO, Todo)):
+                qs = model.objects.filter(user__isnull=False)
+                backend.index_many(kind, qs.iterator(chunk_size=2000))
+                self.stdout.write(f"Indexed {qs.count()} {kind}s")
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core import user_stats
+
+
+class Command(BaseCommand):
+    help = "Recount the materialized counters (UserStats) from the todos and notes and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", help="Only this user id (repeatable)")
+
+    def handle(self, *args, **options):
+        user_ids = options["user"] or get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+        checked = drifted = 0
+        for user_id in user_ids:
+            checked += 1
+            if user_stats.rebuild(user_id):
+                drifted += 1
+                self.stdout.write(f"Fixed user {user_id}")
+        self.stdout.write(f"Checked {checked} users, fixed {drifted}")
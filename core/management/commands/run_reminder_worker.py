@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.reminder_worker import BACKENDS, ReminderWorker, get_backend
+
+
+class Command(BaseCommand):
+    help = "Dispatch due todo reminders from an in-memory heap fed by the reminder outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backend", help=f"One of {', '.join(BACKENDS)} or a dotted path (default: REMINDER_BACKEND).")
+        parser.add_argument("--file", help="Output path for the file backend.")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds between outbox reads (default 1).")
+        parser.add_argument("--once", action="store_true", help="Load, dispatch everything already due and exit.")
+
+    def handle(self, *args, **options):
+        backend = get_backend(options["backend"], stream=self.stdout, path=options["file"])
+        worker = ReminderWorker(backend, log=self.stdout.write)
+        worker.load()
+        if options["once"]:
+            sent = worker.run_once()
+            self.stdout.write(f"Dispatched {sent} reminders")
+            return
+        try:
+            worker.run_forever(poll_interval=options["poll"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
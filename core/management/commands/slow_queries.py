@@ -0,0 +1,51 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core import slow_queries
+
+
+class Command(BaseCommand):
+    help = "Summarize the slow query log by fingerprint: count, p95 and total time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=getattr(settings, "SLOW_QUERY_LOG", "slow_queries.log"),
+                            help="Log file to read (default: SLOW_QUERY_LOG)")
+        parser.add_argument("--hours", type=float, help="Only entries from the last N hours")
+        parser.add_argument("--service", help="Only queries issued by this service method (e.g. TodoService.get_kanban_board)")
+        parser.add_argument("--limit", type=int, default=20, help="Fingerprints to show (default 20)")
+        parser.add_argument("--plans", action="store_true", help="Print the latest SQL and plan of each fingerprint")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["file"]) as handle:
+                entries = list(slow_queries.read(handle))
+        except FileNotFoundError:
+            raise CommandError(f"No slow query log at {options['file']}")
+
+        if options["hours"] is not None:
+            since = timezone.now() - timedelta(hours=options["hours"])
+            entries = [entry for entry in entries if parse_datetime(entry["at"]) >= since]
+        if options["service"]:
+            entries = [entry for entry in entries if entry.get("service") == options["service"]]
+
+        rows = slow_queries.summarize(entries)
+        if not rows:
+            self.stdout.write("No slow queries logged.")
+            return
+
+        self.stdout.write(f"{'fingerprint':<12}  {'count':>6}  {'p95 ms':>9}  {'total ms':>11}  source")
+        for row in rows[:options["limit"]]:
+            source = ", ".join(row["services"] + row["views"]) or "-"
+            self.stdout.write(
+                f"{row['fingerprint']:<12}  {row['count']:>6}  {row['p95_ms']:>9.1f}  {row['total_ms']:>11.1f}  {source}"
+            )
+            if options["plans"]:
+                latest = row["latest"]
+                self.stdout.write(f"    {latest['sql']}")
+                for line in latest.get("plan") or []:
+                    self.stdout.write(f"      {line}")
+        self.stdout.write(f"{len(rows)} fingerprints, {sum(row['count'] for row in rows)} slow queries.")
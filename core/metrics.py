@@ -0,0 +1,334 @@
+"""
+Process-local metrics, aggregated across gunicorn workers through files.
+
+Recording (``inc``, ``observe``, ``seen``) only updates dicts in this
+process's ``Registry`` under a lock. In a gunicorn worker (``worker_started``
+is called from the post_fork hook) a daemon thread writes the registry to
+``METRICS_DIR/<pid>.json`` every METRICS_FLUSH_INTERVAL seconds, and once
+more as the worker exits, so the request path never touches the disk.
+``/metrics`` (any worker) sums the files of all workers, with its own live
+values in place of its file, and renders the Prometheus text format.
+
+Files of exited workers are kept so counters never go backwards; they are
+removed when the server starts. gunicorn.conf.py gives every server start
+its own METRICS_DIR unless one is configured. Without METRICS_DIR, and in
+any process that isn't a server worker (tests, management commands), the
+metrics cover this process only.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+logger = logging.getLogger("core.metrics")
+
+PREFIX = "smartapp_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Windows (seconds) for the active users gauge
+ACTIVE_WINDOWS = {"5m": 5 * 60, "1h": 60 * 60}
+
+# name: (type, help)
+METRICS = {
+    "http_request_duration_seconds": ("histogram", "Request latency by URL name and method."),
+    "http_responses_total": ("counter", "Responses by URL name and status code."),
+    "db_queries_total": ("counter", "SQL queries executed."),
+    "db_query_duration_seconds_total": ("counter", "Time spent executing SQL queries."),
+    "cache_hits_total": ("counter", "Cache lookups that hit, by cache."),
+    "cache_misses_total": ("counter", "Cache lookups that missed, by cache."),
+    "cache_hit_ratio": ("gauge", "Hits over lookups since the server started, by cache."),
+    "reminder_polls_total": ("counter", "Reminder status polls by status code (304 = unchanged)."),
+    "active_users": ("gauge", "Distinct users with a request in the window."),
+}
+
+
+def directory():
+    return getattr(settings, "METRICS_DIR", None) or None
+
+
+def flush_interval():
+    return getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (name, labels): value
+        self.counters = {}
+        # (name, labels): [count per bucket (last one is +Inf), sum]
+        self.histograms = {}
+        # user id (as a string, like in the files): time last seen
+        self.users = {}
+        self.flusher = None
+        # One flush at a time (the flush thread and worker_exit)
+        self.flush_lock = threading.Lock()
+
+    def inc(self, name, value, labels):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels):
+        key = (name, labels)
+        bucket = bisect_left(LATENCY_BUCKETS, value)
+        with self.lock:
+            entry = self.histograms.get(key)
+            if entry is None:
+                entry = self.histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+            entry[0][bucket] += 1
+            entry[1] += value
+
+    def add_query(self, alias, seconds):
+        labels = (("alias", alias),)
+        count_key, time_key = ("db_queries_total", labels), ("db_query_duration_seconds_total", labels)
+        with self.lock:
+            self.counters[count_key] = self.counters.get(count_key, 0) + 1
+            self.counters[time_key] = self.counters.get(time_key, 0) + seconds
+        self.start_flusher()
+
+    def seen(self, user_id, now):
+        with self.lock:
+            self.users[str(user_id)] = now
+
+    def snapshot(self):
+        """JSON-serializable copy of the registry."""
+        horizon = time.time() - max(ACTIVE_WINDOWS.values())
+        with self.lock:
+            # Forget users that no window can count any more
+            for user_id in [user_id for user_id, at in self.users.items() if at < horizon]:
+                del self.users[user_id]
+            return {
+                "counters": [[name, labels, value] for (name, labels), value in self.counters.items()],
+                "histograms": [[name, labels, list(buckets), total]
+                               for (name, labels), (buckets, total) in self.histograms.items()],
+                "users": dict(self.users),
+            }
+
+    # ---------------------------
+    # Files
+    # ---------------------------
+
+    def start_flusher(self):
+        if self.flusher is None and _worker and directory():
+            self.flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+            self.flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(flush_interval())
+            try:
+                self.flush()
+            except OSError:
+                # e.g. the directory was removed; try again next interval
+                logger.exception("Writing the metrics file failed")
+
+    def flush(self):
+        """Write this process's snapshot to METRICS_DIR (atomically)."""
+        path = directory()
+        if not path:
+            return
+        with self.flush_lock:
+            os.makedirs(path, exist_ok=True)
+            # A unique temporary name, so a concurrent clear() or flush can't pull it away
+            fd, temp_name = tempfile.mkstemp(dir=path, prefix=f"{os.getpid()}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as handle:
+                    json.dump(self.snapshot(), handle)
+                os.replace(temp_name, os.path.join(path, f"{os.getpid()}.json"))
+            except BaseException:
+                try:
+                    os.remove(temp_name)
+                except OSError:
+                    pass
+                raise
+
+
+_registry = Registry()
+
+# Whether this process is a server worker, the only kind that writes a file
+_worker = False
+
+
+def _reset_after_fork():
+    # A forked worker starts from zero; its parent's values are in the parent's file
+    global _registry
+    _registry = Registry()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def worker_started():
+    """Let this process write its metrics file; called from gunicorn's post_fork hook."""
+    global _worker
+    _worker = True
+
+
+def inc(name, value=1, **labels):
+    _registry.inc(name, value, _labels(labels))
+    _registry.start_flusher()
+
+
+def observe(name, value, **labels):
+    _registry.observe(name, value, _labels(labels))
+    _registry.start_flusher()
+
+
+def seen(user_id):
+    """Count the user as active now."""
+    _registry.seen(user_id, time.time())
+
+
+def flush():
+    _registry.flush()
+
+
+def clear():
+    """Remove all workers' files; call once before the workers start."""
+    path = directory()
+    if not path or not os.path.isdir(path):
+        return
+    for name in os.listdir(path):
+        if name.endswith(".json") or name.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+
+
+# ---------------------------
+# Instrumentation hooks
+# ---------------------------
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting queries and their time (see ``install``)."""
+    start_time = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start_time
+        _registry.add_query(context["connection"].alias, elapsed)
+
+
+def install(sender=None, connection=None, **kwargs):
+    """connection_created handler: add record_query to the connection's execute wrappers."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def record_request(request, response, seconds):
+    """Called by ServerTimingMiddleware once per response."""
+    match = request.resolver_match
+    view = match.view_name if match is not None else "unmatched"
+    observe("http_request_duration_seconds", seconds, view=view, method=request.method)
+    inc("http_responses_total", view=view, status=str(response.status_code))
+    # Only if the view loaded the user anyway (see core.middleware.get_request_user)
+    user = getattr(request, "_cached_user", None)
+    if user is not None and user.is_authenticated:
+        seen(user.pk)
+
+
+def record_cache(cache_name, hits=0, misses=0):
+    if hits:
+        inc("cache_hits_total", hits, cache=cache_name)
+    if misses:
+        inc("cache_misses_total", misses, cache=cache_name)
+
+
+# ---------------------------
+# Exposition
+# ---------------------------
+
+def collect():
+    """Snapshots of every worker, this process's live one included."""
+    snapshots = [_registry.snapshot()]
+    path = directory()
+    if not path or not os.path.isdir(path):
+        return snapshots
+    own = f"{os.getpid()}.json"
+    for name in os.listdir(path):
+        if not name.endswith(".json") or name == own:
+            continue
+        try:
+            with open(os.path.join(path, name)) as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError):
+            # Removed or replaced while listing
+            continue
+    return snapshots
+
+
+def merge(snapshots):
+    """(counters, histograms, users) summed over the snapshots."""
+    counters, histograms, users = {}, {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, buckets, total in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            entry = histograms.setdefault(key, [[0] * len(buckets), 0.0])
+            entry[0] = [a + b for a, b in zip(entry[0], buckets)]
+            entry[1] += total
+        for user_id, at in snapshot["users"].items():
+            users[user_id] = max(at, users.get(user_id, 0))
+    return counters, histograms, users
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshots=None):
+    """Prometheus text exposition format (version 0.0.4)."""
+    counters, histograms, users = merge(collect() if snapshots is None else snapshots)
+
+    # Derived gauges
+    now = time.time()
+    gauges = {
+        ("active_users", (("window", window),)): sum(1 for at in users.values() if at >= now - seconds)
+        for window, seconds in ACTIVE_WINDOWS.items()
+    }
+    caches = {labels for name, labels in counters if name in ("cache_hits_total", "cache_misses_total")}
+    for labels in caches:
+        hits = counters.get(("cache_hits_total", labels), 0)
+        lookups = hits + counters.get(("cache_misses_total", labels), 0)
+        gauges[("cache_hit_ratio", labels)] = hits / lookups
+
+    samples = {}
+    for (name, labels), value in {**counters, **gauges}.items():
+        samples.setdefault(name, []).append(f"{PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+    for (name, labels), (buckets, total) in histograms.items():
+        lines = samples.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+            cumulative += count
+            lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {cumulative}")
+
+    output = []
+    for name, (kind, help_text) in METRICS.items():
+        if name not in samples:
+            continue
+        output.append(f"# HELP {PREFIX}{name} {help_text}")
+        output.append(f"# TYPE {PREFIX}{name} {kind}")
+        output.extend(sorted(samples[name]))
+    return "\n".join(output) + "\n"
@@ -0,0 +1,112 @@
+import json
+import logging
+import random
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from . import instrumentation, metrics, slow_queries, user_cache
+
+logger = logging.getLogger("core.timing")
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header (db, render, app and total time, and the
+    query count) and logs one JSON line per request, with the queries
+    grouped by the service method that issued them.
+
+    Only a SERVER_TIMING_SAMPLE_RATE fraction of requests (default 0.05) is
+    instrumented. The rest only get the total. Every request is counted in
+    the /metrics latency histograms (core.metrics), and slow queries are
+    attributed to the request's view (core.slow_queries).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "SERVER_TIMING_SAMPLE_RATE", 0.05)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing, token = instrumentation.start(self.sampled())
+        request_token = slow_queries.track(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            slow_queries.untrack(request_token)
+            instrumentation.stop(token)
+        return self.finish(request, response, timing, token is not None)
+
+    async def __acall__(self, request):
+        timing, token = instrumentation.start(self.sampled())
+        request_token = slow_queries.track(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            slow_queries.untrack(request_token)
+            instrumentation.stop(token)
+        return self.finish(request, response, timing, token is not None)
+
+    def finish(self, request, response, timing, sampled):
+        total_ms = timing.elapsed() * 1000
+        metrics.record_request(request, response, total_ms / 1000)
+        if not sampled:
+            response["Server-Timing"] = f"total;dur={total_ms:.1f}"
+            return response
+
+        db_ms = timing.db_seconds * 1000
+        render_ms = timing.render_seconds * 1000
+        app_ms = max(total_ms - db_ms - render_ms, 0)
+        response["Server-Timing"] = ", ".join([
+            f'db;desc="{timing.queries} queries";dur={db_ms:.1f}',
+            f"render;dur={render_ms:.1f}",
+            f"app;dur={app_ms:.1f}",
+            f"total;dur={total_ms:.1f}",
+        ])
+        logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "db_ms": round(db_ms, 2),
+            "queries": timing.queries,
+            "render_ms": round(render_ms, 2),
+            "services": {
+                method or "-": {"queries": count, "ms": round(seconds * 1000, 2)}
+                for method, (count, seconds) in timing.by_method.items()
+            },
+        }))
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware that loads the user through core.user_cache."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_request_user(request))
+        request.auser = partial(aget_request_user, request)
+
+
+def get_request_user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = user_cache.get_user(request)
+    return request._cached_user
+
+
+async def aget_request_user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = await sync_to_async(user_cache.get_user)(request)
+    return request._cached_user
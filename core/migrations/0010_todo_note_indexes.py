@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_todo_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['user', '-created_at'], name='note_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['user', 'done', 'reminder'], name='todo_user_done_reminder_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('done', False), ('reminder__isnull', False)), fields=['user', 'reminder'], name='todo_pending_reminder_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['user', 'status', '-is_important', 'created_at'], name='todo_kanban_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['user', 'due_date', 'done'], name='todo_user_due_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(condition=models.Q(('done', False)), fields=['user', 'due_date'], name='todo_pending_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['user', '-created_at'], name='todo_user_created_idx'),
+        ),
+    ]
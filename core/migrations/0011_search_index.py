@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from core.search import KIND_NOTE, KIND_TODO, get_search_backend
+
+
+def create_search_index(apps, schema_editor):
+    backend = get_search_backend(schema_editor.connection.vendor)
+    backend.create_schema(schema_editor)
+
+    # Backfill existing rows
+    Note = apps.get_model("core", "Note")
+    Todo = apps.get_model("core", "Todo")
+    for kind, model in ((KIND_NOTE, Note), (KIND_TODO, Todo)):
+        backend.index_many(kind, model.objects.filter(user__isnull=False).iterator(chunk_size=2000))
+
+
+def drop_search_index(apps, schema_editor):
+    get_search_backend(schema_editor.connection.vendor).drop_schema(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_todo_note_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
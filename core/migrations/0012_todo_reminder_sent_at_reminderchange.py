@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('todo_id', models.BigIntegerField()),
+                ('reminder', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='todo',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_todo_reminder_sent_at_reminderchange'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['user', 'status', '-created_at', '-id'], name='todo_kanban_recent_idx'),
+        ),
+    ]
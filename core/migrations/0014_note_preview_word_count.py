@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:19
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+from core.search import html_to_text
+
+
+def backfill_previews(apps, schema_editor):
+    Note = apps.get_model("core", "Note")
+    batch = []
+    for note in Note.objects.only("id", "content").iterator(chunk_size=500):
+        text = html_to_text(note.content)
+        note.preview = Truncator(text).chars(200)
+        note.word_count = len(text.split())
+        batch.append(note)
+        if len(batch) >= 500:
+            Note.objects.bulk_update(batch, ["preview", "word_count"])
+            batch = []
+    if batch:
+        Note.objects.bulk_update(batch, ["preview", "word_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_todo_kanban_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='preview',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_previews, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    # When existing rows last changed is unknown; creation time is the best guess
+    for name in ("Note", "Todo"):
+        apps.get_model("core", name).objects.update(updated_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_note_preview_word_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="todo",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
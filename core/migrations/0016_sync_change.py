@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:51
+
+from django.db import migrations, models
+
+
+def backfill_changes(apps, schema_editor):
+    # Every existing row gets an entry, so a sync from cursor 0 sees them all
+    SyncChange = apps.get_model("core", "SyncChange")
+    for kind, name in (("note", "Note"), ("todo", "Todo")):
+        rows = (
+            apps.get_model("core", name).objects.filter(user__isnull=False)
+            .order_by("updated_at", "id").values_list("user_id", "id")
+        )
+        batch = []
+        for user_id, object_id in rows.iterator(chunk_size=2000):
+            batch.append(SyncChange(user_id=user_id, kind=kind, object_id=object_id))
+            if len(batch) >= 2000:
+                SyncChange.objects.bulk_create(batch)
+                batch = []
+        SyncChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_note_todo_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField()),
+                ('kind', models.CharField(max_length=8)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', 'id'], name='sync_user_cursor_idx'), models.Index(fields=['kind', 'object_id'], name='sync_object_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_changes, migrations.RunPython.noop),
+    ]
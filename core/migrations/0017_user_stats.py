@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+STATUS_FIELDS = {"PENDING": "pending", "IN_PROGRESS": "in_progress", "COMPLETED": "completed"}
+
+
+def backfill_stats(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Note = apps.get_model("core", "Note")
+    Todo = apps.get_model("core", "Todo")
+    UserStats = apps.get_model("core", "UserStats")
+    UserMonthStats = apps.get_model("core", "UserMonthStats")
+
+    stats = {pk: UserStats(user_id=pk) for pk in User.objects.values_list("pk", flat=True)}
+    notes = Note.objects.filter(user__isnull=False).order_by().values_list("user").annotate(n=Count("pk"))
+    for user_id, n in notes:
+        stats[user_id].notes_count = n
+    todos = Todo.objects.filter(user__isnull=False).order_by()
+    for user_id, status, n in todos.values_list("user", "status").annotate(n=Count("pk")):
+        setattr(stats[user_id], STATUS_FIELDS[status], n)
+    important = todos.filter(is_important=True, done=False).values_list("user").annotate(n=Count("pk"))
+    for user_id, n in important:
+        stats[user_id].important_pending = n
+    UserStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+    months = (
+        todos.filter(due_date__isnull=False)
+        .annotate(month=TruncMonth("due_date"))
+        .values_list("user", "month")
+        .annotate(pending=Count("pk", filter=Q(done=False)), completed=Count("pk", filter=Q(done=True)))
+    )
+    UserMonthStats.objects.bulk_create(
+        [UserMonthStats(user_id=user_id, month=month, pending=pending, completed=completed)
+         for user_id, month, pending, completed in months],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0016_sync_change'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('notes_count', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('important_pending', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserMonthStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('pending', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='month_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'month'), name='user_month_stats_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_user_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstats',
+            name='reminders_version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
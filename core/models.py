@@ -1,13 +1,45 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.contrib.auth.models import User
+from django.utils.text import Truncator
+
+from .search import html_to_text
 
 class Note(models.Model):
+    PREVIEW_LENGTH = 200
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save; part of the rendered card cache key (core.fragment_cache)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Plain-text summary of the Quill HTML, computed on save so list pages
+    # never have to load or parse the full content
+    preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True, default='', editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # NoteService.list_all
+            models.Index(fields=["user", "-created_at"], name="note_user_created_idx"),
+        ]
+
+    def update_preview(self):
+        """Recompute preview and word_count from content."""
+        text = html_to_text(self.content)
+        self.preview = Truncator(text).chars(self.PREVIEW_LENGTH)
+        self.word_count = len(text.split())
+
+    def save(self, *args, **kwargs):
+        # Skip when content was deferred (it can't have been edited)
+        if "content" in self.__dict__:
+            self.update_preview()
+        # The post_save handlers (counters, sync log) commit with the row
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
@@ -31,6 +63,8 @@ class Todo(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save; queryset .update() calls must set it themselves
+    updated_at = models.DateTimeField(auto_now=True)
     due_date = models.DateField(null=True, blank=True)  # optional due date
 
     # Activities: choices plus an optional custom text field
@@ -47,21 +81,50 @@ class Todo(models.Model):
         (ACTIVITY_WORKOUT, 'Workout'),
         (ACTIVITY_OTHER, 'Other (custom)')
     ]
+    ACTIVITY_LABELS = dict(ACTIVITY_CHOICES)
 
     activity = models.CharField(max_length=50, choices=ACTIVITY_CHOICES, default=ACTIVITY_OTHER)
     activity_custom = models.CharField(max_length=100, blank=True, default='')
 
     # Reminder datetime (optional)
     reminder = models.DateTimeField(null=True, blank=True)
+    # Set by the reminder worker once the reminder has been dispatched
+    reminder_sent_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     # Priority marker - user can mark if task is important
     is_important = models.BooleanField(default=False)
 
+    class Meta:
+        # One index per TodoService access path (see `manage.py explain_queries`)
+        indexes = [
+            # Dashboard counters and reminders (done / reminder filters)
+            models.Index(fields=["user", "done", "reminder"], name="todo_user_done_reminder_idx"),
+            # Reminder lists and polling only ever look at pending todos with a reminder
+            models.Index(
+                fields=["user", "reminder"],
+                condition=models.Q(done=False, reminder__isnull=False),
+                name="todo_pending_reminder_idx",
+            ),
+            # Kanban columns: status filter, ordered by -is_important, created_at
+            models.Index(fields=["user", "status", "-is_important", "created_at"], name="todo_kanban_idx"),
+            # Completed column: newest first with the id tiebreak used by keyset pages
+            models.Index(fields=["user", "status", "-created_at", "-id"], name="todo_kanban_recent_idx"),
+            # Calendar, daily focus and monthly stats (due_date ranges)
+            models.Index(fields=["user", "due_date", "done"], name="todo_user_due_done_idx"),
+            models.Index(
+                fields=["user", "due_date"],
+                condition=models.Q(done=False),
+                name="todo_pending_due_idx",
+            ),
+            # list_all and the completed Kanban column
+            models.Index(fields=["user", "-created_at"], name="todo_user_created_idx"),
+        ]
+
     def get_activity_display(self):
         """Return the display label for the activity, preferring custom text when set."""
         if self.activity == self.ACTIVITY_OTHER and self.activity_custom:
             return self.activity_custom
-        return dict(self.ACTIVITY_CHOICES).get(self.activity, self.activity)
+        return self.ACTIVITY_LABELS.get(self.activity, self.activity)
 
     def clean(self):
         """Model-level validation for due_date."""
@@ -74,7 +137,24 @@ class Todo(models.Model):
             if self.due_date < timezone.now().date():
                 raise ValidationError({'due_date': 'Due date cannot be in the past.'})
 
-    def save(self, *args, **kwargs):
+    # What UserStats counts a todo under (see core.user_stats)
+    COUNTER_FIELDS = ("user_id", "status", "is_important", "due_date")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the reminder schedule as loaded so save() can tell when it changed
+        instance._loaded_schedule = (instance.__dict__.get("reminder"), instance.__dict__.get("done"))
+        # Likewise for the counters; unknown if any of their fields was deferred
+        if all(name in instance.__dict__ for name in cls.COUNTER_FIELDS):
+            instance._loaded_counts = instance.counter_state()
+        return instance
+
+    def counter_state(self):
+        return tuple(getattr(self, name) for name in self.COUNTER_FIELDS)
+
+    def sync_status(self):
+        """Keep the legacy `done` flag and `status` consistent (also used by bulk paths that skip save())."""
         # Sync status based on done
         if self.done and self.status != self.STATUS_COMPLETED:
             self.status = self.STATUS_COMPLETED
@@ -86,8 +166,26 @@ class Todo(models.Model):
             self.done = True
         else:
             self.done = False
-            
-        super().save(*args, **kwargs)
+
+    def save(self, *args, **kwargs):
+        self.sync_status()
+
+        # A rescheduled reminder has to be dispatched again
+        loaded_reminder, loaded_done = getattr(self, "_loaded_schedule", (None, False))
+        if self.reminder != loaded_reminder:
+            self.reminder_sent_at = None
+        schedule = (self.reminder, self.done)
+        self._schedule_changed = schedule != (loaded_reminder, loaded_done)
+
+        if not self._state.adding and getattr(self, "_loaded_counts", None) is None:
+            # Loaded with deferred fields: read what the counters last saw
+            self._loaded_counts = (
+                type(self)._base_manager.filter(pk=self.pk).values_list(*self.COUNTER_FIELDS).first()
+            )
+        # The post_save handlers (counters, outbox, sync log) commit with the row
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+        self._loaded_schedule = schedule
 
     def __str__(self):
         # show custom activity when provided
@@ -96,3 +194,86 @@ class Todo(models.Model):
         if self.reminder:
             return f"{self.task} [{activity_display}] (reminder: {self.reminder})"
         return f"{self.task} [{activity_display}]"
+
+
+class ReminderChange(models.Model):
+    """
+    Outbox of reminder schedule changes, tailed by the reminder worker so it
+    can update its in-memory schedule without rescanning the todo table.
+    `reminder` is None when the todo no longer has a pending reminder.
+    """
+    todo_id = models.BigIntegerField()
+    reminder = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"todo {self.todo_id} -> {self.reminder}"
+
+
+class SyncChange(models.Model):
+    """
+    Change log behind /sync/changes/: the latest change of every note and
+    todo. `id` is the sync cursor. Recording a change replaces the object's
+    previous entry (core.sync), so the log holds one row per object, and
+    deletions stay as tombstones. A "reset" row marks the point up to which
+    tombstones have been pruned (manage.py compact_changes).
+    """
+    KIND_NOTE = "note"
+    KIND_TODO = "todo"
+    KIND_RESET = "reset"
+
+    # Not a ForeignKey: entries are written while a user's notes are being
+    # cascade-deleted, after the collector has gathered the related rows
+    user_id = models.BigIntegerField()
+    kind = models.CharField(max_length=8)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # SyncService.changes: a user's entries after a cursor
+            models.Index(fields=["user_id", "id"], name="sync_user_cursor_idx"),
+            # core.sync.record replaces an object's previous entry
+            models.Index(fields=["kind", "object_id"], name="sync_object_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}{' (deleted)' if self.deleted else ''}"
+
+
+class UserStats(models.Model):
+    """
+    Materialized dashboard counters, kept up to date by core.user_stats as
+    todos and notes change (`manage.py rebuild_user_stats` reconciles them).
+    Todos are counted by status; `important_pending` is important and not done.
+    `reminders_version` goes up with every write to the user's todos (the
+    reminders status ETag).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    notes_count = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    important_pending = models.IntegerField(default=0)
+    reminders_version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"stats for user {self.user_id}"
+
+
+class UserMonthStats(models.Model):
+    """Todos due in `month` (its first day), by done state; see UserStats."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="month_stats")
+    month = models.DateField()
+    pending = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "month"], name="user_month_stats_unique"),
+        ]
+
+    def __str__(self):
+        return f"user {self.user_id} {self.month:%Y-%m}"
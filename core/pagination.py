@@ -0,0 +1,84 @@
+"""
+Keyset (cursor) pagination.
+
+A page is fetched with a WHERE clause that continues strictly after the last
+row of the previous page, e.g. for ``(-created_at, -id)``::
+
+    created_at < c OR (created_at = c AND id < i)
+
+so deep pages cost the same as the first one, unlike OFFSET. The ordering
+must end with a unique field (``id``) so every row has a distinct position
+and no row is skipped or repeated between pages, even when rows are added
+in the meantime.
+
+Cursors are opaque url-safe tokens holding the ordering values of the last
+row returned.
+"""
+import base64
+import json
+import operator
+from functools import reduce
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+    if not isinstance(values, list):
+        raise InvalidCursor("Malformed cursor")
+    return values
+
+
+def _field_names(ordering):
+    return [name.lstrip("-") for name in ordering]
+
+
+def keyset_filter(model, ordering, values):
+    """Q selecting the rows that sort strictly after `values` in `ordering`."""
+    names = _field_names(ordering)
+    if len(values) != len(names):
+        raise InvalidCursor("Cursor does not match this ordering")
+    try:
+        values = [model._meta.get_field(name).to_python(value) for name, value in zip(names, values)]
+    except Exception as exc:
+        raise InvalidCursor("Cursor does not match this ordering") from exc
+
+    steps = []
+    for i, order in enumerate(ordering):
+        lookup = "lt" if order.startswith("-") else "gt"
+        step = Q(**{f"{names[i]}__{lookup}": values[i]})
+        for name, value in zip(names[:i], values[:i]):
+            step &= Q(**{name: value})
+        steps.append(step)
+    return reduce(operator.or_, steps)
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=20):
+    """
+    Return (items, next_cursor) for one page of `queryset` sorted by
+    `ordering` (field names, "-" for descending, ending with a unique field).
+    next_cursor is None on the last page.
+    """
+    qs = queryset.order_by(*ordering)
+    if cursor:
+        qs = qs.filter(keyset_filter(queryset.model, ordering, decode_cursor(cursor)))
+
+    items = list(qs[:page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+    items = items[:page_size]
+    last = items[-1]
+    return items, encode_cursor([getattr(last, name) for name in _field_names(ordering)])
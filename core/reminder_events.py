@@ -0,0 +1,120 @@
+"""
+Server-Sent Events stream of reminder status (ASGI only).
+
+Each open stream holds a Subscription. The todo signal handlers call
+``notify_user`` once a change commits, which wakes that user's streams
+immediately. Otherwise a stream sleeps until the next moment a reminder
+turns overdue or "soon", or until the heartbeat elapses. The heartbeat
+also catches changes made in other worker processes, which can't notify
+this one: every wake-up reads the reminders ETag from the database
+(``TodoService.get_reminders_etag``, one query) and only reads the payload
+when it moved.
+
+Events carry the same payload as ``TodoService.get_reminders_status_data``
+and are only sent when that payload (ignoring "now") has changed.
+"""
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+_subscribers = {}
+_lock = threading.Lock()
+
+
+class Subscription:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def notify(self):
+        """Wake the stream; safe to call from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            # Event loop already closed; the stream is gone
+            pass
+
+    async def wait(self, timeout):
+        """Return True if notified, False if `timeout` seconds passed first."""
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.event.clear()
+        return True
+
+
+def subscribe(user_id):
+    subscription = Subscription(user_id)
+    with _lock:
+        _subscribers.setdefault(user_id, set()).add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription):
+    with _lock:
+        subscriptions = _subscribers.get(subscription.user_id)
+        if subscriptions:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del _subscribers[subscription.user_id]
+
+
+def notify_user(user_id):
+    with _lock:
+        subscriptions = list(_subscribers.get(user_id, ()))
+    for subscription in subscriptions:
+        subscription.notify()
+
+
+def heartbeat_seconds():
+    return getattr(settings, "REMINDER_STREAM_HEARTBEAT", 25)
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def reminder_stream(service):
+    """Async generator of SSE chunks for the service's user."""
+    subscription = subscribe(service.user.pk)
+    state = {"etag": None, "snapshot": None, "next_change": None}
+
+    def refresh(now):
+        """Return the payload if it changed since the last event, else None."""
+        etag, state["next_change"] = service.get_reminders_etag(now)
+        if etag == state["etag"]:
+            return None
+        state["etag"] = etag
+        data = service.get_reminders_status_data(now)
+        snapshot = {key: value for key, value in data.items() if key != "now"}
+        if snapshot == state["snapshot"]:
+            return None
+        state["snapshot"] = snapshot
+        return data
+
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            data = await sync_to_async(refresh)(timezone.now())
+            if data is not None:
+                yield format_event("reminders", data, state["etag"].strip('"'))
+
+            timeout = heartbeat_seconds()
+            if state["next_change"] is not None:
+                until_change = (state["next_change"] - timezone.now()).total_seconds()
+                timeout = min(timeout, max(until_change, 0) + 0.05)
+            if not await subscription.wait(timeout):
+                yield ": keepalive\n\n"
+    finally:
+        unsubscribe(subscription)
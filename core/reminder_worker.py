@@ -0,0 +1,302 @@
+"""
+Reminder dispatch worker (``manage.py run_reminder_worker``).
+
+Pending reminders are read from the todo table once at start-up into a
+min-heap. After that the worker only tails the ReminderChange outbox, which
+``core.signals`` fills whenever a todo's reminder schedule changes, so it
+never rescans the todo table.
+
+Outbox ids are assigned on insert but become visible on commit, so with
+concurrent writers (PostgreSQL) a lower id can appear after a higher one.
+The worker remembers which ids above its cursor it has applied and only
+moves the cursor over a missing id once it has stayed missing for
+REMINDER_OUTBOX_GAP_SECONDS (its transaction rolled back, or is taken to
+have).
+
+Dispatch is idempotent. A reminder is claimed with a conditional UPDATE
+that sets ``Todo.reminder_sent_at``; only the worker whose UPDATE matched
+sends it. If the backend fails, the claim is released and the reminder is
+retried REMINDER_RETRY_SECONDS later.
+"""
+import heapq
+import json
+import logging
+import sys
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import sync
+from .models import ReminderChange, SyncChange, Todo
+
+logger = logging.getLogger("core.reminder_worker")
+
+
+def retry_seconds():
+    return getattr(settings, "REMINDER_RETRY_SECONDS", 60)
+
+
+def gap_seconds():
+    return getattr(settings, "REMINDER_OUTBOX_GAP_SECONDS", 60)
+
+
+class ReminderScheduler:
+    """
+    Min-heap of (reminder timestamp, todo id) with lazy cancellation: the
+    `scheduled` dict holds the live timestamp per todo, heap entries that no
+    longer match it are skipped when popped.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.scheduled = {}
+
+    def __len__(self):
+        return len(self.scheduled)
+
+    def load(self, entries):
+        """Bulk-load (todo_id, reminder) pairs in O(n)."""
+        for todo_id, reminder in entries:
+            self.scheduled[todo_id] = reminder.timestamp()
+        self.heap = [(ts, todo_id) for todo_id, ts in self.scheduled.items()]
+        heapq.heapify(self.heap)
+
+    def schedule(self, todo_id, reminder):
+        ts = reminder.timestamp()
+        self.scheduled[todo_id] = ts
+        heapq.heappush(self.heap, (ts, todo_id))
+
+    def cancel(self, todo_id):
+        self.scheduled.pop(todo_id, None)
+
+    def _discard_stale(self):
+        while self.heap and self.scheduled.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+
+    def next_due(self):
+        """Timestamp of the earliest live reminder, or None."""
+        self._discard_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now_ts):
+        """Remove and return [(todo_id, timestamp)] for every reminder at or before now."""
+        due = []
+        while True:
+            self._discard_stale()
+            if not self.heap or self.heap[0][0] > now_ts:
+                return due
+            ts, todo_id = heapq.heappop(self.heap)
+            del self.scheduled[todo_id]
+            due.append((todo_id, ts))
+
+
+# ---------------------------
+# Dispatch backends
+# ---------------------------
+
+def reminder_payload(todo):
+    return {
+        "id": todo.id,
+        "user": todo.user.username if todo.user else None,
+        "task": todo.task,
+        "reminder": todo.reminder.isoformat(),
+        "due_date": todo.due_date.isoformat() if todo.due_date else None,
+    }
+
+
+class ConsoleBackend:
+    def __init__(self, stream=None, **options):
+        self.stream = stream or sys.stdout
+
+    def send(self, todo):
+        self.stream.write(f"Reminder: {todo.task} ({todo.reminder:%Y-%m-%d %H:%M}) for {todo.user}\n")
+
+
+class FileBackend:
+    """Appends one JSON line per reminder."""
+
+    def __init__(self, path=None, **options):
+        self.path = path or getattr(settings, "REMINDER_FILE_PATH", "reminders.log")
+
+    def send(self, todo):
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(reminder_payload(todo)) + "\n")
+
+
+class EmailBackend:
+    """Sends through Django's mail layer (point EMAIL_BACKEND/EMAIL_HOST at a local SMTP stub)."""
+
+    def __init__(self, **options):
+        self.from_email = getattr(settings, "REMINDER_FROM_EMAIL", None)
+
+    def send(self, todo):
+        if not todo.user or not todo.user.email:
+            return
+        send_mail(
+            subject=f"Reminder: {todo.task}",
+            message=f"Your task \"{todo.task}\" is due ({todo.reminder:%Y-%m-%d %H:%M}).",
+            from_email=self.from_email,
+            recipient_list=[todo.user.email],
+        )
+
+
+BACKENDS = {
+    "console": ConsoleBackend,
+    "file": FileBackend,
+    "email": EmailBackend,
+}
+
+
+def get_backend(name=None, **options):
+    name = name or getattr(settings, "REMINDER_BACKEND", "console")
+    backend_class = BACKENDS.get(name) or import_string(name)
+    return backend_class(**options)
+
+
+# ---------------------------
+# Worker
+# ---------------------------
+
+class ReminderWorker:
+    def __init__(self, backend, batch_size=1000, log=None):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.scheduler = ReminderScheduler()
+        # Every outbox id up to here is applied (or was given up on)
+        self.last_change_id = 0
+        # Ids above last_change_id already applied, and missing ones: {id: monotonic time first missed}
+        self.applied = set()
+        self.gaps = {}
+        self.log = log or (lambda message: None)
+
+    def load(self):
+        """One pass over pending reminders; changes after this point come from the outbox."""
+        # Read the outbox position first so nothing written during the load is missed.
+        # Entries from the gap window are taken as applied (the load sees their rows);
+        # ids missing among them may still commit and are waited for.
+        horizon = timezone.now() - timedelta(seconds=gap_seconds())
+        self.last_change_id = (
+            ReminderChange.objects.filter(created_at__lt=horizon).order_by("-id").values_list("id", flat=True).first()
+            or 0
+        )
+        self.applied = set(ReminderChange.objects.filter(id__gt=self.last_change_id).values_list("id", flat=True))
+        if not self.last_change_id and self.applied:
+            # Older entries were pruned; don't wait for ids below the first one left
+            self.last_change_id = min(self.applied) - 1
+        self.gaps = {}
+        self._advance(time.monotonic())
+        pending = (
+            Todo.objects.filter(reminder__isnull=False, done=False, reminder_sent_at__isnull=True)
+            .values_list("id", "reminder")
+            .iterator(chunk_size=20000)
+        )
+        self.scheduler.load(pending)
+        self.log(f"Loaded {len(self.scheduler)} pending reminders")
+
+    def apply_changes(self, now=None):
+        """Apply outbox entries not applied yet; returns how many were read."""
+        changes = list(
+            ReminderChange.objects.filter(id__gt=self.last_change_id)
+            .exclude(id__in=self.applied)
+            .order_by("id")
+            .values_list("id", "todo_id", "reminder")[: self.batch_size]
+        )
+        # Per todo, ids still follow commit order: writers of one todo hold its row lock
+        for change_id, todo_id, reminder in changes:
+            if reminder is None:
+                self.scheduler.cancel(todo_id)
+            else:
+                self.scheduler.schedule(todo_id, reminder)
+            self.applied.add(change_id)
+        self._advance(time.monotonic() if now is None else now)
+        return len(changes)
+
+    def _advance(self, now):
+        """Move last_change_id over applied ids and gaps older than gap_seconds()."""
+        if not self.applied:
+            return
+        for missing in range(self.last_change_id + 1, max(self.applied)):
+            if missing not in self.applied:
+                self.gaps.setdefault(missing, now)
+        while self.applied:
+            next_id = self.last_change_id + 1
+            if next_id in self.applied:
+                self.applied.remove(next_id)
+            elif now - self.gaps[next_id] >= gap_seconds():
+                del self.gaps[next_id]
+            else:
+                break
+            self.last_change_id = next_id
+
+    def prune_changes(self, older_than):
+        """Delete consumed outbox rows older than `older_than`."""
+        ReminderChange.objects.filter(id__lte=self.last_change_id, created_at__lt=older_than).delete()
+
+    def dispatch_due(self, now=None):
+        """Send every reminder due at `now`; returns the number sent."""
+        now = now or timezone.now()
+        due = self.scheduler.pop_due(now.timestamp())
+        if not due:
+            return 0
+
+        claimed = []
+        for todo_id, _ in due:
+            # Claim: only one worker's UPDATE can match while reminder_sent_at is NULL
+            updated = Todo.objects.filter(
+                pk=todo_id, done=False, reminder_sent_at__isnull=True, reminder__lte=now
+            ).update(reminder_sent_at=now, updated_at=now)
+            if updated:
+                claimed.append(todo_id)
+
+        by_user, failed = {}, []
+        for todo in Todo.objects.select_related("user").filter(pk__in=claimed):
+            try:
+                self.backend.send(todo)
+            except Exception:
+                logger.exception("Sending the reminder of todo %s failed", todo.pk)
+                failed.append(todo)
+                continue
+            by_user.setdefault(todo.user_id, []).append(todo.pk)
+        if failed:
+            self.release(failed, now)
+        # The claim was a queryset update, so save() didn't log it
+        for user_id, pks in by_user.items():
+            sync.record(user_id, SyncChange.KIND_TODO, pks)
+        return len(claimed) - len(failed)
+
+    def release(self, todos, now):
+        """Undo the claim on todos whose send failed and retry them later."""
+        Todo.objects.filter(pk__in=[todo.pk for todo in todos], reminder_sent_at=now).update(reminder_sent_at=None)
+        retry_at = now + timedelta(seconds=retry_seconds())
+        for todo in todos:
+            self.scheduler.schedule(todo.pk, retry_at)
+
+    def run_once(self, now=None):
+        while self.apply_changes() == self.batch_size:
+            pass
+        return self.dispatch_due(now)
+
+    def run_forever(self, poll_interval=1.0, prune_every=3600):
+        last_prune = time.monotonic()
+        while True:
+            try:
+                sent = self.run_once()
+                if sent:
+                    self.log(f"Dispatched {sent} reminders")
+                if time.monotonic() - last_prune > prune_every:
+                    self.prune_changes(timezone.now() - timedelta(seconds=prune_every))
+                    last_prune = time.monotonic()
+            except Exception:
+                # e.g. the database went away; keep the schedule and try again next round
+                logger.exception("Reminder worker iteration failed")
+
+            # Sleep until the next reminder, but wake up to read the outbox
+            wait = poll_interval
+            next_due = self.scheduler.next_due()
+            if next_due is not None:
+                wait = min(wait, max(next_due - time.time(), 0))
+            time.sleep(wait)
@@ -0,0 +1,318 @@
+"""
+Full-text search over notes and todos.
+
+Documents are stored in a side table (``core_search_index``) that is kept in
+sync by the post_save / post_delete handlers in ``core.signals``. Each
+database vendor gets its own backend:
+
+* SQLite:   an FTS5 virtual table, ranked with bm25() and highlighted with snippet()
+* Postgres: a table with a weighted ``tsvector`` column and a GIN index,
+            ranked with ts_rank() and highlighted with ts_headline()
+* Others:   a plain ``icontains`` fallback
+
+Set ``SEARCH_BACKEND`` to a dotted path to force a specific backend.
+"""
+import html
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape, strip_tags
+from django.utils.module_loading import import_string
+
+INDEX_TABLE = "core_search_index"
+
+KIND_NOTE = "note"
+KIND_TODO = "todo"
+KINDS = (KIND_NOTE, KIND_TODO)
+
+# Highlight markers used inside the database; swapped for <mark> after escaping
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+
+# Quill emits one block element per line; keep a word break between them
+BLOCK_BOUNDARY = re.compile(r"<(br|/p|/h[1-6]|/li|/div|/blockquote|/pre)\b[^>]*>", re.IGNORECASE)
+
+
+def html_to_text(value):
+    """Strip Quill HTML down to whitespace-normalised plain text."""
+    text = html.unescape(strip_tags(BLOCK_BOUNDARY.sub(" ", value or "")))
+    return " ".join(text.split())
+
+
+def document_for(kind, obj):
+    """Return the (title, body) text indexed for a note or todo."""
+    if kind == KIND_NOTE:
+        return obj.title, html_to_text(obj.content)
+    return obj.task, obj.activity_custom or ""
+
+
+def doc_id(kind, object_id):
+    """Encode (kind, object_id) into a single integer key for the index table."""
+    return object_id * 2 + KINDS.index(kind)
+
+
+def split_doc_id(value):
+    return KINDS[value % 2], value // 2
+
+
+def highlight(snippet):
+    """HTML-escape a snippet and turn the highlight markers into <mark> tags."""
+    return (
+        escape(snippet)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_END, "</mark>")
+    )
+
+
+def search_terms(query):
+    return re.findall(r"\w+", query or "")
+
+
+class BaseSearchBackend:
+    """Interface shared by the search backends."""
+
+    def create_schema(self, schema_editor):
+        pass
+
+    def drop_schema(self, schema_editor):
+        pass
+
+    def index(self, kind, obj):
+        """Add or replace the document for a saved note/todo."""
+        if obj.user_id is None:
+            return
+        title, body = document_for(kind, obj)
+        self.index_rows([(kind, obj.pk, obj.user_id, title, body)])
+
+    def index_many(self, kind, objs, batch_size=1000):
+        """Index many objects at once (for bulk_create / bulk_update callers)."""
+        rows = []
+        for obj in objs:
+            if obj.user_id is not None:
+                title, body = document_for(kind, obj)
+                rows.append((kind, obj.pk, obj.user_id, title, body))
+            if len(rows) >= batch_size:
+                self.index_rows(rows)
+                rows = []
+        if rows:
+            self.index_rows(rows)
+
+    def index_rows(self, rows):
+        """rows: iterable of (kind, object_id, user_id, title, body)."""
+        raise NotImplementedError
+
+    def remove(self, kind, object_id):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, user, query, kind=None, offset=0, limit=20):
+        """
+        Return (hits, total) for the user's documents matching `query`.
+        Each hit is a dict with kind, id, title, snippet (safe HTML) and rank.
+        """
+        raise NotImplementedError
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """FTS5 virtual table; owner and kind are indexed columns so MATCH filters on them."""
+
+    # bm25 weights for (title, body, kind, owner)
+    RANK = f"bm25({INDEX_TABLE}, 10.0, 1.0, 0.0, 0.0)"
+
+    def create_schema(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5("
+            "title, body, kind, owner, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def drop_schema(self, schema_editor):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {INDEX_TABLE}")
+
+    def index_rows(self, rows):
+        rows = list(rows)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {INDEX_TABLE} WHERE rowid = %s",
+                [(doc_id(kind, pk),) for kind, pk, _, _, _ in rows],
+            )
+            cursor.executemany(
+                f"INSERT INTO {INDEX_TABLE} (rowid, title, body, kind, owner) VALUES (%s, %s, %s, %s, %s)",
+                [(doc_id(kind, pk), title, body, kind, f"u{user_id}") for kind, pk, user_id, title, body in rows],
+            )
+
+    def remove(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {INDEX_TABLE} WHERE rowid = %s", [doc_id(kind, object_id)])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {INDEX_TABLE}")
+
+    def match_expression(self, user, query, kind=None):
+        terms = search_terms(query)
+        if not terms:
+            return None
+        # Quote every term so user input can never be parsed as FTS5 syntax
+        words = " ".join(f'"{term}"*' for term in terms)
+        filters = f'owner : "u{user.pk}"'
+        if kind:
+            filters += f' AND kind : "{kind}"'
+        return f"{filters} AND ({words})"
+
+    def search(self, user, query, kind=None, offset=0, limit=20):
+        match = self.match_expression(user, query, kind)
+        if match is None:
+            return [], 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, title, snippet({INDEX_TABLE}, -1, %s, %s, '…', 16), {self.RANK} "
+                f"FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s "
+                f"ORDER BY {self.RANK} LIMIT %s OFFSET %s",
+                [HIGHLIGHT_START, HIGHLIGHT_END, match, limit, offset],
+            )
+            rows = cursor.fetchall()
+            total = offset + len(rows)
+            if len(rows) == limit:
+                cursor.execute(f"SELECT count(*) FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH %s", [match])
+                total = cursor.fetchone()[0]
+
+        hits = []
+        for rowid, title, snippet, rank in rows:
+            hit_kind, object_id = split_doc_id(rowid)
+            # bm25() is "lower is better"; flip it so higher rank means more relevant
+            hits.append({"kind": hit_kind, "id": object_id, "title": title, "snippet": highlight(snippet), "rank": -rank})
+        return hits, total
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Weighted tsvector column with a GIN index."""
+
+    CONFIG = "english"
+    VECTOR = "setweight(to_tsvector(%s, %s), 'A') || setweight(to_tsvector(%s, %s), 'B')"
+
+    def create_schema(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {INDEX_TABLE} ("
+            "id bigint PRIMARY KEY, kind varchar(10) NOT NULL, owner_id integer NOT NULL, "
+            "title text NOT NULL, body text NOT NULL, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {INDEX_TABLE}_document_idx ON {INDEX_TABLE} USING GIN (document)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {INDEX_TABLE}_owner_idx ON {INDEX_TABLE} (owner_id, kind)"
+        )
+
+    def drop_schema(self, schema_editor):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {INDEX_TABLE}")
+
+    def index_rows(self, rows):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {INDEX_TABLE} (id, kind, owner_id, title, body, document) "
+                f"VALUES (%s, %s, %s, %s, %s, {self.VECTOR}) "
+                "ON CONFLICT (id) DO UPDATE SET kind = EXCLUDED.kind, owner_id = EXCLUDED.owner_id, "
+                "title = EXCLUDED.title, body = EXCLUDED.body, document = EXCLUDED.document",
+                [
+                    (doc_id(kind, pk), kind, user_id, title, body, self.CONFIG, title, self.CONFIG, body)
+                    for kind, pk, user_id, title, body in rows
+                ],
+            )
+
+    def remove(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {INDEX_TABLE} WHERE id = %s", [doc_id(kind, object_id)])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {INDEX_TABLE}")
+
+    def search(self, user, query, kind=None, offset=0, limit=20):
+        if not search_terms(query):
+            return [], 0
+        where = "owner_id = %s AND document @@ q"
+        params = [user.pk]
+        if kind:
+            where += " AND kind = %s"
+            params.append(kind)
+        headline_options = f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_END}", MaxWords=30, MinWords=10'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT id, title, "
+                "ts_headline(%s, CASE WHEN body = '' THEN title ELSE body END, q, %s), "
+                "ts_rank(document, q) AS rank "
+                f"FROM {INDEX_TABLE}, websearch_to_tsquery(%s, %s) q WHERE {where} "
+                "ORDER BY rank DESC LIMIT %s OFFSET %s",
+                [self.CONFIG, headline_options, self.CONFIG, query, *params, limit, offset],
+            )
+            rows = cursor.fetchall()
+            total = offset + len(rows)
+            if len(rows) == limit:
+                cursor.execute(
+                    f"SELECT count(*) FROM {INDEX_TABLE}, websearch_to_tsquery(%s, %s) q WHERE {where}",
+                    [self.CONFIG, query, *params],
+                )
+                total = cursor.fetchone()[0]
+
+        hits = []
+        for pk, title, snippet, rank in rows:
+            hit_kind, object_id = split_doc_id(pk)
+            hits.append({"kind": hit_kind, "id": object_id, "title": title, "snippet": highlight(snippet), "rank": rank})
+        return hits, total
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """Unindexed fallback for databases without a full-text engine."""
+
+    def index_rows(self, rows):
+        pass
+
+    def remove(self, kind, object_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, user, query, kind=None, offset=0, limit=20):
+        from .models import Note, Todo
+
+        if not search_terms(query):
+            return [], 0
+        querysets = []
+        if kind in (None, KIND_NOTE):
+            querysets.append((KIND_NOTE, Note.objects.filter(user=user, title__icontains=query).order_by("-created_at")))
+        if kind in (None, KIND_TODO):
+            querysets.append((KIND_TODO, Todo.objects.filter(user=user, task__icontains=query).order_by("-created_at")))
+
+        # Newest first across both kinds: take the first offset + limit of
+        # each, merge, then slice the page once
+        candidates = []
+        total = 0
+        for hit_kind, qs in querysets:
+            total += qs.count()
+            candidates.extend((hit_kind, obj) for obj in qs[:offset + limit])
+        candidates.sort(key=lambda candidate: (candidate[1].created_at, candidate[1].pk), reverse=True)
+
+        hits = []
+        for hit_kind, obj in candidates[offset:offset + limit]:
+            title, body = document_for(hit_kind, obj)
+            hits.append({"kind": hit_kind, "id": obj.pk, "title": title, "snippet": escape(body[:120]), "rank": 0})
+        return hits, total
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend(vendor=None):
+    """Return the configured backend, or the one matching the database vendor."""
+    path = getattr(settings, "SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    return BACKENDS.get(vendor or connection.vendor, LikeSearchBackend)()
@@ -0,0 +1,177 @@
+"""
+JSON serialization straight from ``values_list()`` rows.
+
+A ``Serializer`` is a table of output fields, each built from one or more
+columns by an encoder. ``plan(fields)`` resolves a sparse fieldset once into
+the columns to select and a function turning a row tuple into a dict, so
+serializing a row is a handful of tuple lookups: no model instances, no
+strftime and no per-row choice dicts.
+"""
+import json
+from collections import namedtuple
+from operator import itemgetter
+
+from .models import Note, Todo
+
+Field = namedtuple("Field", "columns encode")
+
+STATUS_LABELS = dict(Todo.STATUS_CHOICES)
+
+
+# ---------------------------
+# Encoders
+# ---------------------------
+
+def iso_date(value):
+    """date (or the day of a datetime) as YYYY-MM-DD."""
+    return value.isoformat()[:10] if value is not None else None
+
+
+def iso_minutes(value):
+    """datetime as "YYYY-MM-DD HH:MM" (the reminders endpoint format)."""
+    return value.isoformat(" ", "minutes")[:16] if value is not None else None
+
+
+def iso_datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+def activity_label(activity, custom):
+    """Todo.get_activity_display() for a row."""
+    if activity == Todo.ACTIVITY_OTHER and custom:
+        return custom
+    return Todo.ACTIVITY_LABELS.get(activity, activity)
+
+
+def todo_edit_url(pk):
+    return f"/todos/edit/{pk}/"
+
+
+def note_url(pk):
+    return f"/notes/{pk}/"
+
+
+def _getter(indexes, encode):
+    """Row tuple -> field value."""
+    if len(indexes) == 1:
+        get = itemgetter(indexes[0])
+        if encode is None:
+            return get
+        return lambda row: encode(get(row))
+    get = itemgetter(*indexes)
+    return lambda row: encode(*get(row))
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+class Serializer:
+    def __init__(self, fields, default=None):
+        self.fields = fields
+        self.default = tuple(default or fields)
+
+    def plan(self, names=None):
+        """
+        (columns, to_dict) for the requested field names, or the default
+        fieldset. Raises InvalidFields for unknown names.
+        """
+        names = tuple(names or self.default)
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+
+        columns = []
+        for name in names:
+            for column in self.fields[name].columns:
+                if column not in columns:
+                    columns.append(column)
+
+        getters = [
+            (name, _getter([columns.index(c) for c in self.fields[name].columns], self.fields[name].encode))
+            for name in names
+        ]
+
+        def to_dict(row):
+            return {name: get(row) for name, get in getters}
+
+        return columns, to_dict
+
+    def serialize(self, queryset, names=None):
+        """List of dicts for the queryset (sliced by the caller as needed)."""
+        columns, to_dict = self.plan(names)
+        return [to_dict(row) for row in queryset.values_list(*columns)]
+
+
+def plain(column):
+    return Field((column,), None)
+
+
+TODOS = Serializer({
+    "id": plain("id"),
+    "task": plain("task"),
+    "status": plain("status"),
+    "status_label": Field(("status",), STATUS_LABELS.get),
+    "done": plain("done"),
+    "is_important": plain("is_important"),
+    "due_date": Field(("due_date",), iso_date),
+    "reminder": Field(("reminder",), iso_datetime),
+    "activity": Field(("activity", "activity_custom"), activity_label),
+    "created_at": Field(("created_at",), iso_datetime),
+    "updated_at": Field(("updated_at",), iso_datetime),
+    "edit_url": Field(("id",), todo_edit_url),
+})
+
+NOTES = Serializer({
+    "id": plain("id"),
+    "title": plain("title"),
+    "preview": plain("preview"),
+    "content": plain("content"),
+    "word_count": plain("word_count"),
+    "created_at": Field(("created_at",), iso_datetime),
+    "updated_at": Field(("updated_at",), iso_datetime),
+    "url": Field(("id",), note_url),
+}, default=["id", "title", "preview", "word_count", "created_at", "updated_at", "url"])
+
+# Items of TodoService.get_reminders_status_data (formats kept from the original endpoint)
+REMINDER_ITEMS = Serializer({
+    "id": plain("id"),
+    "task": plain("task"),
+    "reminder": Field(("reminder",), iso_minutes),
+    "due_date": Field(("due_date",), iso_date),
+    "activity": Field(("activity", "activity_custom"), activity_label),
+    "is_important": plain("is_important"),
+    "done": plain("done"),
+    "created_at": Field(("created_at",), iso_date),
+    "edit_url": Field(("id",), todo_edit_url),
+})
+
+API = {"notes": (Note, NOTES), "todos": (Todo, TODOS)}
+
+CHUNK_SIZE = 2000
+# Rows encoded per yielded chunk
+ROWS_PER_CHUNK = 200
+
+
+def stream_json(queryset, serializer, names=None, chunk_size=CHUNK_SIZE):
+    """
+    The rows of `queryset` as a JSON array, yielded in chunks while the
+    rows are read. Raises InvalidFields before yielding anything.
+    """
+    columns, to_dict = serializer.plan(names)
+    rows = queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+
+    def chunks():
+        encode = json.JSONEncoder().encode
+        buffer = []
+        separator = "["
+        for row in rows:
+            buffer.append(separator + encode(to_dict(row)))
+            separator = ",\n"
+            if len(buffer) >= ROWS_PER_CHUNK:
+                yield "".join(buffer)
+                buffer = []
+        buffer.append("]\n" if separator != "[" else "[]\n")
+        yield "".join(buffer)
+
+    return chunks()
@@ -1,9 +1,24 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from .models import Note, Todo
+from django.urls import reverse
+from .models import Note, ReminderChange, SyncChange, Todo, UserMonthStats, UserStats
+from . import reminder_events
 from .forms import NoteForm, TodoForm
+from .search import KIND_NOTE, KIND_TODO, get_search_backend
+from . import async_db, dashboard_cache, serializers, sync, user_stats
+from .pagination import keyset_page
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Count
+import asyncio
+import calendar
+import re
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, Min, Q, Subquery, Value, When, Window
+from django.db.models.functions import Coalesce, RowNumber, TruncMonth
+
+# TodoService.get_reminders_etag
+REMINDERS_ETAG = re.compile(r'"reminders-(?P<user>\d+)-(?P<version>\d+)-(?P<boundary>\d+)"')
 
 class BaseCRUDService:
     def __init__(self, model_class, form_class, user):
@@ -29,6 +44,7 @@ class BaseCRUDService:
             obj = form.save(commit=False)
             obj.user = self.user
             obj.save()
+            dashboard_cache.invalidate_user(self.user.pk)
             return True, obj
         return False, form
 
@@ -41,6 +57,7 @@ class BaseCRUDService:
         form = self.form_class(request_post_data, instance=obj)
         if form.is_valid():
             obj = form.save()
+            dashboard_cache.invalidate_user(self.user.pk)
             return True, obj
         return False, form
 
@@ -48,15 +65,34 @@ class BaseCRUDService:
         """Delete object by ID."""
         obj = self.get_by_id(pk)
         obj.delete()
+        dashboard_cache.invalidate_user(self.user.pk)
         return True
 
 class NoteService(BaseCRUDService):
+    # Newest first; id breaks ties so keyset pages are stable
+    LIST_ORDERING = ("-created_at", "-id")
+
     def __init__(self, user):
         super().__init__(Note, NoteForm, user)
 
+    def list_page(self, cursor=None, page_size=24):
+        """
+        One keyset page of the user's notes, newest first.
+        Returns (notes, next_cursor); raises InvalidCursor for a bad cursor.
+        """
+        # The card shows the stored preview; never read the full note body
+        qs = self.model.objects.filter(user=self.user).defer("content")
+        return keyset_page(qs, self.LIST_ORDERING, cursor, page_size)
+
+    def list_all(self):
+        """All notes, newest first, without loading their content."""
+        return super().list_all().defer("content")
+
 class TodoService(BaseCRUDService):
-    def __init__(self, user):
+    def __init__(self, user, use_cache=True):
         super().__init__(Todo, TodoForm, user)
+        # Reporting output is cached per user (see core.dashboard_cache)
+        self.use_cache = use_cache
 
     # ---------------------------
     # Dashboard / Reporting Logic
@@ -66,22 +102,27 @@ class TodoService(BaseCRUDService):
         """
         Aggregate stats for the dashboard.
         """
-        # User-specific queries
-        user_notes = Note.objects.filter(user=self.user)
-        user_todos = self.model.objects.filter(user=self.user)
-
-        # Global counts
-        notes_count = user_notes.count()
+        # Global counts, from the materialized counters
+        stats_qs = UserStats.objects.filter(user=self.user.pk).values(
+            "notes_count", "pending", "in_progress", "completed"
+        )
+        stats = stats_qs.first()
+        if stats is None:
+            # No counters row yet: count the user once and store them
+            user_stats.rebuild(self.user.pk)
+            stats = stats_qs.first() or {}
+        notes_count = stats.get("notes_count", 0)
         # Count only pending tasks (done=False) for the dashboard stat
-        todos_count = user_todos.filter(done=False).count()
-        completed_todos = user_todos.filter(done=True).count()
+        todos_count = stats.get("pending", 0) + stats.get("in_progress", 0)
+        completed_todos = stats.get("completed", 0)
 
-        # Search results
+        # Search results, ranked by the search backend (as on the dashboard)
         notes_results = []
         todos_results = []
         if query:
-            notes_results = user_notes.filter(title__icontains=query)
-            todos_results = user_todos.filter(task__icontains=query)
+            search = SearchService(self.user)
+            notes_results, _ = search.search_objects(query, KIND_NOTE)
+            todos_results, _ = search.search_objects(query, KIND_TODO)
 
         return {
             "notes_count": notes_count,
@@ -143,6 +184,308 @@ class TodoService(BaseCRUDService):
             "all_important": all_important
         }
 
+    # ---------------------------
+    # Consolidated Dashboard
+    # ---------------------------
+
+    def get_dashboard_counters(self, now):
+        """
+        Return every dashboard counter in a single query.
+
+        Totals come from the user's UserStats row and this month's
+        UserMonthStats row (see core.user_stats), so they cost the same
+        however many todos and notes there are. Only the reminder counts
+        depend on `now`; they are aggregated over pending reminders (a
+        partial index) in scalar subqueries.
+
+        A user without a UserStats row is counted once (user_stats.rebuild)
+        and the query run again, since the reminder counts hang off that row.
+        """
+        rows = list(self._counters_query(now))
+        if not rows:
+            user_stats.rebuild(self.user.pk)
+            rows = list(self._counters_query(now))
+        return self._counters_result(rows)
+
+    def _counters_query(self, now):
+        soon_threshold = now + timedelta(hours=1)
+        month_start, _ = self._month_bounds(now)
+
+        reminder_aggregate = self._reminder_aggregate
+        month = UserMonthStats.objects.filter(user=self.user.pk, month=month_start)
+        return (
+            UserStats.objects.filter(user=self.user.pk)
+            .values("notes_count", "pending", "in_progress", "completed")
+            .annotate(
+                overdue_count=Coalesce(reminder_aggregate(Count("pk", filter=Q(reminder__lt=now))), 0),
+                soon_count=Coalesce(
+                    reminder_aggregate(Count("pk", filter=Q(reminder__gte=now, reminder__lte=soon_threshold))), 0
+                ),
+                next_overdue=reminder_aggregate(Min("reminder", filter=Q(reminder__gte=now))),
+                next_soon=reminder_aggregate(Min("reminder", filter=Q(reminder__gt=soon_threshold))),
+                month_pending=Coalesce(Subquery(month.values("pending")), 0),
+                month_completed=Coalesce(Subquery(month.values("completed")), 0),
+            )
+        )
+
+    def _reminder_aggregate(self, aggregate):
+        """Scalar subquery of `aggregate` over the user's pending reminders."""
+        # Uncorrelated (user id inlined): runs once
+        reminders = (
+            self.model.objects.filter(user=self.user.pk, done=False, reminder__isnull=False)
+            .order_by()
+            .values("user")
+        )
+        return Subquery(reminders.annotate(value=aggregate).values("value"))
+
+    def _counters_result(self, rows):
+        row = next(iter(rows), {})
+        month_pending, month_completed = row.get("month_pending", 0), row.get("month_completed", 0)
+        return {
+            "notes_count": row.get("notes_count", 0),
+            "todos_count": row.get("pending", 0) + row.get("in_progress", 0),
+            "completed_todos": row.get("completed", 0),
+            "overdue_count": row.get("overdue_count", 0),
+            "soon_count": row.get("soon_count", 0),
+            "monthly_stats": {
+                "total": month_pending + month_completed,
+                "pending": month_pending,
+                "completed": month_completed,
+            },
+            "next_change": self._reminder_boundary(row.get("next_overdue"), row.get("next_soon")),
+        }
+
+    def _reminder_boundary(self, next_overdue, next_soon):
+        """
+        Earliest moment a pending reminder becomes overdue or enters the
+        one-hour "soon" window, given the earliest reminder at/after now and
+        the earliest one after the soon threshold.
+        """
+        boundaries = []
+        if next_overdue:
+            boundaries.append(next_overdue)
+        if next_soon:
+            boundaries.append(next_soon - timedelta(hours=1))
+        return min(boundaries) if boundaries else None
+
+    def _top_per_bucket(self, qs, bucket, order_by, limit):
+        """
+        Return {bucket: [objects]} holding the first `limit` rows of each bucket,
+        fetched in one query with ROW_NUMBER() partitioned by the bucket.
+        """
+        return self._group_by_bucket(self._ranked_per_bucket(qs, bucket, order_by, limit))
+
+    def _ranked_per_bucket(self, qs, bucket, order_by, limit):
+        return (
+            qs.annotate(bucket=bucket)
+            .annotate(bucket_rank=Window(RowNumber(), partition_by=[F("bucket")], order_by=order_by))
+            .filter(bucket_rank__lte=limit)
+            .order_by()
+        )
+
+    def _group_by_bucket(self, ranked):
+        grouped = {}
+        # Ordering is done here rather than in SQL to skip a second sort pass
+        for obj in sorted(ranked, key=lambda o: o.bucket_rank):
+            grouped.setdefault(obj.bucket, []).append(obj)
+        return grouped
+
+    def get_dashboard_reminders(self, now):
+        """Overdue/upcoming/soon reminder lists in a single query."""
+        return self._reminders_result(now, self._reminders_query(now))
+
+    def _reminders_query(self, now):
+        qs = self.model.objects.filter(user=self.user, reminder__isnull=False, done=False)
+        bucket = Case(When(reminder__lt=now, then=Value("overdue")), default=Value("upcoming"))
+        return self._ranked_per_bucket(qs, bucket, [F("reminder").asc(), F("pk").asc()], 5)
+
+    def _reminders_result(self, now, rows):
+        soon_threshold = now + timedelta(hours=1)
+        grouped = self._group_by_bucket(rows)
+        upcoming = grouped.get("upcoming", [])
+        return {
+            "upcoming": upcoming,
+            "overdue": grouped.get("overdue", []),
+            # "soon" is a prefix of the upcoming list (both ordered by reminder)
+            "soon": [r for r in upcoming if r.reminder <= soon_threshold],
+        }
+
+    def get_dashboard_matrix(self, now):
+        """Priority matrix lists in a single query."""
+        return self._matrix_result(self._matrix_query(now))
+
+    def _matrix_query(self, now):
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        tomorrow = (today_start + timedelta(days=1)).date()
+
+        qs = self.model.objects.filter(user=self.user, done=False, is_important=True)
+        bucket = Case(
+            When(due_date__isnull=True, then=Value("undated")),
+            When(due_date__lte=tomorrow, then=Value("urgent")),
+            default=Value("later"),
+        )
+        # 8 rows per bucket is enough to rebuild the overall top 8 (all_important)
+        return self._ranked_per_bucket(qs, bucket, [F("due_date").asc(), F("pk").asc()], 8)
+
+    def _matrix_result(self, rows):
+        grouped = self._group_by_bucket(rows)
+
+        # Match the database's own NULL placement for ORDER BY due_date
+        nulls_last = connection.features.nulls_order_largest
+        undated = grouped.get("undated", [])
+        dated = sorted(grouped.get("urgent", []) + grouped.get("later", []), key=lambda t: (t.due_date, t.pk))
+        all_important = (dated + undated) if nulls_last else (undated + dated)
+
+        return {
+            "important_urgent": grouped.get("urgent", [])[:5],
+            "important_not_urgent": grouped.get("later", [])[:5],
+            "all_important": all_important[:8],
+        }
+
+    def _dashboard_sections(self, now):
+        """
+        Counters, reminders, matrix and focus sections, served from the
+        per-user cache when possible.
+
+        Everything expires at midnight (daily focus, urgency and the month
+        change); counters and reminders also expire when the next pending
+        reminder turns overdue or "soon".
+        """
+        builders = {
+            "counters": lambda: self.get_dashboard_counters(now),
+            "reminders": lambda: self.get_dashboard_reminders(now),
+            "matrix": lambda: self.get_dashboard_matrix(now),
+            "focus": lambda: list(self.get_daily_focus(now)),
+        }
+        if not self.use_cache:
+            return {name: build() for name, build in builders.items()}
+
+        version, sections = dashboard_cache.get_many(self.user.pk, builders)
+        missing = {name: build() for name, build in builders.items() if name not in sections}
+        return self._cache_sections(now, version, sections, missing)
+
+    def _cache_sections(self, now, version, sections, missing):
+        """Store freshly built sections with their expiry; returns all sections."""
+        if not missing:
+            return sections
+        sections.update(missing)
+
+        midnight = dashboard_cache.next_midnight(now)
+        next_change = sections["counters"]["next_change"]
+        reminder_expiry = min(midnight, next_change) if next_change else midnight
+        reminder_bound = {name: missing.pop(name) for name in ("counters", "reminders") if name in missing}
+        if reminder_bound:
+            dashboard_cache.set_many(
+                self.user.pk, version, reminder_bound, dashboard_cache.seconds_until(now, reminder_expiry)
+            )
+        if missing:
+            dashboard_cache.set_many(self.user.pk, version, missing, dashboard_cache.seconds_until(now, midnight))
+        return sections
+
+    def get_dashboard_data(self, now, query=None):
+        """
+        Build the full dashboard context.
+
+        Replaces the separate get_dashboard_stats / get_reminders /
+        get_daily_focus / get_priority_matrix / get_monthly_stats calls
+        (~15 queries) with four: counters, reminders, today's focus and the
+        priority matrix. A search query adds its own result queries.
+        """
+        sections = self._dashboard_sections(now)
+        results = {}
+        if query:
+            search = SearchService(self.user)
+            results = {kind: search.search_objects(query, kind) for kind in (KIND_NOTE, KIND_TODO)}
+        return self._dashboard_context(sections, query, results)
+
+    def _dashboard_context(self, sections, query, results):
+        """Template context from the dashboard sections and {kind: (objects, total)} search results."""
+        counters = sections["counters"]
+        reminders = sections["reminders"]
+        matrix = sections["matrix"]
+        today_todos = sections["focus"]
+        notes_results, notes_total = results.get(KIND_NOTE, ([], 0))
+        todos_results, todos_total = results.get(KIND_TODO, ([], 0))
+
+        return {
+            "notes_count": counters["notes_count"],
+            "todos_count": counters["todos_count"],
+            "completed_todos": counters["completed_todos"],
+            "query": query,
+            "notes_results": notes_results,
+            "todos_results": todos_results,
+            "notes_total": notes_total,
+            "todos_total": todos_total,
+
+            "upcoming_reminders": reminders["upcoming"],
+            "overdue_reminders": reminders["overdue"],
+            "soon_reminders": reminders["soon"],
+            "overdue_count": counters["overdue_count"],
+            "soon_count": counters["soon_count"],
+            "show_reminder_alert": (counters["overdue_count"] > 0) or (counters["soon_count"] > 0),
+
+            "today_todos": today_todos,
+            "important_urgent": matrix["important_urgent"],
+            "important_not_urgent": matrix["important_not_urgent"],
+            "all_important": matrix["all_important"],
+
+            "monthly_stats": counters["monthly_stats"],
+        }
+
+    # ---------------------------
+    # Async Dashboard (ASGI)
+    # ---------------------------
+
+    async def aget_dashboard_counters(self, now, parallel=False):
+        rows = await async_db.fetch(self._counters_query(now), parallel)
+        if not rows:
+            # As in get_dashboard_counters
+            await sync_to_async(user_stats.rebuild)(self.user.pk)
+            rows = await async_db.fetch(self._counters_query(now), parallel)
+        return self._counters_result(rows)
+
+    async def aget_dashboard_reminders(self, now, parallel=False):
+        return self._reminders_result(now, await async_db.fetch(self._reminders_query(now), parallel))
+
+    async def aget_dashboard_matrix(self, now, parallel=False):
+        return self._matrix_result(await async_db.fetch(self._matrix_query(now), parallel))
+
+    async def aget_daily_focus(self, now, parallel=False):
+        return await async_db.fetch(self.get_daily_focus(now), parallel)
+
+    async def _adashboard_sections(self, now, parallel):
+        """Async _dashboard_sections: the sections missing from the cache are built concurrently."""
+        builders = {
+            "counters": self.aget_dashboard_counters,
+            "reminders": self.aget_dashboard_reminders,
+            "matrix": self.aget_dashboard_matrix,
+            "focus": self.aget_daily_focus,
+        }
+        version, sections = None, {}
+        if self.use_cache:
+            version, sections = await sync_to_async(dashboard_cache.get_many)(self.user.pk, builders)
+        names = [name for name in builders if name not in sections]
+        built = await asyncio.gather(*(builders[name](now, parallel) for name in names))
+        missing = dict(zip(names, built))
+        if not self.use_cache:
+            return missing
+        return await sync_to_async(self._cache_sections)(now, version, sections, missing)
+
+    async def aget_dashboard_data(self, now, query=None):
+        """
+        Async get_dashboard_data. The uncached sections and the search
+        queries run concurrently, on separate connections when
+        core.async_db allows it, so latency is that of the slowest query.
+        """
+        parallel = await async_db.parallel_allowed()
+        kinds = (KIND_NOTE, KIND_TODO) if query else ()
+        search = SearchService(self.user)
+        sections, *found = await asyncio.gather(
+            self._adashboard_sections(now, parallel),
+            *(async_db.call(search.search_objects, query, kind, parallel=parallel) for kind in kinds),
+        )
+        return self._dashboard_context(sections, query, dict(zip(kinds, found)))
+
     # ---------------------------
     # Endpoint Helpers
     # ---------------------------
@@ -159,34 +502,65 @@ class TodoService(BaseCRUDService):
         soon_threshold = now + timedelta(hours=1)
         soon_qs = upcoming_qs.filter(reminder__lte=soon_threshold)
 
-        def serialize(qs, limit=10):
-            items = []
-            for r in qs[:limit]:
-                items.append({
-                    'id': r.id,
-                    'task': r.task,
-                    'reminder': r.reminder.strftime('%Y-%m-%d %H:%M'),
-                    'due_date': r.due_date.strftime('%Y-%m-%d') if r.due_date else None,
-                    'activity': r.get_activity_display(),
-                    'is_important': r.is_important,
-                    'done': r.done,
-                    'created_at': r.created_at.strftime('%Y-%m-%d') if r.created_at else None,
-                    'edit_url': f"/todos/edit/{r.id}/",
-                })
-            return items
-
+        # Serialized from values_list() rows (see core.serializers)
+        items = serializers.REMINDER_ITEMS
         return {
-            'overdue': serialize(overdue_qs, limit=20),
-            'soon': serialize(soon_qs, limit=20),
+            'overdue': items.serialize(overdue_qs[:20]),
+            'soon': items.serialize(soon_qs[:20]),
             'now': now.strftime('%Y-%m-%d %H:%M:%S'),
             'overdue_count': overdue_qs.count(),
             'soon_count': soon_qs.count(),
         }
 
+    def get_reminders_etag(self, now):
+        """
+        Return (ETag, next_change) for the reminders status data, in one
+        query. The ETag carries the user's reminders_version (bumped by every
+        todo write, see core.user_stats) and the next moment a reminder
+        crosses the now/soon boundary, after which it no longer matches.
+        """
+        soon_threshold = now + timedelta(hours=1)
+        rows = UserStats.objects.filter(pk=self.user.pk).annotate(
+            next_overdue=self._reminder_aggregate(Min("reminder", filter=Q(reminder__gte=now))),
+            next_soon=self._reminder_aggregate(Min("reminder", filter=Q(reminder__gt=soon_threshold))),
+        ).values_list("reminders_version", "next_overdue", "next_soon")
+        row = rows.first()
+        if row is None:
+            # As in get_dashboard_counters
+            user_stats.rebuild(self.user.pk)
+            row = rows.first()
+        version, next_overdue, next_soon = row
+        next_change = self._reminder_boundary(next_overdue, next_soon)
+        # Whole seconds, rounded down so the ETag expires early rather than late
+        boundary = int(next_change.timestamp()) if next_change else 0
+        return f'"reminders-{self.user.pk}-{version}-{boundary}"', next_change
+
+    def match_reminders_etag(self, etags, now):
+        """
+        The first of `etags` that is still current, or None: one primary-key
+        read of the user's reminders_version, without touching the todos.
+        """
+        candidates = []
+        for etag in etags:
+            match = REMINDERS_ETAG.fullmatch(etag)
+            if match and int(match["user"]) == self.user.pk:
+                boundary = int(match["boundary"])
+                if not boundary or now.timestamp() < boundary:
+                    candidates.append((int(match["version"]), etag))
+        if not candidates:
+            return None
+        version = UserStats.objects.filter(pk=self.user.pk).values_list("reminders_version", flat=True).first()
+        return next((etag for candidate, etag in candidates if candidate == version), None)
+
     def get_calendar_data(self):
         """
-        Group todos by month for the calendar view.
+        Group todos by month for the calendar view (cached per user).
         """
+        if not self.use_cache:
+            return self._build_calendar_data()
+        return dashboard_cache.get_or_build(self.user.pk, "calendar", self._build_calendar_data)
+
+    def _build_calendar_data(self):
         pending_todos = self.model.objects.filter(user=self.user, due_date__isnull=False, done=False).order_by("due_date")
         completed_todos = self.model.objects.filter(user=self.user, due_date__isnull=False, done=True).order_by("due_date")
 
@@ -202,47 +576,149 @@ class TodoService(BaseCRUDService):
             "grouped_completed": group_by_month(completed_todos),
         }
 
-    def get_monthly_stats(self, now):
+    # Todos shown per day cell before "more"
+    CALENDAR_DAY_PAGE_SIZE = 50
+    CALENDAR_DAY_ORDERING = ("done", "-is_important", "id")
+
+    def calendar_window(self, month):
         """
-        Return stats for the current month (pending vs completed).
+        Return (first, end) dates of the month grid containing `month` (a
+        date): whole weeks from Monday, end exclusive.
+        """
+        weeks = calendar.Calendar().monthdatescalendar(month.year, month.month)
+        return weeks[0][0], weeks[-1][-1] + timedelta(days=1)
+
+    def get_calendar_window(self, start, end):
         """
-        import calendar
-        # Get range for current month
+        Per-day and per-month pending/completed counts for todos due in
+        [start, end), aggregated in the database (cached per user and window).
+        """
+        if not self.use_cache:
+            return self._build_calendar_window(start, end)
+        section = f"calendar:{start.isoformat()}:{end.isoformat()}"
+        return dashboard_cache.get_or_build(self.user.pk, section, lambda: self._build_calendar_window(start, end))
+
+    def _build_calendar_window(self, start, end):
+        window = self.model.objects.filter(user=self.user, due_date__gte=start, due_date__lt=end)
+        counts = {
+            "pending": Count("id", filter=Q(done=False)),
+            "completed": Count("id", filter=Q(done=True)),
+        }
+        # due_date is already a date, so it is the day bucket itself
+        days = {
+            row["due_date"]: {"pending": row["pending"], "completed": row["completed"]}
+            for row in window.values("due_date").annotate(**counts).order_by("due_date")
+        }
+        months = [
+            {"month": row["month"], "pending": row["pending"], "completed": row["completed"]}
+            for row in window.annotate(month=TruncMonth("due_date")).values("month").annotate(**counts).order_by("month")
+        ]
+        return {"start": start, "end": end, "days": days, "months": months}
+
+    def get_calendar_month(self, month, today=None):
+        """Context for the month grid containing `month`: weeks of day cells with counts."""
+        today = today or timezone.localdate()
+        month = month.replace(day=1)
+        start, end = self.calendar_window(month)
+        data = self.get_calendar_window(start, end)
+        empty = {"pending": 0, "completed": 0}
+
+        weeks = []
+        day = start
+        while day < end:
+            week = []
+            for _ in range(7):
+                week.append({
+                    "date": day,
+                    "in_month": day.month == month.month,
+                    "is_today": day == today,
+                    **data["days"].get(day, empty),
+                })
+                day += timedelta(days=1)
+            weeks.append(week)
+
+        this_month = next((row for row in data["months"] if row["month"] == month), {"month": month, **empty})
+        return {
+            "month": month,
+            "prev_month": (month - timedelta(days=1)).replace(day=1),
+            "next_month": (month + timedelta(days=31)).replace(day=1),
+            "weeks": weeks,
+            "month_totals": this_month,
+        }
+
+    def get_calendar_day(self, day, cursor=None, page_size=None):
+        """One day cell's todos (pending first), keyset paginated: (todos, next_cursor)."""
+        qs = self.model.objects.filter(user=self.user, due_date=day).only(
+            "id", "task", "done", "status", "is_important", "due_date"
+        )
+        return keyset_page(qs, self.CALENDAR_DAY_ORDERING, cursor, page_size or self.CALENDAR_DAY_PAGE_SIZE)
+
+    def _month_bounds(self, now):
+        """Return (start of this month, start of next month) as dates."""
         start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         # simplistic end date: start of next month
         if start_date.month == 12:
             next_month = start_date.replace(year=start_date.year + 1, month=1)
         else:
             next_month = start_date.replace(month=start_date.month + 1)
-        
-        # Filter todos due in this month (or reminders in this month could be another metric, but due_date is standard)
-        month_tasks = self.model.objects.filter(
-            user=self.user, 
-            due_date__gte=start_date, 
-            due_date__lt=next_month
-        )
-        
+        return start_date.date(), next_month.date()
+
+    def get_monthly_stats(self, now):
+        """
+        Return stats for the current month (pending vs completed).
+        """
+        start_date, _ = self._month_bounds(now)
+
+        # Todos due in this month, from the materialized counters
+        pending, completed = UserMonthStats.objects.filter(
+            user=self.user.pk, month=start_date
+        ).values_list("pending", "completed").first() or (0, 0)
         return {
-            "total": month_tasks.count(),
-            "pending": month_tasks.filter(done=False).count(),
-            "completed": month_tasks.filter(done=True).count()
+            "total": pending + completed,
+            "pending": pending,
+            "completed": completed,
         }
 
     # ---------------------------
     # Kanban Board
     # ---------------------------
 
-    def get_kanban_board(self):
+    # Column orderings; id breaks ties so keyset pages are stable
+    KANBAN_ORDERING = {
+        Todo.STATUS_PENDING: ("-is_important", "created_at", "id"),
+        Todo.STATUS_IN_PROGRESS: ("-is_important", "created_at", "id"),
+        Todo.STATUS_COMPLETED: ("-created_at", "-id"),
+    }
+    KANBAN_COLUMNS = {
+        "pending": Todo.STATUS_PENDING,
+        "in_progress": Todo.STATUS_IN_PROGRESS,
+        "completed": Todo.STATUS_COMPLETED,
+    }
+
+    def get_kanban_column(self, status, cursor=None, page_size=20):
         """
-        Group todos by status for Kanban Board.
+        One keyset page of a Kanban column.
+        Returns (todos, next_cursor); raises InvalidCursor for a bad cursor.
         """
-        todos = self.model.objects.filter(user=self.user)
-        
-        return {
-            "pending": todos.filter(status=self.model.STATUS_PENDING).order_by("-is_important", "created_at"),
-            "in_progress": todos.filter(status=self.model.STATUS_IN_PROGRESS).order_by("-is_important", "created_at"),
-            "completed": todos.filter(status=self.model.STATUS_COMPLETED).order_by("-created_at")[:20],  # Limit completed items
-        }
+        qs = self.model.objects.filter(user=self.user, status=status)
+        return keyset_page(qs, self.KANBAN_ORDERING[status], cursor, page_size)
+
+    def get_kanban_board(self, page_size=20):
+        """
+        Group todos by status for Kanban Board: the first page of every
+        column, its "load more" cursor and the per-column totals.
+        """
+        counts = dict(
+            self.model.objects.filter(user=self.user)
+            .order_by()
+            .values_list("status")
+            .annotate(n=Count("pk"))
+        )
+        board = {"next_cursors": {}, "counts": {}}
+        for column, status in self.KANBAN_COLUMNS.items():
+            board[column], board["next_cursors"][column] = self.get_kanban_column(status, page_size=page_size)
+            board["counts"][column] = counts.get(status, 0)
+        return board
 
     def update_status(self, pk, new_status):
         """
@@ -261,4 +737,201 @@ class TodoService(BaseCRUDService):
         todo.done = (new_status == self.model.STATUS_COMPLETED)
         
         todo.save()
+        dashboard_cache.invalidate_user(self.user.pk)
         return True, "Status updated"
+
+    def update_statuses(self, moves):
+        """
+        Apply many Kanban moves ([{"id": .., "status": ..}, ...]) in one
+        transaction with a single conditional UPDATE.
+
+        Keeps the done/status sync rules from Todo.save (done is True exactly
+        when status is COMPLETED). Since save() and its signals are skipped,
+        the side effects they would have had are applied here.
+        Returns one {"id", "status", "message"} result per move.
+        """
+        valid_statuses = {choice[0] for choice in self.model.STATUS_CHOICES}
+        results = []
+        targets = {}
+        for move in moves:
+            try:
+                pk = int(move.get("id"))
+            except (AttributeError, TypeError, ValueError):
+                results.append({"id": None, "status": "error", "message": "Invalid id"})
+                continue
+            new_status = move.get("status")
+            if new_status not in valid_statuses:
+                results.append({"id": pk, "status": "error", "message": "Invalid status"})
+                continue
+            # The last move of a todo wins
+            targets[pk] = new_status
+            results.append({"id": pk, "status": "success", "message": "Status updated"})
+
+        with transaction.atomic():
+            # Locked so the counter deltas below are computed from what gets updated
+            current = {
+                pk: (done, reminder, sent_at, counts)
+                for pk, done, reminder, sent_at, *counts in self.model.objects.select_for_update()
+                .filter(user=self.user, pk__in=targets)
+                .values_list("pk", "done", "reminder", "reminder_sent_at", *self.model.COUNTER_FIELDS)
+            }
+            for result in results:
+                if result["status"] == "success" and result["id"] not in current:
+                    result.update(status="error", message="Not found")
+            targets = {pk: status for pk, status in targets.items() if pk in current}
+            if not targets:
+                return results
+
+            completed = self.model.STATUS_COMPLETED
+            by_status = {}
+            for pk, status in targets.items():
+                by_status.setdefault(status, []).append(pk)
+
+            # One WHEN per target status, however many todos move
+            self.model.objects.filter(user=self.user, pk__in=targets).update(
+                status=Case(*[When(pk__in=pks, then=Value(status)) for status, pks in by_status.items()],
+                            default=F("status")),
+                done=Q(pk__in=by_status[completed]) if completed in by_status else Value(False),
+                updated_at=timezone.now(),
+            )
+            # Reminder worker outbox: reminders whose pending state flipped
+            ReminderChange.objects.bulk_create([
+                ReminderChange(todo_id=pk, reminder=None if status == completed or sent_at else reminder)
+                for pk, status in targets.items()
+                for done, reminder, sent_at, _ in [current[pk]]
+                if reminder is not None and done != (status == completed)
+            ])
+            sync.record(self.user.pk, SyncChange.KIND_TODO, targets)
+            changes = user_stats.Changes()
+            for pk, status in targets.items():
+                user_id, _, is_important, due_date = counts = current[pk][3]
+                changes.todo(tuple(counts), (user_id, status, is_important, due_date))
+            changes.apply()
+            user_id = self.user.pk
+            transaction.on_commit(lambda: reminder_events.notify_user(user_id))
+        dashboard_cache.invalidate_user(self.user.pk)
+        return results
+
+
+class SearchService:
+    """Ranked full-text search over the user's notes and todos (see core.search)."""
+
+    DETAIL_URLS = {KIND_NOTE: "notes_detail", KIND_TODO: "todos_detail"}
+
+    def __init__(self, user):
+        self.user = user
+        self.backend = get_search_backend()
+
+    def search(self, query, kind=None, page=1, per_page=20):
+        """
+        One page of ranked hits, as plain dicts for the JSON endpoint.
+        """
+        page = max(page, 1)
+        hits, total = self.backend.search(
+            self.user, query, kind=kind, offset=(page - 1) * per_page, limit=per_page
+        )
+        for hit in hits:
+            hit["url"] = reverse(self.DETAIL_URLS[hit["kind"]], args=[hit["id"]])
+        return {
+            "query": query,
+            "results": hits,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "has_next": page * per_page < total,
+        }
+
+    def search_objects(self, query, kind, limit=20):
+        """
+        Return (objects, total): the best matches of one kind as model
+        instances in rank order, each with a highlighted `search_snippet`.
+        """
+        hits, total = self.backend.search(self.user, query, kind=kind, limit=limit)
+        if not hits:
+            return [], total
+        qs = Note.objects.defer("content") if kind == KIND_NOTE else Todo.objects.all()
+        by_id = qs.filter(user=self.user).in_bulk([hit["id"] for hit in hits])
+        objects = []
+        for hit in hits:
+            obj = by_id.get(hit["id"])
+            if obj is not None:
+                obj.search_snippet = hit["snippet"]
+                objects.append(obj)
+        return objects, total
+
+
+class SyncService:
+    """
+    Incremental replication for clients keeping a local copy of the user's
+    notes and todos: the rows changed after a cursor (see core.sync).
+    """
+
+    PAGE_SIZE = 200
+    MAX_PAGE_SIZE = 1000
+    FIELDS = {
+        SyncChange.KIND_NOTE: (Note, ["id", "title", "content", "created_at", "updated_at"]),
+        SyncChange.KIND_TODO: (Todo, [
+            "id", "task", "status", "done", "is_important", "due_date", "reminder",
+            "activity", "activity_custom", "created_at", "updated_at",
+        ]),
+    }
+
+    def __init__(self, user):
+        self.user = user
+
+    def changes(self, since=0, limit=None):
+        """
+        Up to `limit` changes after cursor `since`, oldest first:
+        {changes: [{kind, id, deleted, data}], cursor, has_more}. `data` is
+        None for deletions. Raises sync.CursorExpired when tombstones after
+        `since` have been compacted away; the client must start over from 0.
+
+        Entry ids are assigned on insert but visible on commit, so with
+        concurrent writers a lower id can still appear after a higher one
+        was read. The cursor therefore stops before the first entry younger
+        than SYNC_SETTLE_SECONDS; the entries after it are returned now and
+        again on the next call (applying a change twice is harmless).
+        """
+        limit = min(limit or self.PAGE_SIZE, self.MAX_PAGE_SIZE)
+        log = SyncChange.objects.filter(user_id=self.user.pk)
+        if since and log.filter(kind=SyncChange.KIND_RESET, id__gt=since).exists():
+            raise sync.CursorExpired("Cursor predates compacted deletions; sync again from 0")
+
+        # Reset markers are read too, so the returned cursor moves past them
+        entries = list(
+            log.filter(id__gt=since)
+            .order_by("id")
+            .values_list("id", "kind", "object_id", "deleted", "changed_at")[: limit + 1]
+        )
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        cursor = since
+        settled = timezone.now() - timedelta(seconds=getattr(settings, "SYNC_SETTLE_SECONDS", 0))
+        for entry_id, *_, changed_at in entries:
+            if changed_at > settled:
+                # The rest comes again once settled; until then there is nothing more to page through
+                has_more = False
+                break
+            cursor = entry_id
+
+        rows = {}
+        for kind, (model, fields) in self.FIELDS.items():
+            ids = [object_id for _, entry_kind, object_id, deleted, _ in entries if entry_kind == kind and not deleted]
+            if ids:
+                rows[kind] = {
+                    row["id"]: row for row in model.objects.filter(user=self.user, pk__in=ids).values(*fields)
+                }
+
+        changes = []
+        for _, kind, object_id, deleted, _ in entries:
+            if kind == SyncChange.KIND_RESET:
+                continue
+            # A row deleted since its entry was read is reported as deleted
+            data = None if deleted else rows[kind].get(object_id)
+            changes.append({"kind": kind, "id": object_id, "deleted": data is None, "data": data})
+        return {
+            "changes": changes,
+            "cursor": cursor,
+            "has_more": has_more,
+        }
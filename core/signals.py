@@ -0,0 +1,144 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import dashboard_cache, reminder_events, sync, user_cache, user_stats
+from .models import Note, ReminderChange, SyncChange, Todo, UserStats
+from .search import KIND_NOTE, KIND_TODO, get_search_backend
+
+
+# ---------------------------
+# Search index sync
+# ---------------------------
+
+@receiver(post_save, sender=Note)
+def index_note(sender, instance, **kwargs):
+    get_search_backend().index(KIND_NOTE, instance)
+
+
+@receiver(post_save, sender=Todo)
+def index_todo(sender, instance, **kwargs):
+    get_search_backend().index(KIND_TODO, instance)
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note(sender, instance, **kwargs):
+    get_search_backend().remove(KIND_NOTE, instance.pk)
+
+
+@receiver(post_delete, sender=Todo)
+def unindex_todo(sender, instance, **kwargs):
+    get_search_backend().remove(KIND_TODO, instance.pk)
+
+
+# ---------------------------
+# Dashboard cache invalidation
+# ---------------------------
+
+@receiver(post_save, sender=Note)
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Note)
+@receiver(post_delete, sender=Todo)
+def invalidate_dashboard_cache(sender, instance, **kwargs):
+    dashboard_cache.invalidate_user(instance.user_id)
+
+
+# ---------------------------
+# Reminder stream wake-ups
+# ---------------------------
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+def notify_reminder_streams(sender, instance, **kwargs):
+    if instance.user_id is not None:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: reminder_events.notify_user(user_id))
+
+
+# ---------------------------
+# Reminder worker outbox
+# ---------------------------
+
+@receiver(post_save, sender=Todo)
+def record_reminder_change(sender, instance, created, **kwargs):
+    if created and instance.reminder is None:
+        return
+    if created or getattr(instance, "_schedule_changed", True):
+        pending = instance.reminder if not instance.done and instance.reminder_sent_at is None else None
+        ReminderChange.objects.create(todo_id=instance.pk, reminder=pending)
+
+
+@receiver(post_delete, sender=Todo)
+def record_reminder_removal(sender, instance, **kwargs):
+    if instance.reminder is not None and not instance.done:
+        ReminderChange.objects.create(todo_id=instance.pk, reminder=None)
+
+
+# ---------------------------
+# Sync change log
+# ---------------------------
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def record_note_change(sender, instance, **kwargs):
+    sync.record(instance.user_id, SyncChange.KIND_NOTE, [instance.pk], deleted=kwargs["signal"] is post_delete)
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+def record_todo_change(sender, instance, **kwargs):
+    sync.record(instance.user_id, SyncChange.KIND_TODO, [instance.pk], deleted=kwargs["signal"] is post_delete)
+
+
+# ---------------------------
+# Materialized counters (UserStats)
+# ---------------------------
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_user_stats(sender, instance, created, **kwargs):
+    if created:
+        UserStats.objects.get_or_create(user_id=instance.pk)
+
+
+@receiver(post_save, sender=Todo)
+def count_todo(sender, instance, created, **kwargs):
+    state = instance.counter_state()
+    old = None if created else getattr(instance, "_loaded_counts", None)
+    user_stats.Changes().todo(old, state).apply()
+    instance._loaded_counts = state
+
+
+@receiver(post_delete, sender=Todo)
+def uncount_todo(sender, instance, **kwargs):
+    old = getattr(instance, "_loaded_counts", None) or instance.counter_state()
+    # No rebuild: the delete may be part of deleting the user
+    user_stats.Changes().todo(old, None).apply(rebuild_missing=False)
+
+
+@receiver(post_save, sender=Note)
+def count_note(sender, instance, created, **kwargs):
+    if created:
+        user_stats.Changes().notes(instance.user_id, 1).apply()
+
+
+@receiver(post_delete, sender=Note)
+def uncount_note(sender, instance, **kwargs):
+    user_stats.Changes().notes(instance.user_id, -1).apply(rebuild_missing=False)
+
+
+# ---------------------------
+# Cached user invalidation
+# ---------------------------
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        user_cache.invalidate_user(user.pk)
@@ -0,0 +1,286 @@
+"""
+Slow query log.
+
+``record_query`` is an execute wrapper on every connection (like the ones
+in core.instrumentation and core.metrics). It is off unless SLOW_QUERY_MS
+is set; then a query taking that long or longer is logged to the
+"core.slow_queries" logger as one JSON line: its SQL, the service method
+and view that issued it, and the EXPLAIN (QUERY PLAN) output, run on a
+fresh cursor of the same connection (in a savepoint inside a transaction).
+
+Parameters are user data (note contents, search terms), so by default only
+their types are logged, and quoted literals in plan lines are masked.
+SLOW_QUERY_LOG_PARAMS = True logs their values (truncated) instead.
+
+Queries are grouped by fingerprint (the SQL with literals and IN lists
+collapsed). A fingerprint is logged at most once per SLOW_QUERY_RATE_LIMIT
+seconds per process; the durations of the occurrences in between ride
+along with the next entry as ``repeats_ms``, so ``manage.py slow_queries``
+still sees every one of them.
+"""
+import hashlib
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils import timezone
+
+from .bench import percentile
+from .instrumentation import service_method
+
+logger = logging.getLogger("core.slow_queries")
+
+_request = ContextVar("slow_queries_request", default=None)
+
+# Statements EXPLAIN accepts; the rest (PRAGMA, SAVEPOINT, DDL) are logged without a plan
+EXPLAINABLE = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.I)
+
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+# Longest parameter value logged, and most repeat durations kept per entry
+MAX_PARAM_LENGTH = 200
+MAX_REPEATS = 1000
+
+_QUOTED = re.compile(r"'(?:[^']|'')*'")
+
+_FINGERPRINT_RULES = [
+    (_QUOTED, "?"),
+    # Savepoint names are unique per call
+    (re.compile(r'"s\d+_x\d+"'), "?"),
+    (re.compile(r"\b\d+(\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def threshold_ms():
+    return getattr(settings, "SLOW_QUERY_MS", None)
+
+
+def rate_limit():
+    return getattr(settings, "SLOW_QUERY_RATE_LIMIT", 60)
+
+
+def log_params():
+    return getattr(settings, "SLOW_QUERY_LOG_PARAMS", False)
+
+
+def normalize(sql):
+    for pattern, replacement in _FINGERPRINT_RULES:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize(sql).encode()).hexdigest()[:12]
+
+
+# ---------------------------
+# Request context
+# ---------------------------
+
+def track(request):
+    """Make `request` the one slow queries are attributed to; returns a token for `untrack`."""
+    return _request.set(request)
+
+
+def untrack(token):
+    _request.reset(token)
+
+
+def _view():
+    request = _request.get()
+    if request is None:
+        return "", ""
+    match = getattr(request, "resolver_match", None)
+    return (match.view_name if match is not None else ""), request.path
+
+
+# ---------------------------
+# Recording
+# ---------------------------
+
+class RateLimiter:
+    """Per-fingerprint: when it was last logged and the durations since."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def check(self, key, duration_ms, now):
+        """
+        (log it?, durations of the suppressed repeats since the last entry).
+        Suppressed calls only record their duration.
+        """
+        with self.lock:
+            last, repeats = self.entries.get(key, (None, []))
+            if last is not None and now - last < rate_limit():
+                if len(repeats) < MAX_REPEATS:
+                    repeats.append(duration_ms)
+                self.entries[key] = (last, repeats)
+                return False, None
+            self.entries[key] = (now, [])
+            return True, repeats
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+limiter = RateLimiter()
+
+
+def explain(connection, sql, params, many):
+    """Plan lines for the query, or None if it can't be explained."""
+    if not EXPLAINABLE.match(sql):
+        return None
+    if many:
+        params = next(iter(params), None)
+    # Inside a transaction the EXPLAIN runs in a savepoint: on PostgreSQL a
+    # failed statement would otherwise abort the transaction, and every
+    # later query of the request with it
+    savepoint = connection.in_atomic_block and connection.features.uses_savepoints
+    try:
+        # A cursor without execute wrappers, so the EXPLAIN (and its savepoint) isn't timed or logged itself
+        cursor = connection.create_cursor()
+        try:
+            if savepoint:
+                cursor.execute(connection.ops.savepoint_create_sql(EXPLAIN_SAVEPOINT))
+            try:
+                cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+                rows = cursor.fetchall()
+            except Exception:
+                if savepoint:
+                    cursor.execute(connection.ops.savepoint_rollback_sql(EXPLAIN_SAVEPOINT))
+                raise
+            if savepoint:
+                cursor.execute(connection.ops.savepoint_commit_sql(EXPLAIN_SAVEPOINT))
+        finally:
+            cursor.close()
+    except Exception as exc:
+        return [f"EXPLAIN failed: {exc}"]
+    column = -1 if connection.vendor == "sqlite" else 0
+    return [str(row[column]) for row in rows]
+
+
+def _params(params, many, values):
+    """The parameters, or with `values` False only their type names."""
+    if params is None:
+        return None
+    if many:
+        params = next(iter(params), ())
+    param = _param if values else _param_type
+    if isinstance(params, dict):
+        return {key: param(value) for key, value in params.items()}
+    return [param(value) for value in params]
+
+
+def _param(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    return text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH] + "..."
+
+
+def _param_type(value):
+    return type(value).__name__
+
+
+def _mask_plan(plan):
+    # PostgreSQL plans show parameters as quoted literals (SQLite's don't)
+    return plan and [_QUOTED.sub("'?'", line) for line in plan]
+
+
+def report(sql, params, many, connection, duration_ms, frame):
+    key = fingerprint(sql)
+    log_it, repeats = limiter.check(key, duration_ms, time.monotonic())
+    if not log_it:
+        return
+    view, path = _view()
+    values = log_params()
+    plan = explain(connection, sql, params, many)
+    logger.warning(json.dumps({
+        "at": timezone.now().isoformat(),
+        "fingerprint": key,
+        "duration_ms": round(duration_ms, 2),
+        "service": service_method(frame),
+        "view": view,
+        "path": path,
+        "alias": connection.alias,
+        "sql": sql,
+        "params": _params(params, many, values),
+        "plan": plan if values else _mask_plan(plan),
+        "repeats_ms": [round(ms, 2) for ms in repeats],
+    }, default=str))
+
+
+def record_query(execute, sql, params, many, context):
+    start_time = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration_ms = (time.perf_counter() - start_time) * 1000
+    threshold = threshold_ms()
+    if threshold is not None and duration_ms >= threshold:
+        report(sql, params, many, context["connection"], duration_ms, sys._getframe(1))
+    return result
+
+
+def install(sender=None, connection=None, **kwargs):
+    """connection_created handler: add record_query to the connection's execute wrappers."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# ---------------------------
+# Reading the log
+# ---------------------------
+
+def read(lines):
+    """Entries of a slow query log (other lines are skipped)."""
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and "fingerprint" in entry:
+            yield entry
+
+
+def summarize(entries):
+    """
+    One row per fingerprint: count, p95_ms, total_ms, max_ms, the services
+    and views seen, and the latest entry (for its SQL and plan), by total
+    time descending.
+    """
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry["fingerprint"], {
+            "fingerprint": entry["fingerprint"], "durations": [], "services": set(), "views": set(),
+        })
+        group["durations"].append(entry["duration_ms"])
+        group["durations"].extend(entry.get("repeats_ms", []))
+        if entry.get("service"):
+            group["services"].add(entry["service"])
+        if entry.get("view"):
+            group["views"].add(entry["view"])
+        group["latest"] = entry
+
+    rows = []
+    for group in groups.values():
+        durations = group.pop("durations")
+        rows.append({
+            **group,
+            "count": len(durations),
+            "p95_ms": percentile(sorted(durations), 0.95),
+            "total_ms": sum(durations),
+            "max_ms": max(durations),
+            "services": sorted(group["services"]),
+            "views": sorted(group["views"]),
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
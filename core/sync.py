@@ -0,0 +1,46 @@
+"""
+Recording side of the sync change log (SyncChange).
+
+Each change replaces the object's previous entry with a new one at the end
+of the log, so a client holding cursor N only needs the entries after N to
+bring its replica up to date. Callers that bypass save()/delete() (bulk
+inserts, queryset updates) must call ``record`` themselves.
+"""
+from django.db import transaction
+
+from .models import SyncChange
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def record(user_id, kind, object_ids, deleted=False):
+    """Log a change of the given objects of one kind, owned by `user_id`."""
+    object_ids = list(object_ids)
+    if user_id is None or not object_ids:
+        return
+    # Delete and insert must land together, or the object drops out of the log
+    with transaction.atomic(savepoint=False):
+        SyncChange.objects.filter(kind=kind, object_id__in=object_ids).delete()
+        SyncChange.objects.bulk_create([
+            SyncChange(user_id=user_id, kind=kind, object_id=pk, deleted=deleted) for pk in object_ids
+        ])
+
+
+def compact(older_than):
+    """
+    Delete tombstones recorded before `older_than` and move each affected
+    user's reset marker past them. Clients with an older cursor have to
+    sync again from 0. Returns the number of tombstones removed.
+    """
+    removed = 0
+    tombstones = SyncChange.objects.filter(deleted=True, changed_at__lt=older_than)
+    for user_id in tombstones.order_by().values_list("user_id", flat=True).distinct():
+        with transaction.atomic():
+            count, _ = tombstones.filter(user_id=user_id).delete()
+            # One marker per user, keyed by the user id
+            record(user_id, SyncChange.KIND_RESET, [user_id])
+        removed += count
+    return removed
+
@@ -0,0 +1,77 @@
+import datetime
+import json
+from django.core.cache import cache
+from django.db.models.signals import post_init
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from . import serializers
+from .management.commands.bench_serializers import legacy_reminder_items
+from .models import Note, Todo
+from .services import TodoService
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SERVER_TIMING_SAMPLE_RATE=0)
+class JsonApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='api', password='password123')
+        self.now = timezone.now()
+        self.todo = Todo.objects.create(
+            user=self.user, task="Call", activity=Todo.ACTIVITY_OTHER, activity_custom="Phone",
+            due_date=self.now.date() + datetime.timedelta(days=3), reminder=self.now + datetime.timedelta(minutes=5),
+        )
+        Todo.objects.create(user=self.user, task="Shop", activity=Todo.ACTIVITY_SHOPPING, reminder=self.now - datetime.timedelta(hours=1))
+        self.note = Note.objects.create(user=self.user, title="N", content="<p>Body text</p>")
+        self.client = Client()
+        self.client.login(username='api', password='password123')
+
+    def get_json(self, path, **params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_todos_default_fields(self):
+        rows = self.get_json('/api/todos/')
+        self.assertEqual([row["task"] for row in rows], ["Call", "Shop"])
+        self.assertEqual(rows[0]["activity"], "Phone")
+        self.assertEqual(rows[1]["activity"], "Shopping")
+        self.assertEqual(rows[0]["status_label"], "To Do")
+        self.assertEqual(rows[0]["due_date"], self.todo.due_date.isoformat())
+        self.assertEqual(rows[0]["edit_url"], f"/todos/edit/{self.todo.pk}/")
+
+    def test_sparse_fieldset(self):
+        rows = self.get_json('/api/notes/', fields="id,title")
+        self.assertEqual(rows, [{"id": self.note.pk, "title": "N"}])
+        self.assertNotIn("content", self.get_json('/api/notes/')[0])
+        self.assertEqual(self.get_json('/api/notes/', fields="content")[0]["content"], "<p>Body text</p>")
+
+    def test_errors(self):
+        self.assertEqual(self.client.get('/api/todos/', {"fields": "id,password"}).status_code, 400)
+        self.assertEqual(self.client.get('/api/users/').status_code, 404)
+
+    def test_empty_and_other_users(self):
+        User.objects.create_user(username='empty', password='password123')
+        client = Client()
+        client.login(username='empty', password='password123')
+        self.assertEqual(json.loads(b"".join(client.get('/api/todos/').streaming_content)), [])
+
+    def test_no_model_instances(self):
+        created = []
+        def count(sender, **kwargs):
+            created.append(sender)
+        serializer = serializers.TODOS
+        post_init.connect(count, sender=Todo)
+        try:
+            list(serializers.stream_json(Todo.objects.filter(user=self.user), serializer))
+        finally:
+            post_init.disconnect(count, sender=Todo)
+        self.assertEqual(created, [])
+
+    def test_reminder_items_match_legacy_closure(self):
+        qs = Todo.objects.filter(user=self.user).order_by("reminder")
+        self.assertEqual(serializers.REMINDER_ITEMS.serialize(qs), legacy_reminder_items(qs.all()))
+        data = TodoService(self.user).get_reminders_status_data(self.now)
+        self.assertEqual(data["soon"][0]["activity"], "Phone")
+        self.assertEqual(data["overdue"][0]["task"], "Shop")
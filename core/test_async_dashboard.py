@@ -0,0 +1,90 @@
+import threading
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from . import async_db
+from .services import TodoService
+from .models import Note, Todo
+import datetime
+
+
+def make_data(user, now):
+    Note.objects.create(user=user, title="Async note", content="Gathered")
+    for i in range(4):
+        Todo.objects.create(user=user, task=f"Overdue {i}", reminder=now - datetime.timedelta(hours=i + 1))
+        Todo.objects.create(user=user, task=f"Soon {i}", reminder=now + datetime.timedelta(minutes=10 + i))
+        Todo.objects.create(user=user, task=f"Today {i}", due_date=now.date(), is_important=True)
+    Todo.objects.create(user=user, task="Gathered todo", done=True)
+
+
+class AsyncDashboardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='async', password='password123')
+        self.now = timezone.now()
+        make_data(self.user, self.now)
+
+    async def test_matches_sync_context(self):
+        service = TodoService(self.user, use_cache=False)
+        # Inside the test transaction the async ORM fallback is used
+        self.assertFalse(await async_db.parallel_allowed())
+        context = await service.aget_dashboard_data(self.now, "gathered")
+        expected = await async_db.call(service.get_dashboard_data, self.now, "gathered", parallel=False)
+        self.assertEqual(context, expected)
+        self.assertEqual((context["notes_total"], context["todos_total"]), (1, 1))
+
+    async def test_uses_and_fills_cache(self):
+        service = TodoService(self.user)
+        first = await service.aget_dashboard_data(self.now)
+        with mock.patch.object(async_db, "fetch", side_effect=AssertionError("queried")):
+            second = await service.aget_dashboard_data(self.now)
+        self.assertEqual(first, second)
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    async def test_view_under_asgi(self):
+        await self.async_client.alogin(username='async', password='password123')
+        response = await self.async_client.get('/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Tasks Due")
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_view_under_wsgi(self):
+        self.client.login(username='async', password='password123')
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Tasks Due")
+
+
+class ParallelDashboardTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='parallel', password='password123')
+        self.now = timezone.now()
+        make_data(self.user, self.now)
+
+    async def test_sections_run_on_worker_threads(self):
+        service = TodoService(self.user, use_cache=False)
+        self.assertTrue(await async_db.parallel_allowed())
+
+        threads = []
+        run = async_db._in_own_connection
+
+        def record(func, *args):
+            threads.append(threading.get_ident())
+            return run(func, *args)
+
+        with mock.patch.object(async_db, "_in_own_connection", record):
+            context = await service.aget_dashboard_data(self.now, "gathered")
+        expected = await async_db.call(service.get_dashboard_data, self.now, "gathered", parallel=False)
+        self.assertEqual(context, expected)
+        # Four sections and two search kinds, none on the request's own thread
+        request_thread = await sync_to_async(threading.get_ident)()
+        self.assertEqual(len(threads), 6)
+        self.assertNotIn(request_thread, threads)
+
+    @override_settings(ASYNC_PARALLEL_QUERIES=False)
+    async def test_setting_disables_parallel(self):
+        self.assertFalse(await async_db.parallel_allowed())
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.contrib.auth.models import User
+from . import bench
+from .models import Note, Todo
+
+
+class BenchServicesTest(TestCase):
+    def test_seed_spread(self):
+        users = bench.seed(users=2, todos=200, notes=10, random_seed=1)
+        self.assertEqual(Todo.objects.filter(user=users[0]).count(), 200)
+        self.assertEqual(Note.objects.filter(user=users[1]).count(), 10)
+        todos = Todo.objects.filter(user=users[0])
+        self.assertTrue(todos.filter(status=Todo.STATUS_IN_PROGRESS).exists())
+        self.assertTrue(todos.filter(status=Todo.STATUS_COMPLETED, done=True).exists())
+        self.assertTrue(todos.filter(reminder__isnull=False).exists())
+        self.assertTrue(todos.filter(is_important=True).exists())
+        # done/status stay in sync even though bulk_create skips save()
+        self.assertFalse(todos.filter(done=True).exclude(status=Todo.STATUS_COMPLETED).exists())
+        self.assertFalse(Note.objects.filter(preview="").exists())
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(bench.percentile(values, 0.5), 50)
+        self.assertEqual(bench.percentile(values, 0.99), 99)
+        self.assertEqual(bench.percentile([7], 0.95), 7)
+
+    def test_compare_flags_slowdowns_and_extra_queries(self):
+        baseline = {"a": {"p50_ms": 10, "queries": 2}, "b": {"p50_ms": 10, "queries": 2}, "c": {"p50_ms": 10, "queries": 2}}
+        current = {"a": {"p50_ms": 11, "queries": 2}, "b": {"p50_ms": 13, "queries": 2},
+                   "c": {"p50_ms": 9, "queries": 3}, "d": {"p50_ms": 1, "queries": 1}}
+        regressed = {row[0]: row[-1] for row in bench.compare(baseline, current, threshold=0.2)}
+        self.assertEqual(regressed, {"a": False, "b": True, "c": True, "d": False})
+
+    def test_command_writes_and_compares(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.json")
+            out = StringIO()
+            call_command("bench_services", users=1, todos=30, notes=5, repeat=2, warmup=0, output=path, stdout=out)
+            self.assertIn("TodoService.get_dashboard_data[cached]", out.getvalue())
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            self.assertEqual(data["meta"]["dataset"]["todos"], 30)
+            self.assertEqual(data["results"]["TodoService.get_dashboard_data"]["queries"], 4)
+            self.assertEqual(data["results"]["TodoService.get_dashboard_data[cached]"]["queries"], 0)
+            # Seeded data is rolled back
+            self.assertFalse(User.objects.filter(username__startswith="__bench").exists())
+
+            # A baseline that needed fewer queries makes the run fail
+            data["results"]["TodoService.get_kanban_board"]["queries"] = 1
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump(data, handle)
+            with self.assertRaises(CommandError):
+                call_command("bench_services", users=1, todos=30, notes=5, repeat=2, warmup=0, only="kanban_board",
+                             baseline=path, fail_on_regression=True, stdout=StringIO())
@@ -0,0 +1,74 @@
+import datetime
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from .services import TodoService
+from .models import Todo
+
+
+class CalendarWindowTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cal', password='password123')
+        self.service = TodoService(self.user, use_cache=False)
+        self.month = datetime.date(2031, 3, 1)
+        for day, done in ((3, False), (3, False), (3, True), (17, True), (31, False)):
+            todo = Todo.objects.create(user=self.user, task=f"March {day}", done=done)
+            # Bypass the "not in the past" rule by setting dates directly
+            Todo.objects.filter(pk=todo.pk).update(due_date=datetime.date(2031, 3, day))
+        Todo.objects.filter(pk=Todo.objects.create(user=self.user, task="April").pk).update(due_date=datetime.date(2031, 4, 2))
+        Todo.objects.filter(pk=Todo.objects.create(user=self.user, task="June").pk).update(due_date=datetime.date(2031, 6, 1))
+        other = User.objects.create_user(username='other')
+        Todo.objects.filter(pk=Todo.objects.create(user=other, task="Not mine").pk).update(due_date=datetime.date(2031, 3, 3))
+
+    def test_window_is_whole_weeks(self):
+        start, end = self.service.calendar_window(self.month)
+        # March 2031 starts on a Saturday and ends on a Monday
+        self.assertEqual((start, end), (datetime.date(2031, 2, 24), datetime.date(2031, 4, 7)))
+
+    def test_counts_aggregated_in_two_queries(self):
+        start, end = self.service.calendar_window(self.month)
+        with self.assertNumQueries(2):
+            data = self.service.get_calendar_window(start, end)
+        self.assertEqual(data["days"][datetime.date(2031, 3, 3)], {"pending": 2, "completed": 1})
+        self.assertEqual(data["days"][datetime.date(2031, 4, 2)], {"pending": 1, "completed": 0})
+        self.assertNotIn(datetime.date(2031, 6, 1), data["days"])
+        self.assertEqual(
+            [(row["month"], row["pending"], row["completed"]) for row in data["months"]],
+            [(datetime.date(2031, 3, 1), 3, 2), (datetime.date(2031, 4, 1), 1, 0)],
+        )
+
+    def test_month_grid(self):
+        context = self.service.get_calendar_month(self.month, today=datetime.date(2031, 3, 17))
+        self.assertEqual(len(context["weeks"]), 6)
+        cells = {cell["date"]: cell for week in context["weeks"] for cell in week}
+        self.assertEqual(cells[datetime.date(2031, 3, 17)]["completed"], 1)
+        self.assertTrue(cells[datetime.date(2031, 3, 17)]["is_today"])
+        self.assertFalse(cells[datetime.date(2031, 4, 2)]["in_month"])
+        self.assertEqual(context["month_totals"]["pending"], 3)
+        self.assertEqual((context["prev_month"], context["next_month"]), (datetime.date(2031, 2, 1), datetime.date(2031, 4, 1)))
+
+    def test_day_cells_paginate(self):
+        todos, cursor = self.service.get_calendar_day(datetime.date(2031, 3, 3), page_size=2)
+        self.assertEqual([todo.done for todo in todos], [False, False])
+        todos, cursor = self.service.get_calendar_day(datetime.date(2031, 3, 3), cursor, page_size=2)
+        self.assertEqual([todo.done for todo in todos], [True])
+        self.assertIsNone(cursor)
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_views(self):
+        client = Client()
+        client.login(username='cal', password='password123')
+        response = client.get('/todos/calendar/?month=2031-03')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "March 2031")
+
+        data = client.get('/todos/calendar/data/?month=2031-03').json()
+        self.assertEqual(data["days"]["2031-03-03"], {"pending": 2, "completed": 1})
+        self.assertEqual(data["months"][0]["month"], "2031-03")
+        self.assertEqual(client.get('/todos/calendar/data/?start=2031-01-01&end=2035-01-01').status_code, 400)
+
+        response = client.get('/todos/calendar/day/2031-03-03/')
+        self.assertEqual(response.json()["count"], 3)
+        self.assertContains(response, "March 3")
+        self.assertEqual(client.get('/todos/calendar/day/nope/').status_code, 400)
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .services import TodoService
+from .models import Note, Todo
+import datetime
+
+
+class DashboardQueryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='dash', password='password123')
+        self.other = User.objects.create_user(username='other', password='password123')
+        self.service = TodoService(self.user, use_cache=False)
+        self.now = timezone.now()
+        today = self.now.date()
+
+        Note.objects.create(user=self.user, title="N1", content="C1")
+        Note.objects.create(user=self.user, title="N2", content="C2")
+        Note.objects.create(user=self.other, title="Other", content="X")
+
+        for i in range(7):
+            Todo.objects.create(user=self.user, task=f"Overdue {i}", reminder=self.now - datetime.timedelta(hours=i + 1))
+            Todo.objects.create(user=self.user, task=f"Soon {i}", reminder=self.now + datetime.timedelta(minutes=5 + i))
+            Todo.objects.create(user=self.user, task=f"Later {i}", reminder=self.now + datetime.timedelta(days=i + 1))
+            Todo.objects.create(user=self.user, task=f"Today {i}", due_date=today, is_important=(i % 2 == 0))
+            Todo.objects.create(user=self.user, task=f"Plan {i}", due_date=today + datetime.timedelta(days=3 + i), is_important=True)
+        Todo.objects.create(user=self.user, task="Undated", is_important=True)
+        Todo.objects.create(user=self.user, task="Finished", done=True, due_date=today)
+        Todo.objects.create(user=self.other, task="Not mine", reminder=self.now - datetime.timedelta(hours=1))
+
+    def legacy_context(self, query=""):
+        """Context built the way the dashboard view used to build it."""
+        stats = self.service.get_dashboard_stats(query)
+        reminders = self.service.get_reminders(self.now)
+        matrix = self.service.get_priority_matrix(self.now)
+        return {
+            "notes_count": stats["notes_count"],
+            "todos_count": stats["todos_count"],
+            "completed_todos": stats["completed_todos"],
+            "upcoming_reminders": reminders["upcoming"],
+            "overdue_reminders": reminders["overdue"],
+            "soon_reminders": reminders["soon"],
+            "overdue_count": reminders["overdue_count"],
+            "soon_count": reminders["soon_count"],
+            "today_todos": list(self.service.get_daily_focus(self.now)),
+            "important_urgent": list(matrix["important_urgent"]),
+            "important_not_urgent": list(matrix["important_not_urgent"]),
+            "all_important": list(matrix["all_important"]),
+            "monthly_stats": self.service.get_monthly_stats(self.now),
+        }
+
+    def test_matches_legacy_context(self):
+        context = self.service.get_dashboard_data(self.now)
+        for key, expected in self.legacy_context().items():
+            self.assertEqual(context[key], expected, key)
+        self.assertTrue(context["show_reminder_alert"])
+
+    def test_query_budget(self):
+        # counters, reminders, today's focus, priority matrix
+        with self.assertNumQueries(4):
+            self.service.get_dashboard_data(self.now)
+
+    def test_empty_user(self):
+        service = TodoService(User.objects.create_user(username='empty', password='password123'))
+        context = service.get_dashboard_data(self.now)
+        self.assertEqual(context["notes_count"], 0)
+        self.assertEqual(context["todos_count"], 0)
+        self.assertEqual(context["monthly_stats"], {"total": 0, "pending": 0, "completed": 0})
+        self.assertFalse(context["show_reminder_alert"])
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_dashboard_view_renders(self):
+        client = Client()
+        client.login(username='dash', password='password123')
+        response = client.get('/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Tasks Due")
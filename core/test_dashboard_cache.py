@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from . import dashboard_cache
+from .services import TodoService
+from .models import Note, Todo
+import datetime
+
+
+class DashboardCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cached', password='password123')
+        self.service = TodoService(self.user)
+        self.now = timezone.now()
+        Todo.objects.create(user=self.user, task="T1", due_date=self.now.date())
+
+    def test_second_load_hits_cache(self):
+        first = self.service.get_dashboard_data(self.now)
+        with self.assertNumQueries(0):
+            second = self.service.get_dashboard_data(self.now)
+        self.assertEqual(first["todos_count"], second["todos_count"])
+        stats = dashboard_cache.stats()
+        self.assertEqual(stats["misses"], 4)
+        self.assertEqual(stats["hits"], 4)
+
+    def test_model_save_and_delete_invalidate(self):
+        self.assertEqual(self.service.get_dashboard_data(self.now)["todos_count"], 1)
+        todo = Todo.objects.create(user=self.user, task="T2")
+        self.assertEqual(self.service.get_dashboard_data(self.now)["todos_count"], 2)
+        todo.delete()
+        self.assertEqual(self.service.get_dashboard_data(self.now)["todos_count"], 1)
+        Note.objects.create(user=self.user, title="N", content="C")
+        self.assertEqual(self.service.get_dashboard_data(self.now)["notes_count"], 1)
+
+    def test_service_methods_invalidate(self):
+        todo = Todo.objects.get(user=self.user)
+        self.assertEqual(self.service.get_dashboard_data(self.now)["completed_todos"], 0)
+        # A queryset update skips signals; update_status must still invalidate
+        self.service.update_status(todo.id, Todo.STATUS_COMPLETED)
+        self.assertEqual(self.service.get_dashboard_data(self.now)["completed_todos"], 1)
+
+    def test_calendar_is_cached(self):
+        self.service.get_calendar_data()
+        with self.assertNumQueries(0):
+            data = self.service.get_calendar_data()
+        self.assertEqual(len(data["grouped_pending"]), 1)
+
+    def test_other_users_not_invalidated(self):
+        other = User.objects.create_user(username='other', password='password123')
+        self.service.get_dashboard_data(self.now)
+        Todo.objects.create(user=other, task="Not mine")
+        with self.assertNumQueries(0):
+            self.service.get_dashboard_data(self.now)
+
+    def test_ttl_follows_next_reminder(self):
+        Todo.objects.create(user=self.user, task="Later", reminder=self.now + datetime.timedelta(hours=3))
+        counters = self.service.get_dashboard_counters(self.now)
+        # Enters the one-hour "soon" window two hours from now
+        self.assertEqual(counters["next_change"], self.now + datetime.timedelta(hours=2))
+
+        Todo.objects.create(user=self.user, task="Soon", reminder=self.now + datetime.timedelta(minutes=30))
+        counters = self.service.get_dashboard_counters(self.now)
+        # Already "soon"; turns overdue at the reminder itself
+        self.assertEqual(counters["next_change"], self.now + datetime.timedelta(minutes=30))
+        self.assertEqual(dashboard_cache.seconds_until(self.now, counters["next_change"]), 1800)
+
+    def test_timeout_capped_without_shared_cache(self):
+        version, _ = dashboard_cache.get_many(self.user.pk, ["calendar"])
+        for shared, timeout in ((False, 60), (True, 3600)):
+            with override_settings(SHARED_CACHE=shared), mock.patch.object(dashboard_cache.cache, "set_many") as set_many:
+                dashboard_cache.set_many(self.user.pk, version, {"calendar": []}, 3600)
+            self.assertEqual(set_many.call_args.args[1], timeout)
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+from django.conf import settings
+from django.db import transaction
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+from .database import sqlite_pragmas
+
+WRITERS = 8
+MOVES = 25
+
+
+class SQLiteConcurrencyTest(SimpleTestCase):
+    """
+    Parallel read-then-write transactions (the shape of a Kanban move) on a
+    file database, each thread on its own connection as under gunicorn.
+    The test database is in memory, so this uses a temporary file.
+    """
+    # Connections to a temporary file, under their own handler. Its alias is
+    # "default" so transaction.atomic() below resolves it (see setUp).
+    databases = {"default"}
+
+    def setUp(self):
+        if settings.DATABASES["default"]["ENGINE"] != "django.db.backends.sqlite3":
+            self.skipTest("SQLite only")
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        self.connections = ConnectionHandler({
+            "default": {**settings.DATABASES["default"], "NAME": self.path, "CONN_MAX_AGE": 0},
+        })
+        patcher = mock.patch.object(transaction, "connections", self.connections)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with self.connections["default"].cursor() as cursor:
+            cursor.execute("CREATE TABLE counter (id INTEGER PRIMARY KEY, n INTEGER NOT NULL)")
+            cursor.execute("INSERT INTO counter VALUES (1, 0)")
+
+    def tearDown(self):
+        self.connections.close_all()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def writer(self, errors):
+        try:
+            for _ in range(MOVES):
+                with transaction.atomic():
+                    with self.connections["default"].cursor() as cursor:
+                        cursor.execute("SELECT n FROM counter WHERE id = 1")
+                        (n,) = cursor.fetchone()
+                        cursor.execute("UPDATE counter SET n = %s WHERE id = 1", [n + 1])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            self.connections["default"].close()
+
+    def test_pragmas_applied(self):
+        with self.connections["default"].cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0].upper(), sqlite_pragmas()["journal_mode"])
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], sqlite_pragmas()["busy_timeout"])
+
+    def test_parallel_writers_do_not_fail(self):
+        errors = []
+        threads = [threading.Thread(target=self.writer, args=(errors,)) for _ in range(WRITERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        with self.connections["default"].cursor() as cursor:
+            cursor.execute("SELECT n FROM counter WHERE id = 1")
+            # No update was lost either
+            self.assertEqual(cursor.fetchone()[0], WRITERS * MOVES)
@@ -0,0 +1,18 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth.models import User
+from .models import Todo
+
+
+class ExplainQueriesCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='planner', password='password123')
+        Todo.objects.create(user=self.user, task="T1")
+
+    def test_no_service_query_scans_a_table(self):
+        out = StringIO()
+        call_command("explain_queries", "--user", "planner", stdout=out)
+        output = out.getvalue()
+        self.assertIn("queries explained", output)
+        self.assertNotIn("full scan", output)
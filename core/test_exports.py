@@ -0,0 +1,68 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from .exports import stream_export
+from .models import Note, Todo
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='export', password='password123')
+        self.other = User.objects.create_user(username='other', password='password123')
+        for i in range(450):
+            Todo.objects.create(user=self.user, task=f"Task {i}, \"quoted\"", is_important=(i % 3 == 0))
+        Note.objects.create(user=self.user, title="Ünïcode", content="<p>Line one</p>\nLine two")
+        Todo.objects.create(user=self.other, task="Not mine")
+
+    def read(self, *args, **kwargs):
+        return b"".join(stream_export(self.user, *args, **kwargs))
+
+    def test_csv_round_trip(self):
+        rows = list(csv.DictReader(io.StringIO(self.read("todos", "csv").decode())))
+        self.assertEqual(len(rows), 450)
+        self.assertEqual(rows[0]["task"], 'Task 0, "quoted"')
+        self.assertEqual(rows[0]["is_important"], "True")
+
+    def test_ndjson_and_gzip(self):
+        lines = gzip.decompress(self.read("notes", "ndjson", compress=True)).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        note = json.loads(lines[0])
+        self.assertEqual(note["title"], "Ünïcode")
+        self.assertEqual(note["content"], "<p>Line one</p>\nLine two")
+
+    def test_streams_in_chunks(self):
+        chunks = list(stream_export(self.user, "todos", "ndjson"))
+        self.assertGreater(len(chunks), 1)
+
+    def test_empty_csv_has_header(self):
+        data = b"".join(stream_export(User.objects.create_user(username='empty'), "notes", "csv"))
+        self.assertEqual(data.decode().strip(), "id,title,content,created_at")
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            stream_export(self.user, "users")
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_export_view(self):
+        client = Client()
+        client.login(username='export', password='password123')
+        response = client.get('/export/todos/?format=ndjson&gzip=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('todos.ndjson.gz', response["Content-Disposition"])
+        lines = gzip.decompress(b"".join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 450)
+        self.assertEqual(client.get('/export/todos/?format=xml').status_code, 400)
+
+    def test_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "todos.csv")
+            call_command("export_data", user="export", kind="todos", output=path, stderr=io.StringIO())
+            with open(path, encoding="utf-8") as handle:
+                self.assertEqual(len(list(csv.DictReader(handle))), 450)
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.test.signals import template_rendered
+from django.contrib.auth.models import User
+from .models import Note, Todo
+from .services import TodoService
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SERVER_TIMING_SAMPLE_RATE=0)
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cards', password='password123')
+        self.todos = [Todo.objects.create(user=self.user, task=f"Task {i}") for i in range(5)]
+        self.note = Note.objects.create(user=self.user, title="Note", content="<p>Hello</p>")
+        self.client = Client()
+        self.client.login(username='cards', password='password123')
+
+    def rendered(self, path, template_name):
+        names = []
+        def record(sender, template, **kwargs):
+            names.append(template.name)
+        template_rendered.connect(record)
+        try:
+            response = self.client.get(path)
+        finally:
+            template_rendered.disconnect(record)
+        self.assertEqual(response.status_code, 200)
+        return response, names.count(template_name)
+
+    def test_kanban_renders_only_changed_cards(self):
+        _, count = self.rendered('/todos/', "todo_card.html")
+        self.assertEqual(count, 5)
+        _, count = self.rendered('/todos/', "todo_card.html")
+        self.assertEqual(count, 0)
+
+        todo = self.todos[2]
+        todo.task = "Renamed"
+        todo.save()
+        response, count = self.rendered('/todos/', "todo_card.html")
+        self.assertEqual(count, 1)
+        self.assertContains(response, "Renamed")
+
+    def test_batch_moves_bump_updated_at(self):
+        before = Todo.objects.get(pk=self.todos[0].pk).updated_at
+        TodoService(self.user).update_statuses([{"id": self.todos[0].pk, "status": "COMPLETED"}])
+        self.assertGreater(Todo.objects.get(pk=self.todos[0].pk).updated_at, before)
+
+    def test_column_and_notes_share_cache(self):
+        self.rendered('/todos/', "todo_card.html")
+        response = self.client.get('/todos/column/pending/')
+        self.assertEqual(response.json()["count"], 5)
+        self.assertIn("Task 4", response.json()["html"])
+
+        _, count = self.rendered('/notes/', "note_card.html")
+        self.assertEqual(count, 1)
+        self.note.title = "Edited"
+        self.note.save()
+        response, count = self.rendered('/notes/', "note_card.html")
+        self.assertEqual(count, 1)
+        self.assertContains(response, "Edited")
@@ -0,0 +1,111 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import tempfile
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .exports import stream_export
+from .imports import BulkImporter, open_text, parse_rows
+from .models import Note, ReminderChange, Todo
+from .services import SearchService, TodoService
+
+
+def rows_from(text, fmt):
+    return parse_rows(open_text(io.BytesIO(text.encode())), fmt)
+
+
+class BulkImportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='importer', password='password123')
+        self.tomorrow = (timezone.now().date() + datetime.timedelta(days=1)).isoformat()
+
+    def test_csv_validation_and_normalisation(self):
+        text = (
+            "task,done,status,due_date,activity,activity_custom\n"
+            f"Buy milk,False,COMPLETED,{self.tomorrow},shopping,stray\n"
+            "Old,False,,2001-01-01,custom,\n"
+            ",False,,,custom,\n"
+            "Gym,True,IN_PROGRESS,,custom,  Climbing  \n"
+            "Plain,,,,,\n"
+        )
+        report = BulkImporter(self.user, "todos").run(rows_from(text, "csv"))
+        self.assertEqual((report["created"], report["rejected"]), (3, 2))
+        self.assertEqual([reject["line"] for reject in report["rejects"]], [3, 4])
+        self.assertIn("due_date", report["rejects"][0]["errors"])
+        self.assertIn("task", report["rejects"][1]["errors"])
+
+        milk = Todo.objects.get(task="Buy milk")
+        # explicit done=False wins over status, as in Todo.save
+        self.assertEqual((milk.status, milk.done, milk.activity_custom), ("PENDING", False, ""))
+        gym = Todo.objects.get(task="Gym")
+        self.assertEqual((gym.status, gym.done, gym.activity_custom), ("COMPLETED", True, "Climbing"))
+        plain = Todo.objects.get(task="Plain")
+        self.assertEqual((plain.status, plain.activity), ("PENDING", Todo.ACTIVITY_OTHER))
+
+    def test_malformed_csv_record_is_rejected_and_reading_continues(self):
+        text = "task\nBefore\n" + "x" * (csv.field_size_limit() + 1) + "\nAfter\n"
+        report = BulkImporter(self.user, "todos").run(rows_from(text, "csv"))
+        self.assertEqual((report["created"], report["rejected"]), (2, 1))
+        self.assertEqual(report["rejects"][0]["line"], 3)
+        self.assertEqual(set(Todo.objects.values_list("task", flat=True)), {"Before", "After"})
+
+    def test_batches_and_side_effects(self):
+        reminder = (timezone.now() + datetime.timedelta(hours=2)).isoformat()
+        lines = [json.dumps({"task": f"Imported {i}", "reminder": reminder, "status": "IN_PROGRESS"}) for i in range(25)]
+        lines.insert(3, "{not json")
+        TodoService(self.user).get_dashboard_data(timezone.now())  # warm the cache
+
+        report = BulkImporter(self.user, "todos", batch_size=10).run(rows_from("\n".join(lines), "ndjson"))
+        self.assertEqual((report["created"], report["rejected"]), (25, 1))
+        self.assertEqual(report["rejects"][0]["line"], 4)
+        self.assertEqual(ReminderChange.objects.count(), 25)
+        self.assertEqual(SearchService(self.user).search("Imported")["total"], 25)
+        self.assertEqual(TodoService(self.user).get_dashboard_data(timezone.now())["todos_count"], 25)
+
+    def test_notes_get_previews(self):
+        report = BulkImporter(self.user, "notes").run(
+            rows_from(json.dumps({"title": "Hello", "content": "<p>Some <b>rich</b> text</p>"}), "ndjson")
+        )
+        self.assertEqual(report["created"], 1)
+        note = Note.objects.get()
+        self.assertEqual((note.preview, note.word_count), ("Some rich text", 3))
+
+    def test_export_round_trip(self):
+        for i in range(5):
+            Todo.objects.create(user=self.user, task=f"Task {i}", done=(i % 2 == 0))
+        other = User.objects.create_user(username='copy')
+        data = b"".join(stream_export(self.user, "todos", "csv", compress=True))
+        report = BulkImporter(other, "todos").run(parse_rows(open_text(io.BytesIO(data), compressed=True), "csv"))
+        self.assertEqual(report["created"], 5)
+        self.assertEqual(Todo.objects.filter(user=other, done=True, status="COMPLETED").count(), 3)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "todos.ndjson.gz")
+            rejects = os.path.join(tmp, "rejects.ndjson")
+            with gzip.open(path, "wt", encoding="utf-8") as handle:
+                handle.write('{"task": "One"}\n{"task": ""}\n')
+            out = io.StringIO()
+            call_command("import_data", path, user="importer", rejects=rejects, stdout=out)
+            self.assertIn("Imported 1 todos, rejected 1", out.getvalue())
+            self.assertIn("rows/s", out.getvalue())
+            with open(rejects, encoding="utf-8") as handle:
+                self.assertEqual(json.loads(handle.readline())["line"], 2)
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_upload_view(self):
+        client = Client()
+        client.login(username='importer', password='password123')
+        upload = SimpleUploadedFile("notes.csv", b"title,content\nA,Body\n")
+        response = client.post('/import/notes/', {"file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["created"], 1)
+        self.assertEqual(client.post('/import/notes/').status_code, 400)
@@ -0,0 +1,83 @@
+import json
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .services import TodoService
+from .models import ReminderChange, Todo
+import datetime
+
+
+class KanbanBatchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='kanban', password='password123')
+        self.other = User.objects.create_user(username='other', password='password123')
+        self.service = TodoService(self.user)
+        self.todos = [Todo.objects.create(user=self.user, task=f"Task {i}") for i in range(5)]
+
+    def test_moves_apply_in_one_update(self):
+        moves = [{"id": todo.pk, "status": "IN_PROGRESS"} for todo in self.todos[:3]]
+        moves.append({"id": self.todos[3].pk, "status": "COMPLETED"})
+        # owned-row lookup, one UPDATE, the sync log delete/insert and the
+        # UserStats counter update inside a savepoint; no reminders, so no
+        # outbox insert, and no due dates, so no month counters
+        with self.assertNumQueries(7):
+            results = self.service.update_statuses(moves)
+        self.assertTrue(all(result["status"] == "success" for result in results))
+
+        statuses = dict(Todo.objects.values_list("pk", "status"))
+        self.assertEqual([statuses[todo.pk] for todo in self.todos],
+                         ["IN_PROGRESS", "IN_PROGRESS", "IN_PROGRESS", "COMPLETED", "PENDING"])
+        self.assertTrue(Todo.objects.get(pk=self.todos[3].pk).done)
+
+    def test_done_stays_in_sync(self):
+        Todo.objects.filter(pk=self.todos[0].pk).update(status="COMPLETED", done=True)
+        self.service.update_statuses([{"id": self.todos[0].pk, "status": "PENDING"}])
+        todo = Todo.objects.get(pk=self.todos[0].pk)
+        self.assertEqual((todo.status, todo.done), ("PENDING", False))
+
+    def test_per_item_errors(self):
+        foreign = Todo.objects.create(user=self.other, task="Not mine")
+        results = self.service.update_statuses([
+            {"id": self.todos[0].pk, "status": "BOGUS"},
+            {"id": foreign.pk, "status": "COMPLETED"},
+            {"id": "x", "status": "COMPLETED"},
+            {"id": self.todos[1].pk, "status": "COMPLETED"},
+        ])
+        self.assertEqual([result["status"] for result in results], ["error", "error", "error", "success"])
+        self.assertEqual(Todo.objects.get(pk=foreign.pk).status, "PENDING")
+        self.assertEqual(Todo.objects.get(pk=self.todos[0].pk).status, "PENDING")
+
+    def test_reminder_outbox(self):
+        reminder = timezone.now() + datetime.timedelta(hours=1)
+        todo = Todo.objects.create(user=self.user, task="Remind", reminder=reminder)
+        ReminderChange.objects.all().delete()
+
+        self.service.update_statuses([{"id": todo.pk, "status": "COMPLETED"}])
+        self.assertEqual(list(ReminderChange.objects.values_list("todo_id", "reminder")), [(todo.pk, None)])
+
+        self.service.update_statuses([{"id": todo.pk, "status": "IN_PROGRESS"}])
+        self.assertEqual(ReminderChange.objects.order_by("-id").values_list("reminder", flat=True).first(), reminder)
+
+    def test_invalidates_dashboard_cache(self):
+        now = timezone.now()
+        self.assertEqual(self.service.get_dashboard_data(now)["completed_todos"], 0)
+        self.service.update_statuses([{"id": self.todos[0].pk, "status": "COMPLETED"}])
+        self.assertEqual(self.service.get_dashboard_data(now)["completed_todos"], 1)
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_batch_view(self):
+        client = Client()
+        client.login(username='kanban', password='password123')
+        response = client.post(
+            '/todos/update-status/batch/',
+            json.dumps({"moves": [{"id": self.todos[0].pk, "status": "COMPLETED"},
+                                  {"id": self.todos[1].pk, "status": "NOPE"}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "partial")
+
+        response = client.post('/todos/update-status/batch/', "{}", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,144 @@
+import json
+import os
+import re
+import tempfile
+import time
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase, Client, override_settings
+from . import metrics
+
+
+def parse(text):
+    """{'name{labels}': value} for the sample lines of an exposition."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            samples[key] = float(value)
+    return samples
+
+
+class MetricsTestBase(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings = override_settings(
+            SECURE_SSL_REDIRECT=False, SERVER_TIMING_SAMPLE_RATE=0, METRICS_DIR=self.tmp.name, METRICS_TOKEN="",
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # A fresh registry, as in a newly forked worker
+        patcher = mock.patch.object(metrics, "_registry", metrics.Registry())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class MetricsEndpointTest(MetricsTestBase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='watched', password='password123', is_staff=True)
+        self.client = Client()
+        self.client.login(username='watched', password='password123')
+
+    def test_request_metrics(self):
+        self.client.get('/dashboard/')
+        etag = self.client.get('/reminders/status/')["ETag"]
+        self.assertEqual(self.client.get('/reminders/status/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        samples = parse(response.content.decode())
+
+        self.assertEqual(samples['smartapp_http_request_duration_seconds_count{method="GET",view="dashboard"}'], 1)
+        self.assertEqual(samples['smartapp_http_request_duration_seconds_bucket{method="GET",view="dashboard",le="+Inf"}'], 1)
+        self.assertEqual(samples['smartapp_http_responses_total{status="304",view="reminders_status"}'], 1)
+        self.assertEqual(samples['smartapp_reminder_polls_total{status="200"}'], 1)
+        self.assertEqual(samples['smartapp_reminder_polls_total{status="304"}'], 1)
+        self.assertGreater(samples['smartapp_db_queries_total{alias="default"}'], 0)
+        self.assertGreater(samples['smartapp_cache_misses_total{cache="dashboard"}'], 0)
+        self.assertIn('smartapp_cache_hit_ratio{cache="dashboard"}', samples)
+        self.assertEqual(samples['smartapp_active_users{window="5m"}'], 1)
+
+    def test_only_staff_without_token(self):
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(Client().get('/metrics').status_code, 403)
+
+    def test_token(self):
+        scraper = Client()
+        with override_settings(METRICS_TOKEN="s3cret"):
+            self.assertEqual(scraper.get('/metrics').status_code, 403)
+            self.assertEqual(scraper.get('/metrics', HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+            self.assertEqual(scraper.get('/metrics', HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200)
+
+
+class MetricsAggregationTest(MetricsTestBase):
+    def write_worker(self, pid, snapshot):
+        with open(os.path.join(self.tmp.name, f"{pid}.json"), "w") as handle:
+            json.dump(snapshot, handle)
+
+    def test_sums_worker_files(self):
+        metrics.inc("reminder_polls_total", status="200")
+        metrics.observe("http_request_duration_seconds", 0.02, view="dashboard", method="GET")
+        metrics.seen(1)
+        worker = metrics.Registry()
+        worker.inc("reminder_polls_total", 2, (("status", "200"),))
+        worker.observe("http_request_duration_seconds", 3.0, (("method", "GET"), ("view", "dashboard")))
+        worker.seen(1, time.time())
+        worker.seen(2, time.time() - 600)
+        self.write_worker(99999999, worker.snapshot())
+
+        text = metrics.render()
+        samples = parse(text)
+        self.assertEqual(samples['smartapp_reminder_polls_total{status="200"}'], 3)
+        labels = 'method="GET",view="dashboard"'
+        self.assertEqual(samples[f'smartapp_http_request_duration_seconds_count{{{labels}}}'], 2)
+        self.assertEqual(samples[f'smartapp_http_request_duration_seconds_bucket{{{labels},le="0.025"}}'], 1)
+        self.assertEqual(samples[f'smartapp_http_request_duration_seconds_bucket{{{labels},le="5.0"}}'], 2)
+        self.assertAlmostEqual(samples[f'smartapp_http_request_duration_seconds_sum{{{labels}}}'], 3.02)
+        # User 1 was seen by both workers, user 2 only 10 minutes ago
+        self.assertEqual(samples['smartapp_active_users{window="5m"}'], 1)
+        self.assertEqual(samples['smartapp_active_users{window="1h"}'], 2)
+        self.assertEqual(len(re.findall(r"^# TYPE smartapp_reminder_polls_total counter$", text, re.M)), 1)
+
+    def test_own_file_is_not_counted_twice(self):
+        metrics.inc("reminder_polls_total", status="304")
+        metrics.flush()
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, f"{os.getpid()}.json")))
+        self.assertEqual(parse(metrics.render())['smartapp_reminder_polls_total{status="304"}'], 1)
+
+        metrics.clear()
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_flusher_only_in_server_workers(self):
+        metrics.inc("reminder_polls_total", status="200")
+        self.assertIsNone(metrics._registry.flusher)
+        with mock.patch.object(metrics, "_worker", True), mock.patch("threading.Thread.start"):
+            metrics.inc("reminder_polls_total", status="200")
+            self.assertIsNotNone(metrics._registry.flusher)
+
+    def test_flush_loop_survives_errors(self):
+        registry = metrics.Registry()
+        with mock.patch.object(registry, "flush", side_effect=[FileNotFoundError("gone"), SystemExit]) as flush, \
+                mock.patch.object(metrics.time, "sleep"), self.assertLogs("core.metrics", "ERROR"):
+            with self.assertRaises(SystemExit):
+                registry._flush_loop()
+        self.assertEqual(flush.call_count, 2)
+
+    def test_flush_leaves_no_temporary_file(self):
+        metrics.flush()
+        metrics.flush()
+        self.assertEqual(os.listdir(self.tmp.name), [f"{os.getpid()}.json"])
+
+    def test_unreadable_file_is_skipped(self):
+        with open(os.path.join(self.tmp.name, "123.json"), "w") as handle:
+            handle.write("{")
+        metrics.inc("reminder_polls_total", status="200")
+        self.assertEqual(parse(metrics.render())['smartapp_reminder_polls_total{status="200"}'], 1)
+
+    def test_label_values_are_escaped(self):
+        metrics.inc("http_responses_total", view='a"b\\c', status="200")
+        self.assertIn('view="a\\"b\\\\c"', metrics.render())
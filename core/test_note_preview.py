@@ -0,0 +1,33 @@
+from django.test import TestCase
+from django.contrib.auth.models import User
+from .services import NoteService
+from .models import Note
+
+
+class NotePreviewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='previewer', password='password123')
+
+    def test_preview_and_word_count_computed_on_save(self):
+        note = Note.objects.create(user=self.user, title="T", content="<p>Hello <strong>big</strong></p><p>world</p>")
+        self.assertEqual(note.preview, "Hello big world")
+        self.assertEqual(note.word_count, 3)
+
+        note.content = "<p>" + "word " * 100 + "</p>"
+        note.save()
+        self.assertEqual(note.word_count, 100)
+        self.assertLessEqual(len(note.preview), Note.PREVIEW_LENGTH)
+
+    def test_list_page_defers_content(self):
+        Note.objects.create(user=self.user, title="T", content="<p>body</p>")
+        notes, _ = NoteService(self.user).list_page()
+        self.assertIn("content", notes[0].get_deferred_fields())
+        self.assertEqual(notes[0].preview, "body")
+
+    def test_saving_deferred_note_keeps_preview(self):
+        Note.objects.create(user=self.user, title="T", content="<p>body</p>")
+        note = NoteService(self.user).list_all()[0]
+        note.title = "Renamed"
+        note.save()
+        note.refresh_from_db()
+        self.assertEqual((note.title, note.preview, note.word_count), ("Renamed", "body", 1))
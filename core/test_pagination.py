@@ -0,0 +1,73 @@
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from .services import NoteService, TodoService
+from .models import Note, Todo
+from .pagination import InvalidCursor
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager', password='password123')
+
+    def collect(self, fetch):
+        pages, cursor = [], None
+        while True:
+            items, cursor = fetch(cursor)
+            pages.append([item.id for item in items])
+            if cursor is None:
+                return pages
+
+    def test_notes_pages_cover_every_note_once(self):
+        notes = [Note.objects.create(user=self.user, title=f"N{i}", content="") for i in range(7)]
+        # Identical timestamps must still page deterministically (id tiebreak)
+        Note.objects.filter(id__in=[n.id for n in notes[2:5]]).update(created_at=notes[2].created_at)
+        service = NoteService(self.user)
+        pages = self.collect(lambda cursor: service.list_page(cursor, page_size=3))
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+        flat = [i for page in pages for i in page]
+        expected = list(Note.objects.filter(user=self.user).order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(flat, expected)
+
+    def test_kanban_column_order_and_pages(self):
+        for i in range(5):
+            Todo.objects.create(user=self.user, task=f"T{i}", is_important=(i == 3))
+        service = TodoService(self.user)
+        pages = self.collect(lambda cursor: service.get_kanban_column(Todo.STATUS_PENDING, cursor, page_size=2))
+        flat = [Todo.objects.get(id=i).task for page in pages for i in page]
+        self.assertEqual(flat, ["T3", "T0", "T1", "T2", "T4"])
+
+    def test_board_counts_and_cursors(self):
+        for i in range(25):
+            Todo.objects.create(user=self.user, task=f"T{i}")
+        Todo.objects.create(user=self.user, task="Done", done=True)
+        with self.assertNumQueries(4):
+            board = TodoService(self.user).get_kanban_board()
+        self.assertEqual(board["counts"], {"pending": 25, "in_progress": 0, "completed": 1})
+        self.assertEqual(len(board["pending"]), 20)
+        self.assertIsNotNone(board["next_cursors"]["pending"])
+        self.assertIsNone(board["next_cursors"]["completed"])
+
+    def test_bad_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            NoteService(self.user).list_page("not-a-cursor!!")
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_load_more_endpoints(self):
+        for i in range(30):
+            Note.objects.create(user=self.user, title=f"Note {i}", content="")
+            Todo.objects.create(user=self.user, task=f"Task {i}")
+        client = Client()
+        client.login(username='pager', password='password123')
+
+        page = client.get('/notes/')
+        cursor = page.context["next_cursor"]
+        more = client.get('/notes/more/', {"cursor": cursor}).json()
+        self.assertEqual(more["count"], 6)
+        self.assertIsNone(more["next_cursor"])
+        self.assertIn("Note 0", more["html"])
+
+        board = client.get('/todos/').context["board"]
+        more = client.get('/todos/column/pending/', {"cursor": board["next_cursors"]["pending"]}).json()
+        self.assertEqual(more["count"], 10)
+        self.assertEqual(client.get('/todos/column/bogus/').status_code, 404)
+        self.assertEqual(client.get('/notes/more/', {"cursor": "%%%"}).status_code, 400)
@@ -0,0 +1,181 @@
+"""
+Query budgets for every URL in smartapp/urls.py.
+
+Each view is requested for two users, one with a small dataset and one with
+a large one. A view must stay within its query and model-row budget, and
+issue the same number of queries for both users. A template that starts
+touching a relation inside a loop (N+1) therefore fails here and prints the
+SQL it ran.
+"""
+import json
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models.signals import post_init
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from . import bench
+from .models import Note, Todo
+
+SMALL = {"todos": 6, "notes": 4}
+LARGE = {"todos": 90, "notes": 60}
+
+
+def budget(method, path, queries, rows, data=None, status=None, **extra):
+    """
+    A request spec. `path` and `data` may be callables taking the user, for
+    ids and dates that depend on the seeded data. Any response below 500 is
+    accepted unless `status` is given.
+    """
+    return {
+        "method": method, "path": path, "queries": queries, "rows": rows,
+        "data": data, "status": status, "extra": extra,
+    }
+
+
+def first_note(user):
+    return Note.objects.filter(user=user).order_by("pk").values_list("pk", flat=True).first()
+
+
+def first_todo(user):
+    return Todo.objects.filter(user=user).order_by("pk").values_list("pk", flat=True).first()
+
+
+def today(user):
+    return timezone.localdate().isoformat()
+
+
+# Every named URL, with its query budget and the number of model instances
+# it may build. Logged-in requests include the session and user lookups
+# (django_session is read on every request without SHARED_CACHE);
+# mutations include the savepoint pair of their transaction.atomic block
+# and the UserStats / UserMonthStats counter updates.
+# Row budgets are bounded by the page sizes, not by the seeded data.
+BUDGETS = {
+    "landing": budget("get", "/", queries=2, rows=2),
+    "dashboard": budget("get", "/dashboard/", queries=7, rows=45),
+    "register": budget("get", "/register/", queries=0, rows=1),
+    "login": budget("get", "/login/", queries=0, rows=0),
+    "logout": budget("get", "/logout/", queries=4, rows=3),
+    "notes_list": budget("get", "/notes/", queries=3, rows=27),
+    "notes_add": budget("get", "/notes/add/", queries=2, rows=3),
+    "notes_more": budget("get", "/notes/more/", queries=3, rows=27),
+    "notes_detail": budget("get", lambda u: f"/notes/{first_note(u)}/", queries=3, rows=3),
+    "notes_edit": budget("get", lambda u: f"/notes/edit/{first_note(u)}/", queries=3, rows=3),
+    "notes_delete": budget("get", lambda u: f"/notes/delete/{first_note(u)}/", queries=8, rows=4),
+    "todos_list": budget("get", "/todos/", queries=6, rows=61),
+    "todos_add": budget("get", "/todos/add/", queries=2, rows=3),
+    "todos_detail": budget("get", lambda u: f"/todos/{first_todo(u)}/", queries=3, rows=3),
+    "todos_edit": budget("get", lambda u: f"/todos/edit/{first_todo(u)}/", queries=3, rows=3),
+    "todos_delete": budget("get", lambda u: f"/todos/delete/{first_todo(u)}/", queries=9, rows=4),
+    "todos_check_done": budget("post", lambda u: f"/todos/check-done/{first_todo(u)}/", queries=11, rows=5),
+    "todos_calendar": budget("get", "/todos/calendar/", queries=4, rows=2),
+    "todos_calendar_data": budget("get", "/todos/calendar/data/?month=2030-01", queries=4, rows=2),
+    "todos_calendar_day": budget("get", lambda u: f"/todos/calendar/day/{today(u)}/", queries=3, rows=54),
+    "todos_column": budget("get", "/todos/column/completed/", queries=3, rows=23),
+    "update_todo_status": budget(
+        "post", lambda u: f"/todos/update-status/{first_todo(u)}/", queries=11, rows=5,
+        data=json.dumps({"status": "IN_PROGRESS"}), content_type="application/json",
+    ),
+    "update_todo_status_batch": budget(
+        # rows: plus one UserMonthStats per due month touched by the moves
+        "post", "/todos/update-status/batch/", queries=12, rows=11,
+        data=lambda u: json.dumps({"moves": [
+            {"id": pk, "status": "COMPLETED"} for pk in Todo.objects.filter(user=u).values_list("pk", flat=True)[:5]
+        ]}),
+        content_type="application/json",
+    ),
+    "api_list": budget("get", "/api/todos/?fields=id,task,activity", queries=3, rows=2),
+    "sync_changes": budget("get", "/sync/changes/?since=0", queries=5, rows=2),
+    "search": budget("get", "/search/?q=quarterly", queries=4, rows=4),
+    "export_data": budget("get", "/export/todos/?format=ndjson", queries=3, rows=2),
+    "import_data": budget(
+        "post", "/import/todos/", queries=10, rows=6,
+        data=lambda u: {"file": SimpleUploadedFile("todos.csv", b"task\nOne\nTwo\n")},
+    ),
+    "reminders_status": budget("get", "/reminders/status/", queries=7, rows=13),
+    # The test client is WSGI, where the stream answers 501 after the auth check
+    "reminders_stream": budget("get", "/reminders/stream/", queries=2, rows=2, status=501),
+    # Not staff and no METRICS_TOKEN: refused once the user is loaded
+    "metrics": budget("get", "/metrics", queries=2, rows=2, status=403),
+}
+
+
+def named_urls(patterns, namespace=None):
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace == "admin":
+                continue
+            names |= named_urls(pattern.url_patterns, pattern.namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SERVER_TIMING_SAMPLE_RATE=0)
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.small = bench.seed(users=1, random_seed=1, prefix="small", now=now, **SMALL)[0]
+        cls.large = bench.seed(users=1, random_seed=2, prefix="large", now=now, **LARGE)[0]
+        # Something due today and a search hit of each kind for both users,
+        # so neither takes a shortcut for empty results
+        for user in (cls.small, cls.large):
+            Todo.objects.create(user=user, task="Quarterly review", due_date=timezone.localdate())
+            Note.objects.create(user=user, title="Quarterly", content="Quarterly numbers")
+
+    def measure(self, user, spec):
+        cache.clear()
+        self.client.force_login(user)
+        path = spec["path"](user) if callable(spec["path"]) else spec["path"]
+        data = spec["data"](user) if callable(spec["data"]) else spec["data"]
+        kwargs = dict(spec["extra"])
+        if data is not None:
+            kwargs["data"] = data
+
+        rows = []
+        def count_row(sender, instance, **signal_kwargs):
+            rows.append(sender)
+
+        post_init.connect(count_row)
+        try:
+            with CaptureQueriesContext(connection) as ctx:
+                response = getattr(self.client, spec["method"])(path, **kwargs)
+                if getattr(response, "streaming", False):
+                    b"".join(response.streaming_content)
+        finally:
+            post_init.disconnect(count_row)
+        if spec["status"]:
+            self.assertEqual(response.status_code, spec["status"], path)
+        else:
+            self.assertLess(response.status_code, 500, path)
+        return ctx.captured_queries, len(rows)
+
+    def sql(self, queries):
+        return "\n".join(f"  {i}. {query['sql']}" for i, query in enumerate(queries, 1))
+
+    def test_every_url_has_a_budget(self):
+        self.assertEqual(named_urls(get_resolver().url_patterns) - set(BUDGETS), set())
+
+    def test_views_within_budget(self):
+        for name, spec in BUDGETS.items():
+            with self.subTest(view=name):
+                small_queries, small_rows = self.measure(self.small, spec)
+                large_queries, large_rows = self.measure(self.large, spec)
+                self.assertLessEqual(
+                    len(large_queries), spec["queries"],
+                    f"{name} ran {len(large_queries)} queries (budget {spec['queries']}):\n{self.sql(large_queries)}",
+                )
+                self.assertEqual(
+                    len(small_queries), len(large_queries),
+                    f"{name} query count grows with data ({len(small_queries)} -> {len(large_queries)}):\n"
+                    f"{self.sql(large_queries)}",
+                )
+                self.assertLessEqual(
+                    large_rows, spec["rows"],
+                    f"{name} materialized {large_rows} model rows (budget {spec['rows']})",
+                )
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .models import Todo
+from .reminder_events import reminder_stream
+from .services import TodoService
+import datetime
+
+
+def parse_event(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines() if not line.startswith(":"))
+    return fields["event"], json.loads(fields["data"])
+
+
+class ReminderStreamTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='streamer', password='password123')
+        self.now = timezone.now()
+        Todo.objects.create(user=self.user, task="Past", reminder=self.now - datetime.timedelta(minutes=10))
+
+    async def next_chunk(self, stream, timeout=2):
+        return await asyncio.wait_for(stream.__anext__(), timeout)
+
+    async def test_first_event_matches_status_payload(self):
+        service = TodoService(self.user)
+        stream = reminder_stream(service)
+        self.assertTrue((await self.next_chunk(stream)).startswith("retry:"))
+        event, data = parse_event(await self.next_chunk(stream))
+        expected = await sync_to_async(service.get_reminders_status_data)(timezone.now())
+        self.assertEqual(event, "reminders")
+        self.assertEqual(set(data), set(expected))
+        self.assertEqual(data["overdue_count"], 1)
+        await stream.aclose()
+
+    async def test_todo_change_pushes_new_event(self):
+        stream = reminder_stream(TodoService(self.user))
+        await self.next_chunk(stream)
+        await self.next_chunk(stream)
+        pending = asyncio.ensure_future(self.next_chunk(stream))
+        await asyncio.sleep(0.05)
+
+        def add_todo():
+            with self.captureOnCommitCallbacks(execute=True):
+                Todo.objects.create(user=self.user, task="Also past", reminder=self.now - datetime.timedelta(minutes=5))
+
+        await sync_to_async(add_todo)()
+        event, data = parse_event(await pending)
+        self.assertEqual(data["overdue_count"], 2)
+        await stream.aclose()
+
+    @override_settings(REMINDER_STREAM_HEARTBEAT=0.1)
+    async def test_heartbeat_picks_up_change_from_another_process(self):
+        stream = reminder_stream(TodoService(self.user))
+        await self.next_chunk(stream)
+        await self.next_chunk(stream)
+        # No on_commit callbacks run, so this stream isn't notified
+        await Todo.objects.acreate(user=self.user, task="Elsewhere", reminder=self.now - datetime.timedelta(minutes=5))
+        self.assertEqual(await self.next_chunk(stream), ": keepalive\n\n")
+        event, data = parse_event(await self.next_chunk(stream))
+        self.assertEqual(data["overdue_count"], 2)
+        await stream.aclose()
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_wsgi_request_is_refused(self):
+        client = Client()
+        client.login(username='streamer', password='password123')
+        self.assertEqual(client.get('/reminders/stream/').status_code, 501)
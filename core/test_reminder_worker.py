@@ -0,0 +1,146 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .models import ReminderChange, Todo
+from .reminder_worker import ReminderScheduler, ReminderWorker
+import datetime
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, todo):
+        self.sent.append(todo.task)
+
+
+class FlakyBackend(RecordingBackend):
+    """Fails for the tasks in `failing`."""
+
+    def __init__(self, failing):
+        super().__init__()
+        self.failing = set(failing)
+
+    def send(self, todo):
+        if todo.task in self.failing:
+            raise OSError("SMTP server unavailable")
+        super().send(todo)
+
+
+class ReminderSchedulerTest(TestCase):
+    def test_pop_due_in_order_and_skip_cancelled(self):
+        now = timezone.now()
+        scheduler = ReminderScheduler()
+        scheduler.load([(1, now + datetime.timedelta(minutes=2)), (2, now - datetime.timedelta(minutes=1))])
+        scheduler.schedule(3, now)
+        scheduler.schedule(1, now - datetime.timedelta(minutes=5))  # rescheduled earlier
+        scheduler.cancel(2)
+        self.assertEqual([todo_id for todo_id, _ in scheduler.pop_due(now.timestamp())], [1, 3])
+        self.assertIsNone(scheduler.next_due())
+
+
+class ReminderWorkerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='remind', password='password123', email='r@example.com')
+        self.now = timezone.now()
+        self.backend = RecordingBackend()
+
+    def make_worker(self):
+        worker = ReminderWorker(self.backend)
+        worker.load()
+        return worker
+
+    def test_dispatches_due_reminders_once(self):
+        Todo.objects.create(user=self.user, task="Due", reminder=self.now - datetime.timedelta(minutes=1))
+        Todo.objects.create(user=self.user, task="Later", reminder=self.now + datetime.timedelta(hours=1))
+        worker = self.make_worker()
+        self.assertEqual(worker.run_once(self.now), 1)
+        self.assertEqual(self.backend.sent, ["Due"])
+        self.assertIsNotNone(Todo.objects.get(task="Due").reminder_sent_at)
+
+        # A second worker starting later doesn't send it again
+        second = ReminderWorker(RecordingBackend())
+        second.load()
+        self.assertEqual(second.run_once(self.now), 0)
+
+    def test_applies_changes_without_reloading(self):
+        worker = self.make_worker()
+        todo = Todo.objects.create(user=self.user, task="New", reminder=self.now + datetime.timedelta(hours=1))
+        Todo.objects.create(user=self.user, task="Done", reminder=self.now - datetime.timedelta(hours=1), done=True)
+        self.assertEqual(worker.run_once(self.now), 0)
+
+        todo.reminder = self.now - datetime.timedelta(seconds=1)
+        todo.save()
+        with self.assertNumQueries(5):  # outbox read, claim, fetch, sync log delete/insert
+            self.assertEqual(worker.run_once(self.now), 1)
+        self.assertEqual(self.backend.sent, ["New"])
+
+    def test_rescheduling_clears_sent_marker(self):
+        todo = Todo.objects.create(user=self.user, task="Again", reminder=self.now - datetime.timedelta(minutes=1))
+        worker = self.make_worker()
+        worker.run_once(self.now)
+        todo.refresh_from_db()
+        todo.reminder = self.now + datetime.timedelta(minutes=1)
+        todo.save()
+        self.assertIsNone(todo.reminder_sent_at)
+        self.assertEqual(worker.run_once(self.now + datetime.timedelta(minutes=2)), 1)
+        self.assertEqual(self.backend.sent, ["Again", "Again"])
+
+    def test_deleted_todo_is_cancelled(self):
+        todo = Todo.objects.create(user=self.user, task="Gone", reminder=self.now + datetime.timedelta(minutes=1))
+        worker = self.make_worker()
+        todo.delete()
+        worker.apply_changes()
+        self.assertEqual(len(worker.scheduler), 0)
+
+    def test_late_commit_of_lower_outbox_id_is_applied(self):
+        first = Todo.objects.create(user=self.user, task="First", reminder=self.now + datetime.timedelta(hours=1))
+        second = Todo.objects.create(user=self.user, task="Second", reminder=self.now + datetime.timedelta(hours=1))
+        worker = self.make_worker()
+        last = worker.last_change_id
+        # Id last + 1 belongs to a transaction that commits after last + 2
+        ReminderChange.objects.create(id=last + 2, todo_id=second.pk, reminder=None)
+        worker.apply_changes(now=0)
+        self.assertEqual((worker.last_change_id, len(worker.scheduler)), (last, 1))
+
+        ReminderChange.objects.create(id=last + 1, todo_id=first.pk, reminder=None)
+        worker.apply_changes(now=1)
+        self.assertEqual((worker.last_change_id, len(worker.scheduler)), (last + 2, 0))
+
+    def test_gap_is_skipped_after_the_grace_period(self):
+        worker = self.make_worker()
+        last = worker.last_change_id
+        ReminderChange.objects.create(id=last + 3, todo_id=1, reminder=None)
+        worker.apply_changes(now=0)
+        self.assertEqual(worker.last_change_id, last)
+        with self.settings(REMINDER_OUTBOX_GAP_SECONDS=60):
+            worker.apply_changes(now=59)
+            self.assertEqual(worker.last_change_id, last)
+            # Ids last + 1 and last + 2 never committed
+            worker.apply_changes(now=60)
+        self.assertEqual((worker.last_change_id, worker.gaps), (last + 3, {}))
+
+    def test_failed_send_is_released_and_retried(self):
+        Todo.objects.create(user=self.user, task="Fails", reminder=self.now - datetime.timedelta(minutes=1))
+        Todo.objects.create(user=self.user, task="Works", reminder=self.now - datetime.timedelta(minutes=1))
+        self.backend = FlakyBackend(["Fails"])
+        worker = self.make_worker()
+        with self.assertLogs("core.reminder_worker", "ERROR"):
+            self.assertEqual(worker.run_once(self.now), 1)
+        self.assertEqual(self.backend.sent, ["Works"])
+        self.assertIsNone(Todo.objects.get(task="Fails").reminder_sent_at)
+
+        # Not before the retry delay
+        self.backend.failing.clear()
+        self.assertEqual(worker.run_once(self.now + datetime.timedelta(seconds=30)), 0)
+        self.assertEqual(worker.run_once(self.now + datetime.timedelta(seconds=60)), 1)
+        self.assertEqual(self.backend.sent, ["Works", "Fails"])
+
+    def test_command_once(self):
+        Todo.objects.create(user=self.user, task="Console", reminder=self.now - datetime.timedelta(minutes=1))
+        out = StringIO()
+        call_command("run_reminder_worker", "--once", "--backend", "console", stdout=out)
+        self.assertIn("Reminder: Console", out.getvalue())
+        self.assertIn("Dispatched 1 reminders", out.getvalue())
@@ -0,0 +1,87 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .models import Note, Todo
+from .services import TodoService
+import datetime
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RemindersStatusETagTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='poller', password='password123')
+        self.client = Client()
+        self.client.login(username='poller', password='password123')
+        self.now = timezone.now()
+        Todo.objects.create(user=self.user, task="Later", reminder=self.now + datetime.timedelta(hours=3))
+
+    def poll(self, etag=None, now=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        with mock.patch("core.views.timezone.now", return_value=now or self.now):
+            return self.client.get('/reminders/status/', **headers)
+
+    def test_unchanged_poll_returns_304_without_status_queries(self):
+        first = self.poll()
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("overdue", first.json())
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.poll(first["ETag"])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], first["ETag"])
+        # One primary-key read of the user's reminders version
+        queries = [q["sql"] for q in ctx.captured_queries if "django_session" not in q["sql"]
+                   and "auth_user" not in q["sql"]]
+        self.assertEqual(len(queries), 1)
+        self.assertIn("core_userstats", queries[0])
+        self.assertNotIn("core_todo", queries[0])
+
+    def test_etag_does_not_depend_on_the_cache(self):
+        # As seen by another worker process with its own cache
+        first = self.poll()
+        cache.clear()
+        self.assertEqual(self.poll(first["ETag"]).status_code, 304)
+        todo = Todo.objects.get(user=self.user)
+        todo.task = "Renamed"
+        todo.save()
+        cache.clear()
+        self.assertEqual(self.poll(first["ETag"]).status_code, 200)
+
+    def test_note_change_keeps_token(self):
+        first = self.poll()
+        Note.objects.create(user=self.user, title="N", content="C")
+        self.assertEqual(self.poll(first["ETag"]).status_code, 304)
+
+    def test_batch_move_advances_token(self):
+        first = self.poll()
+        todo = Todo.objects.get(user=self.user)
+        TodoService(self.user).update_statuses([{"id": todo.pk, "status": Todo.STATUS_COMPLETED}])
+        self.assertEqual(self.poll(first["ETag"]).status_code, 200)
+
+    def test_foreign_or_malformed_etag_is_ignored(self):
+        first = self.poll()
+        forged = first["ETag"].replace(f"reminders-{self.user.pk}-", "reminders-999999-")
+        self.assertEqual(self.poll(forged).status_code, 200)
+        self.assertEqual(self.poll('"reminders-x"').status_code, 200)
+
+    def test_todo_change_advances_token(self):
+        first = self.poll()
+        Todo.objects.create(user=self.user, task="New", reminder=self.now - datetime.timedelta(minutes=5))
+        second = self.poll(first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.json()["overdue_count"], 1)
+
+    def test_soon_boundary_advances_token(self):
+        first = self.poll()
+        # Still outside the one-hour window
+        self.assertEqual(self.poll(first["ETag"], self.now + datetime.timedelta(minutes=90)).status_code, 304)
+        # The reminder has entered the "soon" window
+        crossed = self.poll(first["ETag"], self.now + datetime.timedelta(hours=2, minutes=1))
+        self.assertEqual(crossed.status_code, 200)
+        self.assertEqual(crossed.json()["soon_count"], 1)
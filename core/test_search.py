@@ -0,0 +1,91 @@
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from .services import SearchService, TodoService
+from .models import Note, Todo
+from .search import LikeSearchBackend, html_to_text
+from django.utils import timezone
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='searcher', password='password123')
+        self.other = User.objects.create_user(username='other', password='password123')
+        self.search = SearchService(self.user)
+
+    def test_indexes_note_content_without_html(self):
+        Note.objects.create(user=self.user, title="Groceries", content="<p>Buy <strong>avocados</strong> &amp; bread</p>")
+        result = self.search.search("avocado")
+        self.assertEqual(result["total"], 1)
+        hit = result["results"][0]
+        self.assertEqual(hit["kind"], "note")
+        self.assertIn("<mark>avocados</mark>", hit["snippet"])
+        self.assertNotIn("<strong>", hit["snippet"])
+
+    def test_title_ranks_above_body(self):
+        Note.objects.create(user=self.user, title="Misc", content="something about the garden")
+        Note.objects.create(user=self.user, title="Garden plan", content="tomatoes")
+        results = self.search.search("garden")["results"]
+        self.assertEqual([r["title"] for r in results], ["Garden plan", "Misc"])
+
+    def test_user_isolation_and_sync(self):
+        Note.objects.create(user=self.other, title="Secret plan", content="x")
+        todo = Todo.objects.create(user=self.user, task="Plan trip")
+        self.assertEqual(self.search.search("plan")["total"], 1)
+
+        todo.task = "Book flights"
+        todo.save()
+        self.assertEqual(self.search.search("plan")["total"], 0)
+        self.assertEqual(self.search.search("flights")["total"], 1)
+
+        todo.delete()
+        self.assertEqual(self.search.search("flights")["total"], 0)
+
+    def test_paging_and_kind_filter(self):
+        for i in range(5):
+            Todo.objects.create(user=self.user, task=f"Report {i}")
+        Note.objects.create(user=self.user, title="Report notes", content="")
+        page = self.search.search("report", kind="todo", page=2, per_page=2)
+        self.assertEqual(page["total"], 5)
+        self.assertEqual(len(page["results"]), 2)
+        self.assertTrue(page["has_next"])
+        self.assertTrue(all(r["kind"] == "todo" for r in page["results"]))
+
+    def test_query_syntax_is_escaped(self):
+        Note.objects.create(user=self.user, title="Quotes", content="hello")
+        self.assertEqual(self.search.search('"hello" * ( -')["total"], 1)
+        self.assertEqual(self.search.search('*** ""')["total"], 0)
+
+    def test_dashboard_uses_search(self):
+        Note.objects.create(user=self.user, title="Alpha", content="<p>beta gamma</p>")
+        context = TodoService(self.user).get_dashboard_data(timezone.now(), "gamma")
+        self.assertEqual(context["notes_total"], 1)
+        self.assertIn("<mark>gamma</mark>", context["notes_results"][0].search_snippet)
+
+    @override_settings(SECURE_SSL_REDIRECT=False)
+    def test_json_endpoint(self):
+        Todo.objects.create(user=self.user, task="Water plants")
+        client = Client()
+        client.login(username='searcher', password='password123')
+        data = client.get('/search/', {"q": "water"}).json()
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["results"][0]["url"], f"/todos/{Todo.objects.get().id}/")
+        self.assertEqual(client.get('/search/', {"q": "water", "kind": "bogus"}).status_code, 400)
+
+    def test_like_backend_pages_across_kinds(self):
+        for i in range(3):
+            Note.objects.create(user=self.user, title=f"Report note {i}", content="")
+            Todo.objects.create(user=self.user, task=f"Report todo {i}")
+        backend = LikeSearchBackend()
+        pages = [backend.search(self.user, "report", offset=offset, limit=2) for offset in (0, 2, 4)]
+        self.assertTrue(all(total == 6 for _, total in pages))
+        ids = [(hit["kind"], hit["id"]) for hits, _ in pages for hit in hits]
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(len(set(ids)), 6)
+
+    def test_dashboard_stats_search(self):
+        Note.objects.create(user=self.user, title="Misc", content="<p>turnips</p>")
+        stats = TodoService(self.user).get_dashboard_stats("turnips")
+        self.assertEqual([note.title for note in stats["notes_results"]], ["Misc"])
+
+    def test_html_to_text(self):
+        self.assertEqual(html_to_text("<h1>Title</h1><p>fish &amp; <em>chips</em></p><p>peas</p>"), "Title fish & chips peas")
@@ -0,0 +1,74 @@
+import json
+from django.core.cache import cache
+from django.test import TestCase, Client, AsyncClient, override_settings
+from django.contrib.auth.models import User
+from . import instrumentation
+from .models import Todo
+from .services import TodoService
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for part in header.split(","):
+        name, *params = [piece.strip() for piece in part.split(";")]
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SERVER_TIMING_SAMPLE_RATE=1.0)
+class ServerTimingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='timed', password='password123')
+        Todo.objects.create(user=self.user, task="T1")
+
+    def test_header_and_log(self):
+        client = Client()
+        client.login(username='timed', password='password123')
+        with self.assertLogs("core.timing", "INFO") as logs:
+            response = client.get('/dashboard/')
+        metrics = parse_server_timing(response["Server-Timing"])
+        self.assertEqual(set(metrics), {"db", "render", "app", "total"})
+        self.assertGreater(float(metrics["render"]["dur"]), 0)
+
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((line["path"], line["status"]), ("/dashboard/", 200))
+        self.assertIn(f'"{line["queries"]} queries"', response["Server-Timing"])
+        self.assertEqual(line["services"]["TodoService.get_dashboard_counters"]["queries"], 1)
+        self.assertEqual(line["services"]["TodoService.get_dashboard_reminders"]["queries"], 1)
+
+    async def test_async_view(self):
+        client = AsyncClient()
+        await client.alogin(username='timed', password='password123')
+        with self.assertLogs("core.timing", "INFO"):
+            response = await client.get('/dashboard/')
+        self.assertIn("db;", response["Server-Timing"])
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_requests_only_get_total(self):
+        client = Client()
+        client.login(username='timed', password='password123')
+        with self.assertNoLogs("core.timing", "INFO"):
+            response = client.get('/todos/')
+        self.assertEqual(set(parse_server_timing(response["Server-Timing"])), {"total"})
+
+    def test_queries_outside_requests_are_not_recorded(self):
+        self.assertIsNone(instrumentation.current())
+        TodoService(self.user, use_cache=False).get_dashboard_data(self.user.date_joined)
+
+    def test_attribution_skips_private_helpers(self):
+        timing, token = instrumentation.start()
+        try:
+            TodoService(self.user, use_cache=False).get_dashboard_data(self.user.date_joined)
+        finally:
+            instrumentation.stop(token)
+        self.assertEqual(
+            {method: count for method, (count, _) in timing.by_method.items()},
+            {
+                "TodoService.get_dashboard_counters": 1,
+                "TodoService.get_dashboard_reminders": 1,
+                "TodoService.get_dashboard_matrix": 1,
+                # get_daily_focus returns a lazy queryset; it runs where it is evaluated
+                "TodoService.get_dashboard_data": 1,
+            },
+        )
@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from contextlib import contextmanager
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from . import slow_queries
+from .models import Todo
+from .services import TodoService
+
+
+def logged(cm):
+    return [json.loads(record.getMessage()) for record in cm.records]
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SERVER_TIMING_SAMPLE_RATE=0, SLOW_QUERY_RATE_LIMIT=60)
+class SlowQueryLogTest(TestCase):
+    @contextmanager
+    def every_query_logged(self):
+        """Log every query, captured (not written to SLOW_QUERY_LOG)."""
+        with override_settings(SLOW_QUERY_MS=0), self.assertLogs("core.slow_queries", "WARNING") as cm:
+            yield cm
+
+    def setUp(self):
+        slow_queries.limiter.clear()
+        self.addCleanup(slow_queries.limiter.clear)
+        self.user = User.objects.create_user(username='slow', password='password123')
+        Todo.objects.create(user=self.user, task="T")
+
+    def test_entry_has_service_view_and_plan(self):
+        client = Client()
+        client.login(username='slow', password='password123')
+        with self.every_query_logged() as cm:
+            client.get('/todos/')
+        entries = [entry for entry in logged(cm) if entry["service"] == "TodoService.get_kanban_board"]
+        self.assertTrue(entries)
+        entry = entries[0]
+        self.assertEqual(entry["view"], "todos_list")
+        self.assertEqual(entry["path"], "/todos/")
+        self.assertIn("core_todo", entry["sql"])
+        self.assertIn("int", entry["params"])
+        self.assertTrue(entry["plan"])
+        self.assertFalse(any(line.startswith("EXPLAIN failed") for line in entry["plan"]))
+
+    def test_param_values_only_when_enabled(self):
+        Todo.objects.create(user=self.user, task="Call the bank about 4929 1234")
+
+        def query():
+            return Todo.objects.filter(user=self.user, task="Call the bank about 4929 1234").count()
+
+        with self.every_query_logged() as cm:
+            query()
+        self.assertEqual(sorted(logged(cm)[0]["params"]), ["int", "str"])
+
+        slow_queries.limiter.clear()
+        with override_settings(SLOW_QUERY_LOG_PARAMS=True), self.every_query_logged() as cm:
+            query()
+        self.assertCountEqual(logged(cm)[0]["params"], [self.user.pk, "Call the bank about 4929 1234"])
+
+    def test_plan_literals_masked(self):
+        self.assertEqual(
+            slow_queries._mask_plan(["Filter: ((task)::text = 'secret'::text)"]),
+            ["Filter: ((task)::text = '?'::text)"],
+        )
+
+    def test_outside_a_request(self):
+        with self.every_query_logged() as cm:
+            TodoService(self.user).get_calendar_data()
+        entry = logged(cm)[0]
+        self.assertEqual((entry["service"], entry["view"]), ("TodoService.get_calendar_data", ""))
+
+    def test_failed_explain_leaves_transaction_usable(self):
+        # TestCase wraps each test in a transaction, as ATOMIC_REQUESTS would a request
+        cursor = connection.create_cursor()
+        executed = []
+
+        def execute(sql, params=None):
+            executed.append(sql)
+            return original(sql, params) if params is not None else original(sql)
+
+        original = cursor.execute
+        with mock.patch.object(cursor, "execute", side_effect=execute), \
+                mock.patch.object(connection, "create_cursor", return_value=cursor):
+            plan = slow_queries.explain(connection, "SELECT * FROM no_such_table", None, False)
+        self.assertTrue(plan[0].startswith("EXPLAIN failed"))
+        self.assertEqual(executed[0], connection.ops.savepoint_create_sql(slow_queries.EXPLAIN_SAVEPOINT))
+        self.assertEqual(executed[-1], connection.ops.savepoint_rollback_sql(slow_queries.EXPLAIN_SAVEPOINT))
+        self.assertEqual(Todo.objects.filter(user=self.user).count(), 1)
+
+    def test_off_by_default(self):
+        self.assertIsNone(slow_queries.threshold_ms())
+
+    def test_below_threshold_not_logged(self):
+        with override_settings(SLOW_QUERY_MS=60_000), self.assertNoLogs("core.slow_queries"):
+            TodoService(self.user).get_calendar_data()
+
+    def test_repeats_are_rate_limited(self):
+        def query():
+            return Todo.objects.filter(user=self.user).count()
+
+        with self.every_query_logged() as cm:
+            query()
+        self.assertEqual(len(cm.records), 1)
+        with override_settings(SLOW_QUERY_MS=0), self.assertNoLogs("core.slow_queries"):
+            query()
+            query()
+
+        with override_settings(SLOW_QUERY_RATE_LIMIT=0), self.every_query_logged() as cm:
+            query()
+        # The two suppressed runs come along with the next entry
+        self.assertEqual(len(logged(cm)[0]["repeats_ms"]), 2)
+
+    def test_fingerprint_ignores_literals_and_list_lengths(self):
+        self.assertEqual(
+            slow_queries.fingerprint('SELECT * FROM t WHERE id IN (%s, %s) AND name = \'a\' LIMIT 21'),
+            slow_queries.fingerprint('SELECT * FROM t WHERE id IN (%s)  AND name = \'b\'\nLIMIT 5'),
+        )
+        self.assertNotEqual(slow_queries.fingerprint("SELECT a FROM t"), slow_queries.fingerprint("SELECT b FROM t"))
+
+
+class SlowQueriesCommandTest(TestCase):
+    def write_log(self, entries):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".log", delete=False)
+        self.addCleanup(os.remove, handle.name)
+        with handle:
+            handle.write("not json\n")
+            for entry in entries:
+                handle.write(json.dumps(entry) + "\n")
+        return handle.name
+
+    def entry(self, fingerprint, ms, service="TodoService.get_kanban_board", repeats=()):
+        return {
+            "at": "2030-01-01T00:00:00+00:00", "fingerprint": fingerprint, "duration_ms": ms,
+            "service": service, "view": "todos_list", "sql": "SELECT 1", "plan": ["SCAN core_todo"],
+            "repeats_ms": list(repeats),
+        }
+
+    def test_summary(self):
+        path = self.write_log([
+            self.entry("aaa", 300, repeats=[250] * 18),
+            self.entry("aaa", 900),
+            self.entry("bbb", 6000, service="TodoService.get_calendar_data"),
+        ])
+        rows = slow_queries.summarize(slow_queries.read(open(path)))
+        self.assertEqual([row["fingerprint"] for row in rows], ["bbb", "aaa"])
+        self.assertEqual((rows[1]["count"], rows[1]["p95_ms"], rows[1]["total_ms"]), (20, 300, 5700))
+
+        out = StringIO()
+        call_command("slow_queries", file=path, service="TodoService.get_kanban_board", plans=True, stdout=out)
+        output = out.getvalue()
+        self.assertIn("aaa", output)
+        self.assertNotIn("bbb", output)
+        self.assertIn("SCAN core_todo", output)
+        self.assertIn("1 fingerprints, 20 slow queries.", output)
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .imports import BulkImporter
+from .models import Note, SyncChange, Todo
+from .services import SyncService, TodoService
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SERVER_TIMING_SAMPLE_RATE=0)
+class SyncChangesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='replica', password='password123')
+        self.other = User.objects.create_user(username='other', password='password123')
+        self.client = Client()
+        self.client.login(username='replica', password='password123')
+
+    def feed(self, since=0, **params):
+        return self.client.get('/sync/changes/', {"since": since, **params})
+
+    def test_initial_sync_then_incremental(self):
+        note = Note.objects.create(user=self.user, title="N", content="<p>x</p>")
+        todo = Todo.objects.create(user=self.user, task="T")
+        Todo.objects.create(user=self.other, task="Not mine")
+
+        data = self.feed().json()
+        self.assertEqual([(c["kind"], c["id"]) for c in data["changes"]], [("note", note.pk), ("todo", todo.pk)])
+        self.assertEqual(data["changes"][1]["data"]["task"], "T")
+        self.assertFalse(data["has_more"])
+
+        # Nothing new
+        self.assertEqual(self.feed(data["cursor"]).json()["changes"], [])
+
+        todo.task = "T2"
+        todo.save()
+        note_id = note.pk
+        note.delete()
+        changes = self.feed(data["cursor"]).json()["changes"]
+        self.assertEqual(
+            [(c["kind"], c["id"], c["deleted"]) for c in changes],
+            [("todo", todo.pk, False), ("note", note_id, True)],
+        )
+        self.assertEqual(changes[0]["data"]["task"], "T2")
+        self.assertIsNone(changes[1]["data"])
+
+    def test_log_keeps_one_entry_per_object(self):
+        todo = Todo.objects.create(user=self.user, task="T")
+        for i in range(5):
+            todo.task = f"T{i}"
+            todo.save()
+        self.assertEqual(SyncChange.objects.filter(kind="todo", object_id=todo.pk).count(), 1)
+
+    def test_bounded_batches(self):
+        for i in range(5):
+            Todo.objects.create(user=self.user, task=f"T{i}")
+        seen, cursor, has_more = [], 0, True
+        while has_more:
+            data = self.feed(cursor, limit=2).json()
+            self.assertLessEqual(len(data["changes"]), 2)
+            seen += [c["data"]["task"] for c in data["changes"]]
+            cursor, has_more = data["cursor"], data["has_more"]
+        self.assertEqual(seen, [f"T{i}" for i in range(5)])
+
+    def test_bulk_paths_are_logged(self):
+        todos = [Todo.objects.create(user=self.user, task=f"T{i}") for i in range(2)]
+        cursor = self.feed().json()["cursor"]
+        TodoService(self.user).update_statuses([{"id": todos[0].pk, "status": "COMPLETED"}])
+        BulkImporter(self.user, "notes").run([(2, {"title": "Imported", "content": "x"}, None)])
+
+        changes = self.feed(cursor).json()["changes"]
+        self.assertEqual([(c["kind"], c["deleted"]) for c in changes], [("todo", False), ("note", False)])
+        self.assertEqual(changes[0]["data"]["status"], "COMPLETED")
+        self.assertEqual(changes[1]["data"]["title"], "Imported")
+
+    def test_compaction_expires_old_cursors(self):
+        keep = Todo.objects.create(user=self.user, task="Keep")
+        gone = Todo.objects.create(user=self.user, task="Gone")
+        cursor = self.feed().json()["cursor"]
+        gone.delete()
+        SyncChange.objects.filter(deleted=True).update(changed_at=timezone.now() - timedelta(days=40))
+
+        out = StringIO()
+        call_command("compact_changes", "--days", "30", stdout=out)
+        self.assertIn("Removed 1 tombstones", out.getvalue())
+
+        self.assertEqual(self.feed(cursor).status_code, 410)
+        data = self.feed().json()
+        self.assertEqual([c["id"] for c in data["changes"]], [keep.pk])
+        # A cursor taken after compaction is fine again
+        self.assertEqual(self.feed(data["cursor"]).status_code, 200)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.feed("abc").status_code, 400)
+        self.assertEqual(self.feed(-1).status_code, 400)
+
+    @override_settings(SYNC_SETTLE_SECONDS=60)
+    def test_cursor_stops_before_unsettled_changes(self):
+        old = Todo.objects.create(user=self.user, task="Old")
+        SyncChange.objects.filter(object_id=old.pk).update(changed_at=timezone.now() - timedelta(minutes=5))
+        Todo.objects.create(user=self.user, task="New")
+        Todo.objects.create(user=self.user, task="Newer")
+
+        data = self.feed(limit=2).json()
+        self.assertEqual([c["data"]["task"] for c in data["changes"]], ["Old", "New"])
+        self.assertEqual(data["cursor"], SyncChange.objects.get(kind="todo", object_id=old.pk).pk)
+        self.assertFalse(data["has_more"])
+        # Sent again until they settle
+        self.assertEqual([c["data"]["task"] for c in self.feed(data["cursor"]).json()["changes"]], ["New", "Newer"])
+
+    def test_service_page_size_is_capped(self):
+        self.assertEqual(SyncService(self.user).changes(0, limit=10**6)["changes"], [])
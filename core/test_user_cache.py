@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from . import user_cache
+from .models import Todo
+
+
+# What settings installs when SHARED_CACHE is set (the LocMemCache stands in for Redis here)
+CACHED_AUTH_MIDDLEWARE = [
+    "core.middleware.CachedAuthenticationMiddleware"
+    if path == "django.contrib.auth.middleware.AuthenticationMiddleware" else path
+    for path in settings.MIDDLEWARE
+]
+
+
+def auth_table_reads(queries):
+    return [q["sql"] for q in queries if '"django_session"' in q["sql"] or '"auth_user"' in q["sql"]]
+
+
+@override_settings(
+    SECURE_SSL_REDIRECT=False, SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+    MIDDLEWARE=CACHED_AUTH_MIDDLEWARE, SHARED_CACHE=True,
+)
+class CachedUserTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cached', password='password123')
+        Todo.objects.create(user=self.user, task="T1")
+        self.client = Client()
+        self.client.login(username='cached', password='password123')
+
+    def get_status(self, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/reminders/status/', headers=headers)
+        return response, ctx.captured_queries
+
+    def test_polling_skips_session_and_user_tables(self):
+        response, queries = self.get_status()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(auth_table_reads(queries)), 1)  # first load of the user
+
+        response, queries = self.get_status()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(auth_table_reads(queries), [])
+
+        # Nothing changed: the conditional poll only reads the reminders version
+        response, queries = self.get_status(if_none_match=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(auth_table_reads(queries), [])
+        self.assertEqual(len(queries), 1)
+
+    def test_password_change_logs_out_other_sessions(self):
+        self.get_status()
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache.user_key(self.user.pk)))
+        response, _ = self.get_status()
+        self.assertEqual(response.status_code, 302)
+
+    def test_stale_cached_user_is_not_served(self):
+        self.get_status()
+        # A cached copy whose password no longer matches the session hash
+        stale = User.objects.get(pk=self.user.pk)
+        stale.password = 'changed elsewhere'
+        cache.set(user_cache.user_key(self.user.pk), stale)
+        response, _ = self.get_status()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cache.get(user_cache.user_key(self.user.pk)).password, self.user.password)
+
+    def test_logout_drops_cached_user(self):
+        self.get_status()
+        self.client.post('/logout/')
+        self.assertIsNone(cache.get(user_cache.user_key(self.user.pk)))
+        response, _ = self.get_status()
+        self.assertEqual(response.status_code, 302)
+
+    async def test_async_view_uses_cache(self):
+        client = AsyncClient()
+        await client.alogin(username='cached', password='password123')
+        await client.get('/dashboard/')
+        self.assertIsNotNone(await cache.aget(user_cache.user_key(self.user.pk)))
+
+
+@override_settings(
+    SECURE_SSL_REDIRECT=False, SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies",
+    MIDDLEWARE=CACHED_AUTH_MIDDLEWARE, SHARED_CACHE=True,
+)
+class SignedCookieSessionTest(TestCase):
+    def test_no_session_table(self):
+        User.objects.create_user(username='cookie', password='password123')
+        client = Client()
+        client.login(username='cookie', password='password123')
+        client.get('/reminders/status/')
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/reminders/status/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(auth_table_reads(ctx.captured_queries), [])
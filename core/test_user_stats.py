@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from . import user_stats
+from .imports import BulkImporter
+from .models import Note, Todo, UserMonthStats, UserStats
+from .services import TodoService
+
+
+class UserStatsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='counted', password='password123')
+        self.other = User.objects.create_user(username='other', password='password123')
+
+    def assertInSync(self, user=None):
+        user = user or self.user
+        self.assertEqual(user_stats.current(user.pk), user_stats.count(user.pk))
+
+    def test_new_user_gets_a_row(self):
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual([getattr(stats, name) for name in user_stats.COUNTERS], [0, 0, 0, 0, 0])
+
+    def test_save_and_delete(self):
+        due = date(2030, 1, 15)
+        todo = Todo.objects.create(user=self.user, task="T", is_important=True, due_date=due)
+        Todo.objects.create(user=self.user, task="Plain")
+        note = Note.objects.create(user=self.user, title="N", content="<p>x</p>")
+        self.assertInSync()
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual((stats.pending, stats.important_pending, stats.notes_count), (2, 1, 1))
+
+        todo.done = True
+        todo.save()
+        self.assertInSync()
+        month = UserMonthStats.objects.get(user=self.user, month=date(2030, 1, 1))
+        self.assertEqual((month.pending, month.completed), (0, 1))
+
+        todo.due_date = date(2030, 2, 3)
+        todo.save()
+        self.assertInSync()
+
+        # Saving an unchanged todo (or a deferred one) leaves the counters alone
+        Todo.objects.only("task").get(pk=todo.pk).save()
+        self.assertInSync()
+
+        todo.delete()
+        note.delete()
+        self.assertInSync()
+        self.assertInSync(self.other)
+
+    def test_update_fields_still_counted(self):
+        todo = Todo.objects.create(user=self.user, task="T")
+        todo.status = Todo.STATUS_IN_PROGRESS
+        todo.save(update_fields=["status"])
+        self.assertInSync()
+
+    def test_batch_moves(self):
+        todos = [Todo.objects.create(user=self.user, task=f"T{i}", due_date=date(2030, 1, i + 1)) for i in range(4)]
+        TodoService(self.user).update_statuses([
+            {"id": todos[0].pk, "status": "COMPLETED"},
+            {"id": todos[1].pk, "status": "IN_PROGRESS"},
+            {"id": todos[2].pk, "status": "PENDING"},
+        ])
+        self.assertInSync()
+
+    def test_import(self):
+        rows = [(1, {"task": "A", "is_important": "true"}, None), (2, {"task": "B", "due_date": "2030-03-01"}, None)]
+        BulkImporter(self.user, "todos").run(rows)
+        BulkImporter(self.user, "notes").run([(1, {"title": "N", "content": "x"}, None)])
+        self.assertInSync()
+
+    def test_deltas_do_not_overwrite(self):
+        Todo.objects.create(user=self.user, task="T")
+        # Another writer's increment lands between our read and our write
+        stale = UserStats.objects.get(user=self.user)
+        UserStats.objects.filter(user=self.user).update(pending=5)
+        Todo.objects.create(user=self.user, task="U")
+        self.assertEqual(UserStats.objects.get(user=self.user).pending, 6)
+        self.assertEqual(stale.pending, 1)
+
+    def test_rebuild_fixes_drift(self):
+        Todo.objects.create(user=self.user, task="T", due_date=date(2030, 1, 1))
+        UserStats.objects.filter(user=self.user).update(pending=40)
+        UserMonthStats.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_user_stats", stdout=out)
+        self.assertIn("Checked 2 users, fixed 1", out.getvalue())
+        self.assertInSync()
+        self.assertFalse(user_stats.rebuild(self.user.pk))
+
+    def test_missing_row_is_rebuilt(self):
+        Todo.objects.create(user=self.user, task="T")
+        UserStats.objects.filter(user=self.user).delete()
+        Todo.objects.create(user=self.user, task="U")
+        self.assertEqual(UserStats.objects.get(user=self.user).pending, 2)
+
+    def test_deleting_user(self):
+        Todo.objects.create(user=self.user, task="T", due_date=date(2030, 1, 1))
+        Note.objects.create(user=self.user, title="N", content="x")
+        self.user.delete()
+        self.assertFalse(UserStats.objects.filter(user_id=self.user.pk).exists())
+
+    def test_dashboard_reads_counters(self):
+        now = timezone.now()
+        Todo.objects.create(user=self.user, task="Due", due_date=timezone.localdate(now))
+        Todo.objects.create(user=self.user, task="Late", reminder=now - timedelta(minutes=5))
+        service = TodoService(self.user)
+        with self.assertNumQueries(1):
+            counters = service.get_dashboard_counters(now)
+        self.assertEqual(counters["todos_count"], 2)
+        self.assertEqual(counters["overdue_count"], 1)
+        self.assertEqual(counters["monthly_stats"], {"total": 1, "pending": 1, "completed": 0})
+        self.assertEqual(service.get_monthly_stats(now), counters["monthly_stats"])
+
+    def test_dashboard_rebuilds_missing_row(self):
+        now = timezone.now()
+        Todo.objects.create(user=self.user, task="Late", reminder=now - timedelta(minutes=5))
+        Note.objects.create(user=self.user, title="N", content="x")
+        UserStats.objects.filter(user=self.user).delete()
+        service = TodoService(self.user)
+        counters = service.get_dashboard_counters(now)
+        self.assertEqual((counters["todos_count"], counters["notes_count"]), (1, 1))
+        self.assertEqual(counters["overdue_count"], 1)
+        self.assertInSync()
+
+        UserStats.objects.filter(user=self.user).delete()
+        self.assertEqual(service.get_dashboard_stats()["todos_count"], 1)
+        self.assertInSync()
@@ -0,0 +1,61 @@
+"""
+Cached user lookup for authenticated requests.
+
+django.contrib.auth reads auth_user on every request. Here the user is kept
+in the cache under its id and is only served if the session's auth hash
+still matches it, so a password change logs other sessions out exactly as
+before. Saving or deleting the user and logging out drop the entry (see
+core.signals).
+
+Only safe with a cache shared by all workers: settings installs
+CachedAuthenticationMiddleware only when SHARED_CACHE is set.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+from . import metrics
+
+KEY_PREFIX = "auth_user"
+
+
+def timeout():
+    return getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60 * 5)
+
+
+def user_key(user_id):
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def invalidate_user(user_id):
+    cache.delete(user_key(user_id))
+
+
+def get_user(request):
+    """
+    Same result as django.contrib.auth.get_user(request), without a database
+    read when the user is cached.
+    """
+    session = request.session
+    try:
+        user_id = session[SESSION_KEY]
+        backend_path = session[BACKEND_SESSION_KEY]
+        session_hash = session[HASH_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+
+    user = cache.get(user_key(user_id))
+    if user is not None and constant_time_compare(session_hash, user.get_session_auth_hash()):
+        metrics.record_cache("user", hits=1)
+        return user
+    metrics.record_cache("user", misses=1)
+
+    # Miss or stale hash: Django verifies the session (fallback secrets, flush)
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(user_key(user.pk), user, timeout())
+    return user
@@ -0,0 +1,166 @@
+"""
+Maintenance of the materialized counters (UserStats, UserMonthStats).
+
+Changes to todos and notes are collected as per-user deltas in a
+``Changes`` and applied with ``F()`` updates, so concurrent writers never
+overwrite each other's counts. ``save()``/``delete()`` go through the
+signal handlers in core.signals; bulk paths (queryset updates,
+``bulk_create``) build a ``Changes`` themselves. ``rebuild`` recounts a
+user from scratch (``manage.py rebuild_user_stats``).
+
+Every todo write also bumps ``UserStats.reminders_version`` in the same
+UPDATE, which the reminders status ETag is built from.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Note, Todo, UserMonthStats, UserStats
+
+STATUS_FIELDS = {
+    Todo.STATUS_PENDING: "pending",
+    Todo.STATUS_IN_PROGRESS: "in_progress",
+    Todo.STATUS_COMPLETED: "completed",
+}
+COUNTERS = ("notes_count", "pending", "in_progress", "completed", "important_pending")
+
+
+class Changes:
+    """Counter deltas for any number of users, applied in one go."""
+
+    def __init__(self):
+        self.users = {}
+        self.months = {}
+        # Users whose todos were written, counted or not
+        self.touched = set()
+
+    def todo(self, old=None, new=None):
+        """A todo went from counter state `old` to `new` (Todo.counter_state(); None = absent)."""
+        self.touched.update(state[0] for state in (old, new) if state is not None and state[0] is not None)
+        if old != new:
+            if old is not None:
+                self._add_todo(old, -1)
+            if new is not None:
+                self._add_todo(new, 1)
+        return self
+
+    def notes(self, user_id, n):
+        if user_id is not None:
+            self.users.setdefault(user_id, Counter())["notes_count"] += n
+        return self
+
+    def _add_todo(self, state, sign):
+        user_id, status, is_important, due_date = state
+        if user_id is None:
+            return
+        counts = self.users.setdefault(user_id, Counter())
+        counts[STATUS_FIELDS[status]] += sign
+        done = status == Todo.STATUS_COMPLETED
+        if is_important and not done:
+            counts["important_pending"] += sign
+        if due_date is not None:
+            month = self.months.setdefault(user_id, {}).setdefault(due_date.replace(day=1), Counter())
+            month["completed" if done else "pending"] += sign
+
+    def apply(self, rebuild_missing=True):
+        """
+        Apply the deltas. A user without a UserStats row is recounted with
+        `rebuild` instead (the changed rows are already in the database), or
+        skipped when `rebuild_missing` is False, as for deletes that may be
+        part of deleting the user.
+        """
+        now = timezone.now()
+        for user_id in self.users.keys() | self.months.keys() | self.touched:
+            delta = {name: F(name) + n for name, n in self.users.get(user_id, {}).items() if n}
+            if user_id in self.touched:
+                delta["reminders_version"] = F("reminders_version") + 1
+            with transaction.atomic(savepoint=False):
+                # updated_at also makes this UPDATE report whether the row exists
+                if not UserStats.objects.filter(user_id=user_id).update(updated_at=now, **delta):
+                    if rebuild_missing:
+                        rebuild(user_id)
+                    continue
+                _apply_months(user_id, self.months.get(user_id, {}))
+
+
+def _apply_months(user_id, months):
+    """One UPDATE for all of a user's month deltas."""
+    months = {month: counts for month, counts in months.items() if any(counts.values())}
+    if not months:
+        return
+    rows = UserMonthStats.objects.filter(user_id=user_id, month__in=months)
+
+    def create_missing():
+        UserMonthStats.objects.bulk_create(
+            [UserMonthStats(user_id=user_id, month=month) for month in months], ignore_conflicts=True
+        )
+
+    if len(months) > 1:
+        # Several months: create any missing rows up front rather than retry
+        create_missing()
+    delta = {
+        name: F(name) + Case(
+            *[When(month=month, then=Value(counts[name])) for month, counts in months.items() if counts[name]],
+            default=Value(0),
+        )
+        for name in ("pending", "completed")
+        if any(counts[name] for counts in months.values())
+    }
+    if not rows.update(**delta):
+        create_missing()
+        rows.update(**delta)
+
+
+def count(user_id):
+    """({counter: value}, {month: {"pending", "completed"}}) counted from the rows."""
+    todos = Todo.objects.filter(user_id=user_id).order_by()
+    by_status = dict(todos.values_list("status").annotate(n=Count("pk")))
+    counters = {field: by_status.get(status, 0) for status, field in STATUS_FIELDS.items()}
+    counters["important_pending"] = todos.filter(is_important=True, done=False).count()
+    counters["notes_count"] = Note.objects.filter(user_id=user_id).count()
+
+    months = {}
+    due = (
+        todos.filter(due_date__isnull=False)
+        .annotate(month=TruncMonth("due_date"))
+        .values_list("month")
+        .annotate(
+            pending=Count("pk", filter=Q(done=False)),
+            completed=Count("pk", filter=Q(done=True)),
+        )
+    )
+    for month, pending, completed in due:
+        months[month] = {"pending": pending, "completed": completed}
+    return counters, months
+
+
+def current(user_id):
+    """The stored counters, in the same shape as `count`, or None without a row."""
+    counters = UserStats.objects.filter(user_id=user_id).values(*COUNTERS).first()
+    if counters is None:
+        return None
+    months = {
+        month: {"pending": pending, "completed": completed}
+        for month, pending, completed in UserMonthStats.objects.filter(user_id=user_id)
+        .exclude(pending=0, completed=0)
+        .values_list("month", "pending", "completed")
+    }
+    return counters, months
+
+
+def rebuild(user_id):
+    """Recount the user's counters; returns True if the stored ones were off."""
+    with transaction.atomic(savepoint=False):
+        counted = count(user_id)
+        if current(user_id) == counted:
+            return False
+        counters, months = counted
+        UserStats.objects.update_or_create(user_id=user_id, defaults=counters)
+        UserMonthStats.objects.filter(user_id=user_id).delete()
+        UserMonthStats.objects.bulk_create([
+            UserMonthStats(user_id=user_id, month=month, **counts) for month, counts in months.items()
+        ])
+    return True
@@ -1,10 +1,23 @@
+import datetime
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.contrib.auth.views import redirect_to_login
+from asgiref.sync import sync_to_async
+from django.utils.crypto import constant_time_compare
+from django.utils.http import parse_etags
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-from .services import NoteService, TodoService
+from .services import NoteService, TodoService, SearchService, SyncService
+from .reminder_events import reminder_stream
+from .pagination import InvalidCursor
+from django.conf import settings
+from . import exports, fragment_cache, imports, metrics, serializers, sync
+
+MAX_BATCH_MOVES = 500
 
 # ---------------------------
 # Landing Page
@@ -50,60 +63,176 @@ def logout_view(request):
 # Dashboard
 # ---------------------------
 @login_required
-def dashboard(request):
-    todo_service = TodoService(request.user)
+async def dashboard(request):
+    todo_service = TodoService(await request.auser())
     query = request.GET.get("q", "")
     now = timezone.now()
 
-    # Get base stats and search results
-    stats = todo_service.get_dashboard_stats(query)
-
-    # Get reminders
-    reminders = todo_service.get_reminders(now)
-
-    # Get new features data
-    # 1. TODAY'S FOCUS
-    today_todos = todo_service.get_daily_focus(now)
-    
-    # 2. PRIORITY MATRIX
-    matrix = todo_service.get_priority_matrix(now)
-
-    # 3. MONTHLY STATS
-    monthly_stats = todo_service.get_monthly_stats(now)
-
-    context = {
-        "notes_count": stats["notes_count"],
-        "todos_count": stats["todos_count"],
-        "completed_todos": stats["completed_todos"],
-        "query": query,
-        "notes_results": stats["notes_results"],
-        "todos_results": stats["todos_results"],
-        
-        "upcoming_reminders": reminders["upcoming"],
-        "overdue_reminders": reminders["overdue"],
-        "soon_reminders": reminders["soon"],
-        "overdue_count": reminders["overdue_count"],
-        "soon_count": reminders["soon_count"],
-        "show_reminder_alert": (reminders["overdue_count"] > 0) or (reminders["soon_count"] > 0),
-
-        # New features
-        "today_todos": today_todos,
-        "important_urgent": matrix["important_urgent"],
-        "important_not_urgent": matrix["important_not_urgent"],
-        "all_important": matrix["all_important"],
-        
-        "monthly_stats": monthly_stats,
-    }
-    return render(request, "dashboard.html", context)
+    # Stats, reminders, today's focus, priority matrix and monthly stats
+    # are gathered by the service in a fixed number of queries. Under ASGI
+    # they run concurrently; under WSGI the sync path runs them in turn.
+    if isinstance(request, ASGIRequest):
+        context = await todo_service.aget_dashboard_data(now, query)
+    else:
+        context = await sync_to_async(todo_service.get_dashboard_data)(now, query)
+    return await sync_to_async(render)(request, "dashboard.html", context)
 
 
 @login_required
 def reminders_status(request):
-    """AJAX endpoint returning JSON with overdue and soon reminders for client polling."""
+    """
+    AJAX endpoint returning JSON with overdue and soon reminders for client polling.
+
+    Supports conditional GET: while nothing changed (per the ETag) an
+    If-None-Match request gets a 304 without the status queries. The "now"
+    field of a 304'd body is therefore the time of the last 200.
+    """
     todo_service = TodoService(request.user)
     now = timezone.now()
-    data = todo_service.get_reminders_status_data(now)
-    return JsonResponse(data)
+
+    etag = todo_service.match_reminders_etag(parse_etags(request.headers.get("If-None-Match", "")), now)
+    if etag:
+        response = HttpResponseNotModified()
+    else:
+        # Computed before reading so a concurrent change can only make it stale early
+        etag, _ = todo_service.get_reminders_etag(now)
+        response = JsonResponse(todo_service.get_reminders_status_data(now))
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    metrics.inc("reminder_polls_total", status=str(response.status_code))
+    return response
+
+
+async def reminders_stream(request):
+    """
+    Server-Sent Events stream of the reminders_status payload.
+
+    Needs the ASGI application (smartapp/asgi.py); under WSGI the response
+    could never finish, so clients are told to keep polling instead.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"status": "error", "message": "Streaming requires the ASGI server; poll /reminders/status/ instead."},
+            status=501,
+        )
+
+    response = StreamingHttpResponse(reminder_stream(TodoService(user)), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def metrics_view(request):
+    """
+    Prometheus metrics of all workers (core.metrics). Scrapers send
+    METRICS_TOKEN as "Authorization: Bearer <token>"; staff users can look
+    without it. Everyone else gets a 403, so with no token configured only
+    staff can read them.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    scraper = token and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")
+    if not (scraper or request.user.is_staff):
+        return HttpResponse("Forbidden\n", status=403, content_type="text/plain")
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@login_required
+def api_list(request, kind):
+    """
+    Read-only JSON array of the user's notes or todos, streamed in id order.
+    ?fields=id,title,... picks the fields (see core.serializers).
+    """
+    if kind not in serializers.API:
+        return JsonResponse({"status": "error", "message": f"Unknown kind {kind!r}"}, status=404)
+    model, serializer = serializers.API[kind]
+    fields = [name for name in request.GET.get("fields", "").split(",") if name]
+    try:
+        chunks = serializers.stream_json(model.objects.filter(user=request.user).order_by("id"), serializer, fields)
+    except serializers.InvalidFields as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    response = StreamingHttpResponse(chunks, content_type="application/json")
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@login_required
+def sync_changes(request):
+    """
+    JSON change feed for client replicas (?since=<cursor>&limit=). Start at
+    0 and pass back the returned cursor until has_more is false. Recent
+    changes can be sent more than once (see SyncService.changes).
+    """
+    try:
+        since = int(request.GET.get("since", 0))
+        limit = int(request.GET.get("limit", 0)) or None
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid cursor"}, status=400)
+    if since < 0 or (limit is not None and limit < 0):
+        return JsonResponse({"status": "error", "message": "Invalid cursor"}, status=400)
+    try:
+        data = SyncService(request.user).changes(since, limit)
+    except sync.CursorExpired as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=410)
+    response = JsonResponse(data)
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@login_required
+def search(request):
+    """JSON full-text search over the user's notes and todos (?q=&kind=&page=)."""
+    query = request.GET.get("q", "")
+    kind = request.GET.get("kind") or None
+    if kind not in (None, "note", "todo"):
+        return JsonResponse({"status": "error", "message": "Invalid kind"}, status=400)
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        page = 1
+    return JsonResponse(SearchService(request.user).search(query, kind=kind, page=page))
+
+
+@login_required
+def export_data(request, kind):
+    """Stream the user's notes or todos (?format=csv|ndjson&gzip=1)."""
+    fmt = request.GET.get("format", "csv")
+    compress = request.GET.get("gzip") in ("1", "true")
+    try:
+        chunks = exports.stream_export(request.user, kind, fmt, compress)
+    except ValueError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+    response = StreamingHttpResponse(
+        chunks, content_type="application/gzip" if compress else exports.FORMATS[fmt]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{exports.export_filename(kind, fmt, compress)}"'
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+@login_required
+def import_data(request, kind):
+    """
+    Bulk-import an uploaded CSV / NDJSON file (multipart field "file",
+    optional ?format=, gzip detected from a .gz name).
+    """
+    if request.method != "POST":
+        return JsonResponse({"status": "error", "message": "Invalid method"}, status=405)
+    upload = request.FILES.get("file")
+    if upload is None:
+        return JsonResponse({"status": "error", "message": "No file uploaded"}, status=400)
+    try:
+        fmt = request.GET.get("format") or imports.detect_format(upload.name)
+        importer = imports.BulkImporter(request.user, kind)
+        rows = imports.parse_rows(imports.open_text(upload.file, upload.name.endswith(".gz")), fmt)
+        report = importer.run(rows)
+    except (ValueError, OSError) as e:
+        # Unknown kind/format, or a corrupt gzip / non-UTF-8 upload
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    return JsonResponse({"status": "success" if not report["rejected"] else "partial", **report})
 
 
 # ---------------------------
@@ -112,8 +241,20 @@ def reminders_status(request):
 @login_required
 def notes_list(request):
     note_service = NoteService(request.user)
-    notes = note_service.list_all()
-    return render(request, "notes_list.html", {"notes": notes})
+    notes, next_cursor = note_service.list_page()
+    cards = fragment_cache.render_many("note_card.html", notes, "note")
+    return render(request, "notes_list.html", {"notes": notes, "cards": cards, "next_cursor": next_cursor})
+
+@login_required
+def notes_more(request):
+    """JSON "load more" for the notes list: rendered cards after ?cursor=."""
+    note_service = NoteService(request.user)
+    try:
+        notes, next_cursor = note_service.list_page(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    html = "".join(fragment_cache.render_many("note_card.html", notes, "note"))
+    return JsonResponse({"html": html, "count": len(notes), "next_cursor": next_cursor})
 
 @login_required
 def notes_add(request):
@@ -162,8 +303,26 @@ def notes_delete(request, id):
 def todos_list(request):
     todo_service = TodoService(request.user)
     board = todo_service.get_kanban_board()
+    # All cards of the board from one cache round trip; only changed todos are rendered
+    todos = [todo for column in todo_service.KANBAN_COLUMNS for todo in board[column]]
+    cards = iter(fragment_cache.render_many("todo_card.html", todos, "todo"))
+    board["cards"] = {column: [next(cards) for _ in board[column]] for column in todo_service.KANBAN_COLUMNS}
     return render(request, "todos_list.html", {"board": board})
 
+@login_required
+def todos_column(request, column):
+    """JSON "load more" for a Kanban column: rendered cards after ?cursor=."""
+    todo_service = TodoService(request.user)
+    status = todo_service.KANBAN_COLUMNS.get(column)
+    if status is None:
+        return JsonResponse({"status": "error", "message": "Invalid column"}, status=404)
+    try:
+        todos, next_cursor = todo_service.get_kanban_column(status, request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    html = "".join(fragment_cache.render_many("todo_card.html", todos, "todo"))
+    return JsonResponse({"html": html, "count": len(todos), "next_cursor": next_cursor})
+
 @login_required
 def update_todo_status(request, id):
     if request.method == "POST":
@@ -179,6 +338,29 @@ def update_todo_status(request, id):
         return JsonResponse({"status": "error", "message": message}, status=400)
     return JsonResponse({"status": "error", "message": "Invalid method"}, status=405)
 
+@login_required
+def update_todo_status_batch(request):
+    """
+    Apply several Kanban moves at once.
+    Body: {"moves": [{"id": 1, "status": "COMPLETED"}, ...]}
+    """
+    if request.method != "POST":
+        return JsonResponse({"status": "error", "message": "Invalid method"}, status=405)
+    import json
+    try:
+        moves = json.loads(request.body).get("moves")
+    except (ValueError, AttributeError):
+        moves = None
+    if not isinstance(moves, list) or not moves:
+        return JsonResponse({"status": "error", "message": "Expected a list of moves"}, status=400)
+    if len(moves) > MAX_BATCH_MOVES:
+        return JsonResponse({"status": "error", "message": f"At most {MAX_BATCH_MOVES} moves per request"}, status=400)
+
+    todo_service = TodoService(request.user)
+    results = todo_service.update_statuses(moves)
+    ok = all(result["status"] == "success" for result in results)
+    return JsonResponse({"status": "success" if ok else "partial", "results": results})
+
 @login_required
 def todos_add(request):
     todo_service = TodoService(request.user)
@@ -222,11 +404,63 @@ def todos_delete(request, id):
 # ---------------------------
 @login_required
 def todos_calendar(request):
+    """Month grid (?month=YYYY-MM) with per-day counts; day cells load their todos on demand."""
     todo_service = TodoService(request.user)
-    context = todo_service.get_calendar_data()
+    month = _parse_month(request.GET.get("month")) or timezone.localdate().replace(day=1)
+    context = todo_service.get_calendar_month(month)
     return render(request, "todos_calendar.html", context)
 
 
+def _parse_month(value):
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m").date()
+    except (TypeError, ValueError):
+        return None
+
+
+MAX_CALENDAR_WINDOW_DAYS = 366
+
+@login_required
+def todos_calendar_data(request):
+    """JSON per-day / per-month counts for ?start=&end= (ISO dates, end exclusive) or ?month=YYYY-MM."""
+    todo_service = TodoService(request.user)
+    month = _parse_month(request.GET.get("month"))
+    if month:
+        start, end = todo_service.calendar_window(month)
+    else:
+        try:
+            start = datetime.date.fromisoformat(request.GET.get("start", ""))
+            end = datetime.date.fromisoformat(request.GET.get("end", ""))
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "Pass month=YYYY-MM or start/end dates"}, status=400)
+    if not 0 < (end - start).days <= MAX_CALENDAR_WINDOW_DAYS:
+        return JsonResponse({"status": "error", "message": "Invalid date window"}, status=400)
+
+    data = todo_service.get_calendar_window(start, end)
+    return JsonResponse({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": {day.isoformat(): counts for day, counts in data["days"].items()},
+        "months": [{**row, "month": row["month"].strftime("%Y-%m")} for row in data["months"]],
+    })
+
+
+@login_required
+def todos_calendar_day(request, day):
+    """JSON rendered todo list for one day cell (?cursor= for more)."""
+    try:
+        day = datetime.date.fromisoformat(day)
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid date"}, status=400)
+    todo_service = TodoService(request.user)
+    try:
+        todos, next_cursor = todo_service.get_calendar_day(day, request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    html = render_to_string("calendar_day_items.html", {"todos": todos}, request)
+    return JsonResponse({"html": html, "count": len(todos), "next_cursor": next_cursor})
+
+
 @login_required
 def todos_check_done(request, id):
     """
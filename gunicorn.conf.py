@@ -0,0 +1,33 @@
+# Loaded automatically by gunicorn (see Procfile)
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "smartapp.settings")
+
+# Metrics files (see core.metrics) of this server only, unless configured
+_own_metrics_dir = "METRICS_DIR" not in os.environ
+if _own_metrics_dir:
+    os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="smartapp-metrics-")
+
+
+def on_starting(server):
+    # Drop the metrics files of the previous run
+    from core import metrics
+    metrics.clear()
+
+
+def post_fork(server, worker):
+    from core import metrics
+    metrics.worker_started()
+
+
+def worker_exit(server, worker):
+    # Last values of an exiting worker (its flush thread is a daemon)
+    from core import metrics
+    metrics.flush()
+
+
+def on_exit(server):
+    if _own_metrics_dir:
+        shutil.rmtree(os.environ["METRICS_DIR"], ignore_errors=True)
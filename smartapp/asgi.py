@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smartapp.settings')
+# No persistent connections under ASGI: every thread core.async_db runs reads
+# on (thread_sensitive=False) would otherwise hold its own connection open
+os.environ.setdefault('CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -14,6 +14,7 @@ urlpatterns = [
     # Notes
     path("notes/", views.notes_list, name="notes_list"),
     path("notes/add/", views.notes_add, name="notes_add"),
+    path("notes/more/", views.notes_more, name="notes_more"),
     path("notes/<int:id>/", views.notes_detail, name="notes_detail"),
     path("notes/edit/<int:id>/", views.notes_edit, name="notes_edit"),
     path("notes/delete/<int:id>/", views.notes_delete, name="notes_delete"),
@@ -27,11 +28,35 @@ urlpatterns = [
     path("todos/check-done/<int:id>/", views.todos_check_done, name="todos_check_done"),
     # Todos calendar
     path("todos/calendar/", views.todos_calendar, name="todos_calendar"),
+    path("todos/calendar/data/", views.todos_calendar_data, name="todos_calendar_data"),
+    path("todos/calendar/day/<str:day>/", views.todos_calendar_day, name="todos_calendar_day"),
+    # Todos Kanban "load more" per column
+    path("todos/column/<str:column>/", views.todos_column, name="todos_column"),
     # Todos Kanban Status API
     path("todos/update-status/<int:id>/", views.update_todo_status, name="update_todo_status"),
+    path("todos/update-status/batch/", views.update_todo_status_batch, name="update_todo_status_batch"),
+
+    # Read-only JSON API (?fields= sparse fieldsets)
+    path("api/<str:kind>/", views.api_list, name="api_list"),
+
+    # Change feed for client replicas
+    path("sync/changes/", views.sync_changes, name="sync_changes"),
+
+    # Full-text search JSON endpoint
+    path("search/", views.search, name="search"),
+
+    # Streaming CSV / NDJSON export
+    path("export/<str:kind>/", views.export_data, name="export_data"),
+    # Bulk CSV / NDJSON import (multipart upload)
+    path("import/<str:kind>/", views.import_data, name="import_data"),
 
     # Reminders JSON endpoint for live polling
     path("reminders/status/", views.reminders_status, name="reminders_status"),
+    # Server-Sent Events stream of the same payload (ASGI only)
+    path("reminders/stream/", views.reminders_stream, name="reminders_stream"),
+
+    # Prometheus metrics (core.metrics)
+    path("metrics", views.metrics_view, name="metrics"),
 
     # Admin
     path("admin/", admin.site.urls),